@@ -1,29 +1,18 @@
-import streamlit as st
-from dotenv import dotenv_values
-
+from pathlib import Path
 
-# Load environment
-env = dotenv_values(".env")
-# Streamlit Page Properties
-page_title=env["PAGE_TITLE"]
-title=env["TITLE"]
+import streamlit as st
 
+from sl_common.profiling import profiled_run
 
-st.set_page_config(page_title=page_title)
-st.title(title)
+APP_DIR = Path(__file__).parent
 
-st.sidebar.title("Agent Creator Catalog")
-st.sidebar.success("Select a demo above.")
+# The home page, then app_pages/ by name. The folder is not called pages/: Streamlit would
+# route that one itself, and its pages would run without this script.
+pages = [st.Page(APP_DIR / "Home.py", title="GenAI Demo", default=True)] + [
+    st.Page(path) for path in sorted((APP_DIR / "app_pages").glob("*.py"), key=lambda path: path.stem.lower())
+]
 
-st.markdown(
-    """
-    
-    ## SnapLogic Agent Creator allows you to create LLM-based applications in no time! 
-    
-    ### **👈 Select a demo from the sidebar** to see some examples of what Agent Creator can do!
-    ## Want to learn more?
-    - Check out [Agent Creator](https://www.snaplogic.com/products/agent-creator)
-    - Jump into our [documentation](https://docs-snaplogic.atlassian.net/wiki/spaces/SD/overview?homepageId=34537)
-    - Ask a question in our [community](https://community.snaplogic.com)
-"""
-)
+# Every page runs here, so ?profile=1 (or the Admin switch) profiles any of them
+page = st.navigation(pages)
+with profiled_run(page.title):
+    page.run()
@@ -0,0 +1,167 @@
+import streamlit as st
+import pandas as pd
+
+from sl_common.access import ADMIN_TOKEN, is_admin
+from sl_common.cache import get_response_cache
+from sl_common.deck_cache import get_deck_cache
+from sl_common.http import get_client
+from sl_common.metrics import METRICS_HOST, METRICS_PORT, TRACE_FILE, get_metrics
+from sl_common.profiling import PROFILE_INTERVAL_MS, get_profiling_settings
+from sl_common.state import describe_state
+from sl_common.transcript import SESSION_HISTORY_KB, SESSION_IDLE_MINUTES, get_transcript_store
+
+st.set_page_config(page_title="Admin", page_icon="🛠️")
+
+st.title("🛠️ Admin")
+
+if st.button("🔄 Refresh"):
+    st.rerun()
+
+# Anyone can read these numbers; changing server-wide settings takes an admin (SL_ADMIN_EMAILS / SL_ADMIN_TOKEN)
+admin_token = st.sidebar.text_input("🔑 Admin token", type="password", key="admin_token") if ADMIN_TOKEN else ""
+admin = is_admin(admin_token)
+if not admin:
+    st.info("Read-only view. Sign in with an email listed in SL_ADMIN_EMAILS, or enter SL_ADMIN_TOKEN, to reset metrics, clear caches or change profiling.")
+
+# -----------------------------
+# Connection pools
+# -----------------------------
+st.subheader("🔌 SnapLogic connection pools")
+pool_stats = get_client().pool_stats()
+if pool_stats:
+    st.dataframe(pd.DataFrame.from_dict(pool_stats, orient="index"), use_container_width=True)
+else:
+    st.caption("No SnapLogic calls made by this server process yet.")
+
+# -----------------------------
+# Call latency
+# -----------------------------
+st.subheader("⏱️ SnapLogic call latency")
+metrics = get_metrics()
+call_stats = metrics.summary()
+if call_stats:
+    st.dataframe(pd.DataFrame.from_dict(call_stats, orient="index"), use_container_width=True)
+else:
+    st.caption("No SnapLogic calls made by this server process yet.")
+st.caption(
+    (f"Prometheus metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics" if METRICS_PORT else "Set SL_METRICS_PORT to serve Prometheus metrics")
+    + (f" · tracing calls to {TRACE_FILE}" if TRACE_FILE else " · set SL_TRACE_FILE to record a JSONL trace")
+)
+col_a, col_b = st.columns(2)
+col_a.download_button("📥 Prometheus metrics", data=metrics.prometheus(), file_name="snaplogic_metrics.prom")
+if admin and col_b.button("🧹 Reset latency metrics"):
+    metrics.reset()
+    st.rerun()
+
+# -----------------------------
+# Endpoint health
+# -----------------------------
+st.subheader("🛡️ Endpoint health")
+policy_stats = get_client().policy_stats()
+if policy_stats:
+    st.dataframe(pd.DataFrame.from_dict(policy_stats, orient="index"), use_container_width=True)
+    st.caption("Deadlines follow each endpoint's p99 time to first byte; open circuits refuse calls until their trial call succeeds.")
+else:
+    st.caption("No SnapLogic calls made by this server process yet.")
+
+# -----------------------------
+# Admission control
+# -----------------------------
+st.subheader("🚦 Admission control")
+admission, admission_endpoints = get_client().admission_stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("In flight", f"{admission['in_flight']} / {admission['max_calls']}")
+c2.metric("Queue depth", admission["queue_depth"], help=f"Peak {admission['peak_queue_depth']}")
+c3.metric("Wait p95", "–" if admission["wait_p95_ms"] is None else f"{admission['wait_p95_ms']:.0f} ms")
+c4.metric("Turned away", admission["rejected"] + admission["timed_out"] + admission["rate_limited"])
+st.caption(
+    f"{admission['admitted']} admitted · {admission['queued']} had to wait · {admission['rejected']} refused (queue full) · "
+    f"{admission['timed_out']} gave up waiting · {admission['rate_limited']} rate limited · "
+    f"wait p50 {admission['wait_p50_ms']} ms, p99 {admission['wait_p99_ms']} ms"
+)
+if admission_endpoints:
+    st.dataframe(pd.DataFrame.from_dict(admission_endpoints, orient="index"), use_container_width=True)
+
+# -----------------------------
+# Profiling
+# -----------------------------
+st.subheader("🔬 Page profiling")
+profiling = get_profiling_settings()
+if admin:
+    profiling.all_sessions = st.toggle(
+        "Profile every page run", value=profiling.all_sessions,
+        help="For all sessions on this server process. One page can be profiled with ?profile=1 in its URL instead.",
+    )
+else:
+    st.caption(f"Profiling every page run: {'on' if profiling.all_sessions else 'off'}")
+st.caption(
+    f"Profiled runs sample the call stack every {PROFILE_INTERVAL_MS:g} ms (SL_PROFILE_INTERVAL_MS) and show "
+    "a phase breakdown and call tree in the sidebar, with the raw profile to download."
+)
+
+# -----------------------------
+# Answer cache
+# -----------------------------
+st.subheader("🗄️ Answer cache")
+cache = get_response_cache()
+cache_stats = cache.stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+c2.metric("Hits", cache_stats["hits"])
+c3.metric("Misses", cache_stats["misses"])
+c4.metric("Coalesced", cache_stats["coalesced"])
+st.caption(
+    f"{cache_stats['entries']} entries · {cache_stats['size_kb']} KB · "
+    f"{cache_stats['evictions']} evicted · {cache_stats['expirations']} expired · "
+    f"{cache_stats['errors']} upstream errors · {cache_stats['in_flight']} in flight"
+)
+if admin and st.button("🧹 Clear answer cache"):
+    cache.clear()
+    st.rerun()
+
+# -----------------------------
+# Deck cache
+# -----------------------------
+st.subheader("🎞️ Deck cache")
+deck_cache = get_deck_cache()
+deck_stats = deck_cache.stats()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Slide hit rate", f"{deck_stats['slide_hit_rate']:.0%}")
+c2.metric("Slides reused", deck_stats["slide_hits"])
+c3.metric("Slides generated", deck_stats["slide_misses"])
+c4.metric("Deck hit rate", f"{deck_stats['deck_hit_rate']:.0%}")
+st.caption(
+    f"{deck_stats['parts_reused']} rendered slides reused, {deck_stats['parts_drawn']} drawn · "
+    f"{deck_stats['entries']} files · {deck_stats['size_kb']} KB · {deck_stats['evictions']} evicted"
+)
+if admin and st.button("🧹 Clear deck cache"):
+    deck_cache.clear()
+    st.rerun()
+
+# -----------------------------
+# Session memory
+# -----------------------------
+st.subheader("🧠 Chat session memory")
+transcripts = get_transcript_store()
+transcripts.maintain()
+memory_report = transcripts.report()
+if memory_report:
+    memory_df = pd.DataFrame(memory_report)
+    per_session = memory_df.groupby("session")[["messages", "in_memory", "memory_kb", "not_in_memory"]].sum()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Live sessions", len(per_session))
+    c2.metric("Chat memory", f"{memory_df['memory_kb'].sum():.0f} KB")
+    c3.metric("Messages not in memory", int(memory_df["not_in_memory"].sum()))
+    st.dataframe(per_session.sort_values("memory_kb", ascending=False), use_container_width=True)
+    with st.expander("Per transcript"):
+        st.dataframe(memory_df, use_container_width=True, hide_index=True)
+else:
+    st.caption("No chat sessions in this server process yet.")
+st.caption(
+    f"Each transcript keeps up to {SESSION_HISTORY_KB} KB in memory (SL_SESSION_HISTORY_KB); "
+    f"sessions idle for {SESSION_IDLE_MINUTES:g} min are dropped from memory (SL_SESSION_IDLE_MINUTES). "
+    f"Every message is kept in the state backend: {describe_state(transcripts.state)}."
+)
+if admin and st.button("💾 Drop idle sessions from memory now"):
+    transcripts.maintain(force=True)
+    st.rerun()
@@ -0,0 +1,448 @@
+import streamlit as st
+import pandas as pd
+import os
+import uuid
+from urllib.parse import quote
+
+from sl_common.admission import rate_limited
+from sl_common.background import Job, can_submit, collect_finished, render_jobs, submit
+from sl_common.http import get_client
+from sl_common.po_db import get_po_db
+from sl_common.po_export import FORMATS, export_formats, get_export_cache
+from sl_common.po_policy import PolicyContext, get_policy
+from sl_common.po_scoring import get_queue_scorer
+from sl_common.po_store import RecommendationStore, load_base_frame, source_version
+from sl_common.po_submit import create_pos
+from sl_common.profiling import phase
+from sl_common.state import load_session, save_session
+
+# -----------------------------
+# Page config
+# -----------------------------
+st.set_page_config(page_title="PO Creation Workbench", layout="wide", page_icon="🛒")
+
+# -----------------------------
+# Custom Styling
+# -----------------------------
+# Counted as page setup when profiling
+with phase("config"):
+    st.markdown("""
+    <style>
+    .stButton>button[kind="primary"] {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border: none;
+        border-radius: 8px;
+        height: 3em;
+        font-weight: 600;
+    }
+    .stButton>button { border-radius: 8px; height: 3em; font-weight: 500; }
+    [data-testid="stMetricValue"] { font-size: 28px; font-weight: 700; }
+    h1 {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        -webkit-background-clip: text; -webkit-text-fill-color: transparent;
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# -----------------------------
+# Recommendations queue (SL_PO_RECS_PATH, or mock data for the demo)
+# Statuses are shared by all buyers through the state backend (SL_STATE_URL, or SL_PO_DB_PATH)
+# -----------------------------
+if "po_store" not in st.session_state:
+    st.session_state.po_store = RecommendationStore(load_base_frame(), get_po_db())
+store = st.session_state.po_store
+store.sync()
+
+if "po_actor" not in st.session_state:
+    # The buyer name follows the session to whichever replica serves it
+    st.session_state.po_actor = load_session().get("po_actor") or f"buyer-{uuid.uuid4().hex[:4]}"
+
+if "po_jobs" not in st.session_state:
+    st.session_state.po_jobs = {}
+
+# -----------------------------
+# Sidebar filters & configuration
+# -----------------------------
+st.sidebar.header("🔧 Filters & Configuration")
+
+location_filter = st.sidebar.multiselect(
+    "📍 Location", options=store.options("location"), default=[]
+)
+supplier_filter = st.sidebar.multiselect(
+    "🏭 Supplier", options=store.options("supplier"), default=[]
+)
+
+erp = st.sidebar.selectbox("💼 ERP System", ["SAP", "NetSuite"], index=0)
+env = st.sidebar.selectbox("🌐 Environment", ["Dev", "QA", "Prod"], index=0)
+buyer = st.sidebar.text_input(
+    "👤 Buyer", key="po_actor", on_change=lambda: save_session(po_actor=st.session_state.po_actor)
+)
+
+# Always-send static account params (no conditionals)
+NS_ACCOUNT_NAME = "../../shared/NS_Token account_2018_2_TimToken vld 10.25.2023"
+SAP_ACCOUNT_NAME = "SAP_prod"
+NS_account_param = quote(NS_ACCOUNT_NAME, safe="")
+SAP_account_param = quote(SAP_ACCOUNT_NAME, safe="")
+
+st.sidebar.divider()
+st.sidebar.caption("Approving posts one JSON payload to a SnapLogic pipeline which creates the PO and returns status.")
+
+if st.sidebar.button("🔄 Refresh Data", use_container_width=True):
+    load_base_frame.clear()
+    del st.session_state.po_store
+    st.rerun()
+
+MAX_CHOOSER_OPTIONS = 1000
+LOG_PAGE_SIZE = 50
+# Statuses a recommendation can be approved / rejected from
+APPROVABLE = ("Pending", "Failed", "Rejected")
+REJECTABLE = ("Pending", "Failed")
+# How often an idle page checks whether another buyer changed a status
+PO_SYNC_INTERVAL = float(os.getenv("SL_PO_SYNC_INTERVAL", "5"))
+
+# Always include both query params
+SL_ENDPOINT = (
+    os.getenv(
+        "SL_PO_TASK_URL",
+        "https://elastic.snaplogic.com/api/1/rest/slsched/feed/ConnectFasterInc/"
+        "Dylan%20Vetter/DemoBucket/Amazon%20PO%20creation%20Task",
+    )
+    + f"?bearer_token=12345"
+    f"&NS_accountName={NS_account_param}"
+    f"&SAP_accountName={SAP_account_param}"
+)
+
+
+def build_payload(row: dict, justification: str) -> dict:
+    return {
+        "rec_id": row["rec_id"],
+        "sku": row["sku"],
+        "sku_id": "15",
+        "internal_id": "11486",
+        "location": row["location"],
+        "shortage_date": row["shortage_date"],
+        "recommended_qty": int(row["recommended_qty"]),
+        "supplier": row["supplier"],
+        "justification": justification,
+        "erp": erp,
+        "environment": env,
+    }
+
+
+def _po_ref(body) -> tuple:
+    """Extract (internal_id, url) from one pipeline output document, if present."""
+    if isinstance(body, dict):
+        return body.get("internal_id") or body.get("po_number") or body.get("id"), body.get("url")
+    return None, None
+
+
+def post_pos(payloads: list, job: Job = None) -> list:
+    """Post payloads to the SnapLogic pipeline and return one (internal_id, url) per payload.
+
+    A single payload is sent as one JSON document, as the pipeline has always
+    accepted; several are sent as a JSON array (one document each) and matched
+    back by ``rec_id``, falling back to position.
+    """
+    body = payloads[0] if len(payloads) == 1 else payloads
+    # Not idempotent: only retried when the request never reached SnapLogic
+    res = get_client().post(SL_ENDPOINT, json=body, job=job)
+
+    # Treat any 2xx as success
+    if not 200 <= res.status_code < 300:
+        raise Exception(f"Non-2xx status code: {res.status_code}")
+
+    # Try to extract internal_id and url if present
+    try:
+        docs = res.json()
+    except Exception:
+        docs = []
+    if not isinstance(docs, list):
+        docs = [docs]
+    by_rec_id = {doc.get("rec_id"): doc for doc in docs if isinstance(doc, dict) and doc.get("rec_id")}
+    return [
+        _po_ref(by_rec_id.get(p["rec_id"], docs[i] if i < len(docs) else None))
+        for i, p in enumerate(payloads)
+    ]
+
+
+def submit_pos(rows: pd.DataFrame, justifications: list, allowed: tuple = APPROVABLE) -> bool:
+    if not can_submit(st.session_state.po_jobs):
+        return False
+    if rate_limited():
+        st.session_state.po_notice = "You're submitting faster than this demo allows. Give it a few seconds and try again"
+        return True
+    # Claim the rows first so two buyers can never create the same PO
+    claimed = set(store.set_status(rows["rec_id"].tolist(), "Submitting", buyer, allowed))
+    if len(claimed) < len(rows):
+        st.session_state.po_notice = f"{len(rows) - len(claimed)} recommendation(s) were already handled by another buyer"
+    payloads = [
+        build_payload(row, j) for row, j in zip(rows.to_dict("records"), justifications) if row["rec_id"] in claimed
+    ]
+    if not payloads:
+        return True
+    rec_ids = [p["rec_id"] for p in payloads]
+    label = f"Creating PO for {rec_ids[0]} via SnapLogic…" if len(rec_ids) == 1 else f"Creating {len(rec_ids)} POs via SnapLogic…"
+    submit(
+        st.session_state.po_jobs, label, create_pos, payloads, store.db, buyer, post_pos,
+        meta={"rec_ids": rec_ids, "results": {}},
+    )
+    return True
+
+
+# Apply PO submissions that finished in the background; a running job records every row's outcome itself
+for job in collect_finished(st.session_state.po_jobs, include_cancelled=True):
+    if job.future.cancelled():
+        # Cancelled before it started, so nothing was sent
+        store.set_status(job.meta["rec_ids"], "Pending", buyer, allowed=("Submitting",))
+    results = dict(job.meta["results"])
+    created = sum(r["status"].startswith("Created") for r in results.values())
+    failed = sum(r["status"] == "Failed" for r in results.values())
+    if not job.cancelled and job.error is not None:
+        st.error(f"❌ Failed to create POs: {job.error}")
+    if failed:
+        st.toast(f"PO creation failed for {failed} recommendation(s)", icon="❌")
+    if created:
+        st.toast(f"🎉 {created} PO(s) created", icon="✅")
+
+if "po_notice" in st.session_state:
+    st.toast(st.session_state.pop("po_notice"), icon="⚠️")
+
+
+@st.fragment(run_every=PO_SYNC_INTERVAL)
+def watch_shared_status():
+    # One cheap query per tick; the page only reruns when a status actually changed
+    if store.db.revision() != store.revision:
+        st.rerun()
+
+
+watch_shared_status()
+
+# -----------------------------
+# Header stats
+# -----------------------------
+st.title("🛒 Review & Approve Suggested POs")
+degraded = get_client().degraded(SL_ENDPOINT)
+if degraded:
+    st.warning(degraded)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("📋 Pending recommendations", store.counts["pending"])
+with col2:
+    st.metric("✅ Created today", store.counts["created"])
+with col3:
+    st.metric("⚠️ Failures (24h)", store.counts["failed"])
+
+# -----------------------------
+# Filtered table, most urgent first (scores are shared and cached per data version and day)
+# -----------------------------
+scores = get_queue_scorer().scores(store.df)
+df = store.filtered(location_filter, supplier_filter, scores=scores)
+# Each policy rule is one vectorized check over the whole queue (SL_PO_POLICY_PATH, or the built-in rules)
+policy = get_policy()
+policy_context = PolicyContext(erp, env, scores.as_of)
+checks = policy.evaluate(df, policy_context)
+df = df.assign(**{column: checks[column].to_numpy() for column in checks.columns})
+
+
+
+def remember_selection():
+    # Selected positions only point at the right rows in the order the buyer saw, so keep the rec_ids
+    rows = st.session_state.po_queue.selection.rows
+    st.session_state.po_selected_ids = st.session_state.po_shown_ids[rows].tolist()
+
+
+st.session_state.po_shown_ids = df.index
+st.subheader("📦 Recommendations queue")
+st.dataframe(
+    df[["priority","rec_id","sku","location","shortage_date","days_to_shortage","recommended_qty","supplier",
+        "coverage","forecast_gap","gap_ratio","reason","status", *[rule.column for rule in policy.rules]]],
+    column_config={
+        **{
+            rule.column: st.column_config.CheckboxColumn(rule.label, help=rule.explain(policy_context))
+            for rule in policy.rules
+        },
+        "priority": st.column_config.ProgressColumn("🔥 Priority", min_value=0, max_value=100, format="%.0f"),
+        "days_to_shortage": st.column_config.NumberColumn("⏳ Days left", format="%d"),
+        "coverage": st.column_config.NumberColumn("🛡️ Coverage", help="(On hand + inbound) / safety stock", format="%.2f×"),
+        "gap_ratio": st.column_config.NumberColumn("📐 Gap / safety", format="%.2f×"),
+        "rec_id": st.column_config.Column("🆔 Rec ID"),
+        "sku": st.column_config.Column("📦 SKU"),
+        "location": st.column_config.Column("📍 Location"),
+        "shortage_date": st.column_config.Column("📅 Shortage Date"),
+        "recommended_qty": st.column_config.NumberColumn("🔢 Recommended Qty"),
+        "supplier": st.column_config.Column("🏭 Supplier"),
+        "forecast_gap": st.column_config.NumberColumn("📊 Forecast Gap"),
+        "reason": st.column_config.Column("💡 Reason / Driver"),
+        "status": st.column_config.Column("✓ Status"),
+    },
+    hide_index=True, use_container_width=True,
+    on_select=remember_selection, selection_mode="multi-row", key="po_queue",
+)
+
+# -----------------------------
+# Bulk approval
+# -----------------------------
+# Approved by rec_id, so a re-sort or another buyer's change since the click can't shift the selection
+selected_ids = st.session_state.get("po_selected_ids", [])
+selected = df[df.index.isin(selected_ids)] if selected_ids else df.iloc[:0]
+eligible = selected[(selected["status"] == "Pending") & selected["policy_ok"]]
+colX, colY = st.columns([1, 3])
+with colX:
+    approve_selected = st.button(
+        f"✅ Approve selected ({len(eligible)})", type="primary", use_container_width=True,
+        disabled=eligible.empty,
+    )
+with colY:
+    skipped = len(selected) - len(eligible)
+    st.caption(
+        "Select rows in the queue to approve them together."
+        + (f" {skipped} selected row(s) are not pending or fail policy checks and will be skipped." if skipped else "")
+    )
+
+if approve_selected:
+    justifications = [f"Auto-generated: {r} (gap {int(g)})" for r, g in zip(eligible["reason"], eligible["forecast_gap"])]
+    if submit_pos(eligible, justifications, allowed=("Pending",)):
+        st.rerun()
+    st.warning("⏳ Too many PO submissions are running. Wait for one to finish or cancel it.")
+
+render_jobs(st.session_state.po_jobs, chat=False)
+
+# -----------------------------
+# Row chooser
+# -----------------------------
+st.divider()
+left, right = st.columns([2, 1])
+with left:
+    # Rows selected in the queue narrow the chooser; large queues only list the first rows
+    chooser_ids = selected["rec_id"] if not selected.empty else df["rec_id"]
+    chosen_id = st.selectbox(
+        "🔍 Select a recommendation to review", options=chooser_ids.head(MAX_CHOOSER_OPTIONS).tolist()
+    )
+
+with right:
+    # Exports are only written on request and reused until a status or the filters change
+    if st.toggle("📥 Export queue", key="po_export"):
+        export_format = st.selectbox("Format", export_formats(), key="po_export_format", label_visibility="collapsed")
+        suffix, mime = FORMATS[export_format][:2]
+        try:
+            with st.spinner(f"Preparing {export_format} export…"):
+                export_path = get_export_cache().export(
+                    df, export_format, (source_version(), store.version, scores.as_of),
+                    {"location": location_filter, "supplier": supplier_filter, "erp": [erp], "env": [env]},
+                )
+        except ValueError as e:
+            st.warning(str(e))
+        else:
+            with open(export_path, "rb") as f:
+                st.download_button(f"Download {export_format}", data=f, file_name=f"po_recommendations{suffix}", mime=mime)
+
+if chosen_id is None:
+    st.info("No recommendations match the current filters.")
+    st.stop()
+chosen = store.row(chosen_id)
+urgency = scores.row(chosen_id)
+
+# -----------------------------
+# Detail & approval panel
+# -----------------------------
+with st.container(border=True):
+    st.subheader("📄 Recommendation details")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("📦 SKU", chosen["sku"])
+    c2.metric("📍 Location", chosen["location"])
+    c3.metric("📅 Shortage date", chosen["shortage_date"])
+    c4.metric("🔢 Rec qty", int(chosen["recommended_qty"]))
+
+    st.write(
+        f"**🏭 Supplier:** {chosen['supplier']}  |  **💡 Reason:** {chosen['reason']}  |  **📊 Forecast gap:** {int(chosen['forecast_gap'])}"
+    )
+    days_left = urgency["days_to_shortage"]
+    if pd.isna(days_left):
+        shortage_in = "unknown"
+    elif days_left < 0:
+        shortage_in = f"overdue by {-int(days_left)} day(s)"
+    else:
+        shortage_in = f"{int(days_left)} day(s)"
+    st.write(
+        f"**🔥 Priority:** {urgency['priority']:.0f}/100  |  **⏳ Shortage:** {shortage_in}  |  "
+        f"**🛡️ Coverage:** {urgency['coverage']:.2f}× safety stock  |  **📐 Gap:** {urgency['gap_ratio']:.2f}× safety stock"
+    )
+
+    st.markdown("---")
+    st.markdown("**📝 Business justification**")
+    justification = st.text_area(
+        "",
+        value=f"Auto-generated: {chosen['reason']} (gap {int(chosen['forecast_gap'])})",
+        height=90,
+    )
+
+    st.markdown("**✅ Policy checks**")
+    chosen_checks = policy.evaluate(store.df.loc[[chosen_id]], policy_context).iloc[0]
+    for rule in policy.rules:
+        passed = bool(chosen_checks[rule.column])
+        st.checkbox(f"{'✓' if passed else '✗'} {rule.label}", value=passed, disabled=True, help=rule.explain(policy_context))
+
+    st.divider()
+    colA, colB, colC = st.columns([1,1,2])
+
+    with colA:
+        approve = st.button(
+            "✅ Approve & Create PO", type="primary", use_container_width=True,
+            disabled=not chosen_checks["policy_ok"] or chosen["status"] not in APPROVABLE,
+        )
+    with colB:
+        reject = st.button("❌ Reject", use_container_width=True)
+    with colC:
+        st.caption("Approving will call the SnapLogic pipeline")
+
+    if approve:
+        if submit_pos(df.loc[[chosen["rec_id"]]], [justification]):
+            st.rerun()
+        st.warning("⏳ Too many PO submissions are running. Wait for one to finish or cancel it.")
+
+    if reject:
+        if store.set_status([chosen["rec_id"]], "Rejected", buyer, allowed=REJECTABLE):
+            st.toast(f"🚫 Recommendation {chosen['rec_id']} rejected", icon="❌")
+        else:
+            st.session_state.po_notice = f"{chosen['rec_id']} was already handled by another buyer"
+        st.rerun()
+
+# -----------------------------
+# Activity log (with SalesOrder ID + clickable URL)
+# -----------------------------
+st.subheader("📜 Activity log")
+log_total = store.db.activity_count()
+if not log_total:
+    st.caption("No approvals or rejections yet.")
+else:
+    log_pages = -(-log_total // LOG_PAGE_SIZE)
+    log_page = st.number_input(f"Page (of {log_pages})", min_value=1, max_value=log_pages, value=1) if log_pages > 1 else 1
+    log_df = pd.DataFrame(store.db.activity(LOG_PAGE_SIZE, (log_page - 1) * LOG_PAGE_SIZE))
+    log_df["ts"] = pd.to_datetime(log_df["ts"], unit="s")
+    log_df = log_df.join(store.df[["sku", "location"]], on="rec_id")
+    st.dataframe(
+        log_df[["ts", "rec_id", "sku", "location", "from_status", "to_status", "internal_id", "url", "actor"]],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "ts": st.column_config.DatetimeColumn("🕒 Time (UTC)", format="YYYY-MM-DD HH:mm:ss"),
+            "from_status": st.column_config.Column("From"),
+            "to_status": st.column_config.Column("Status"),
+            "url": st.column_config.LinkColumn("URL", display_text="Open in ERP"),
+            "internal_id": st.column_config.Column("ERP Ref ID"),
+            "actor": st.column_config.Column("👤 Buyer"),
+        },
+    )
+
+# -----------------------------
+# Footer
+# -----------------------------
+st.divider()
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.caption("🔧 Powered by SnapLogic")
+with col2:
+    st.caption(f"📅 Last updated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}")
+with col3:
+    st.caption(f"🌐 Environment: {env} | ERP: {erp}")
@@ -0,0 +1,135 @@
+import streamlit as st
+
+from sl_common.admission import rate_limited
+from sl_common.agent import STREAM_ACCEPT, STREAM_RESPONSES, AgentError, extract_reply, is_streaming, iter_stream, read_json
+from sl_common.background import Job, can_submit, collect_finished, render_jobs, submit
+from sl_common.config import get_config
+from sl_common.history import ContextWindow, render_payload_metrics
+from sl_common.http import get_client
+from sl_common.render import typewriter
+from sl_common.state import session_id
+from sl_common.transcript import get_transcript, render_transcript
+
+# Endpoint, token and titles come from .env / the environment, loaded once per process
+AGENT = get_config().agents["crm"]
+URL = AGENT.url
+BEARER_TOKEN = AGENT.token
+page_title = AGENT.page_title
+title = AGENT.title
+
+# Streamlit Page Properties
+st.set_page_config(page_title=page_title)
+
+st.title(title)
+
+# Description block
+st.markdown(
+    """  
+    ### This is a CRM Agent that allows employees to interact with Production Systems using Natural Language
+    Example Questions
+    - What accounts are in New York?
+    - What campaigns are completed and what were their performance metrics? Include names 
+    - What are my 3 top opportunities? Please include information about the respective account
+    - What is the names of the opportunities are sourced from partners and what the total amount?
+    """
+)
+
+# Initialize session state; the id follows the signed-in user or session cookie, so any replica can resume the session
+session_id()
+
+get_transcript("CRM_SQL_messages")
+
+if "CRM_SQL_context" not in st.session_state:
+    st.session_state.CRM_SQL_context = {}
+
+if "CRM_SQL_payload_metrics" not in st.session_state:
+    st.session_state.CRM_SQL_payload_metrics = []
+
+if "CRM_SQL_thread_jobs" not in st.session_state:
+    st.session_state.CRM_SQL_thread_jobs = {}
+
+context_window = ContextWindow()
+render_payload_metrics(st.session_state.CRM_SQL_payload_metrics)
+
+# Display chat history
+render_transcript(st.session_state.CRM_SQL_messages)
+
+
+def fetch_reply(job: Job, payload: dict) -> str:
+    """Call the agent task; runs on the background executor."""
+    headers = {
+        'Authorization': f'Bearer {BEARER_TOKEN}',
+        'Content-Type': 'application/json',
+        'Accept': STREAM_ACCEPT
+    }
+    response = get_client().post(
+        url=URL,
+        json=payload,
+        headers=headers,
+        # Each turn extends the agent's conversation, so a retry or hedge could add it twice
+        idempotent=False,
+        job=job,
+        verify=False,
+        stream=STREAM_RESPONSES
+    )
+
+    if response.status_code != 200:
+        raise AgentError(f"❌ Error while calling the SnapLogic API: {response.status_code}", response.text)
+    if is_streaming(response):
+        for chunk in iter_stream(response):
+            job.emit(chunk)
+        return job.partial
+    return extract_reply(read_json(response)) or "No response returned from SnapLogic."
+
+
+# Pick up replies that finished in the background
+for job in collect_finished(st.session_state.CRM_SQL_thread_jobs):
+    with st.chat_message("assistant"):
+        if job.error is None:
+            reply = job.result()
+            if job.streamed:
+                st.markdown(reply)
+            else:
+                typewriter(reply)
+            st.session_state.CRM_SQL_messages.append({"role": "assistant", "content": reply})
+            context_window.mark_sent(st.session_state.CRM_SQL_context, len(st.session_state.CRM_SQL_messages))
+        elif isinstance(job.error, AgentError):
+            for line in filter(None, job.error.args):
+                st.error(line)
+        else:
+            st.error(f"❌ Exception occurred: {str(job.error)}")
+
+degraded = get_client().degraded(URL)
+if degraded:
+    st.warning(degraded)
+
+# Handle user input
+prompt = st.chat_input("Ask me anything")
+# One turn at a time: the agent keeps the conversation, and the history sent with each turn assumes the last one finished
+if prompt and not can_submit(st.session_state.CRM_SQL_thread_jobs, limit=1):
+    st.warning("⏳ Wait for the answer to your last question, or cancel it, before asking the next one.")
+elif prompt and rate_limited():
+    st.warning("🚦 You're asking faster than this demo allows. Give it a few seconds and try again.")
+elif prompt:
+    st.session_state.CRM_SQL_messages.append({"role": "user", "content": prompt})
+    # Shown in place; the history above picks it up on the next rerun
+    with st.chat_message("user"):
+        st.markdown(prompt)
+
+    # Format message history to SnapLogic's expected format, within the token budget
+    sl_messages, payload_stats = context_window.build(
+        st.session_state.CRM_SQL_messages,
+        st.session_state.CRM_SQL_context,
+        st.session_state.session_id,
+    )
+    st.session_state.CRM_SQL_payload_metrics.append(payload_stats)
+
+    payload = {
+        "messages": sl_messages,
+        "session_id": st.session_state.session_id,
+        "deployment_id": "end_turn"
+    }
+
+    submit(st.session_state.CRM_SQL_thread_jobs, "Working...", fetch_reply, payload, limit=1)
+
+render_jobs(st.session_state.CRM_SQL_thread_jobs)
@@ -0,0 +1,118 @@
+import streamlit as st
+
+from sl_common.admission import rate_limited
+from sl_common.agent import STREAM_ACCEPT, STREAM_RESPONSES, AgentError, is_streaming, iter_stream, read_json
+from sl_common.background import Job, can_submit, collect_finished, render_jobs, submit
+from sl_common.cache import get_response_cache
+from sl_common.config import get_config
+from sl_common.http import get_client
+from sl_common.render import typewriter
+from sl_common.transcript import get_transcript, render_transcript
+
+# Endpoint, token and titles come from .env / the environment, loaded once per process
+AGENT = get_config().agents["crm"]
+URL = AGENT.url
+BEARER_TOKEN = AGENT.token
+page_title = AGENT.page_title
+title = AGENT.title
+
+# Streamlit Page Properties
+st.set_page_config(page_title=page_title)
+
+st.title(title)
+
+st.markdown(
+    """  
+    ### This is a CRM Agent that allows employees to interact with Production Systems using Natural Language
+    Example Questions
+    - What accounts are in New York?
+    - What campaigns are completed and what were their performance metrics? Include names 
+    - What are my 3 top opportunities? Please include information about the respective account
+    - What is the names of the opportunities are sourced from partners and what the total amount?
+ """
+)
+
+# Initialize chat history (older messages live on disk)
+get_transcript("CRM_SQL_messages")
+
+if "CRM_SQL_jobs" not in st.session_state:
+    st.session_state.CRM_SQL_jobs = {}
+
+# Display chat messages from history on app rerun
+render_transcript(st.session_state.CRM_SQL_messages)
+
+
+def fetch_reply(job: Job, prompt: str) -> str:
+    """Call the CRM agent task; runs on the background executor."""
+    data = {"prompt": prompt}
+    headers = {
+        'Authorization': f'Bearer {BEARER_TOKEN}',
+        'Accept': STREAM_ACCEPT
+    }
+    response = get_client().post(
+        url=URL,
+        data=data,
+        headers=headers,
+        idempotent=True,
+        job=job,
+        verify=False,
+        stream=STREAM_RESPONSES
+    )
+
+    if response.status_code != 200:
+        raise AgentError("❌ Error while calling the SnapLogic API")
+    if is_streaming(response):
+        # Hand tokens to the page as the pipeline produces them
+        for chunk in iter_stream(response):
+            job.emit(chunk)
+        return job.partial
+    result = read_json(response)
+    if 'choices' not in result:
+        raise AgentError("❌ Error in the SnapLogic API response", result.get('reason'))
+    return result['choices'][0]['message']['content'].replace("NEWLINE ", "**") + "**" + "\n\n"
+
+
+def answer(job: Job, prompt: str) -> str:
+    # Identical questions from any session share one cached SnapLogic run
+    reply, _ = get_response_cache().get_or_compute(
+        URL, prompt, lambda: fetch_reply(job, prompt), timeout=get_client().budget(URL)
+    )
+    return reply
+
+
+# Pick up replies that finished in the background
+for job in collect_finished(st.session_state.CRM_SQL_jobs):
+    with st.chat_message("assistant"):
+        if job.error is None:
+            reply = job.result()
+            if job.streamed:
+                st.markdown(reply)
+            else:
+                typewriter(reply)
+            # Add assistant response to chat history
+            st.session_state.CRM_SQL_messages.append({"role": "assistant", "content": reply})
+        elif isinstance(job.error, AgentError):
+            for line in filter(None, job.error.args):
+                st.error(line)
+        else:
+            st.error(f"❌ Exception occurred: {job.error}")
+
+degraded = get_client().degraded(URL)
+if degraded:
+    st.warning(degraded)
+
+# React to user input
+prompt = st.chat_input("Ask me anything")
+if prompt and not can_submit(st.session_state.CRM_SQL_jobs):
+    st.warning("⏳ Several questions are already running. Wait for one to finish or cancel it.")
+elif prompt and rate_limited():
+    st.warning("🚦 You're asking faster than this demo allows. Give it a few seconds and try again.")
+elif prompt:
+    # Add user message to chat history
+    st.session_state.CRM_SQL_messages.append({"role": "user", "content": prompt})
+    # Shown in place; the history above picks it up on the next rerun
+    with st.chat_message("user"):
+        st.markdown(prompt)
+    submit(st.session_state.CRM_SQL_jobs, "Working...", answer, prompt)
+
+render_jobs(st.session_state.CRM_SQL_jobs)
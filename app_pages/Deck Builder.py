@@ -1,12 +1,20 @@
 import streamlit as st
 
+from sl_common.agent import AgentError
+from sl_common.background import can_submit, collect_finished, render_jobs, submit
+from sl_common.deck import PPTX_MIME, build_deck, get_deck_template, get_model_client, plan_slides
+from sl_common.deck_cache import get_deck_cache
+from sl_common.profiling import phase
+
 st.set_page_config(
     page_title="SnapLogic Pitch Deck Generator",
     page_icon="⚡",
     layout="centered"
 )
 
-st.markdown("""
+# Counted as page setup when profiling
+with phase("config"):
+    st.markdown("""
 <style>
   [data-testid="stAppViewContainer"] {
     background: linear-gradient(135deg, #0a0f2e 0%, #0d2352 50%, #0a1a3e 100%);
@@ -48,10 +56,6 @@ st.markdown("""
     border: none !important; border-radius: 12px !important; padding: 14px !important; margin-top: 12px !important;
   }
   .divider { border-top: 1px solid rgba(255,255,255,0.08); margin: 20px 0; }
-  .next-steps {
-    background: rgba(255,255,255,0.04); border: 1px solid rgba(255,255,255,0.1);
-    border-radius: 10px; padding: 16px 20px; margin-top: 16px;
-  }
 </style>
 """, unsafe_allow_html=True)
 
@@ -60,7 +64,7 @@ st.markdown("""
   <div class="logo-icon">SL</div>
   <div>
     <div class="logo-title">SnapLogic Pitch Deck Generator</div>
-    <div class="logo-sub">Fill in details → copy prompt → paste into Claude.ai → download PPTX</div>
+    <div class="logo-sub">Fill in details → generate → download PPTX</div>
   </div>
 </div>
 <div class="badge">✦ Powered by Claude.ai</div>
@@ -108,25 +112,48 @@ REQUIREMENTS:
 - Every slide needs colored header bars, shapes, and visual layout — no plain text slides
 - Please generate the .pptx file and provide it as a download"""
 
-if st.button("✦ Generate My Claude Prompt"):
+if "deck_jobs" not in st.session_state:
+    st.session_state.deck_jobs = {}
+
+if st.button("✦ Generate My Deck"):
     if not customer.strip() or not snaplogic.strip():
         st.error("⚠️ Please fill in both fields before continuing.")
+    elif not can_submit(st.session_state.deck_jobs):
+        st.warning("⏳ Several decks are already being generated. Wait for one to finish or cancel it.")
     else:
+        # Slides are written in parallel in the background; the page stays usable meanwhile
+        submit(
+            st.session_state.deck_jobs, f"Writing {slide_num} slides...", build_deck,
+            plan_slides(customer, snaplogic, slide_num, tone_val), get_model_client(), get_deck_template(),
+            get_deck_cache(),
+        )
         st.session_state["prompt"] = build_prompt(customer, snaplogic, slide_num, tone_val)
 
-if "prompt" in st.session_state:
+for job in collect_finished(st.session_state.deck_jobs):
+    if job.error is None:
+        st.session_state["deck"] = job.result()
+        # The slide count the deck was built with, not the one selected now
+        st.session_state["deck_reused"] = (job.meta.get("reused", 0), job.meta.get("slides", 0))
+    elif isinstance(job.error, AgentError):
+        for line in filter(None, job.error.args):
+            st.error(line)
+    else:
+        st.error(f"❌ Exception occurred: {job.error}")
+
+render_jobs(st.session_state.deck_jobs, chat=False)
+
+if "deck" in st.session_state:
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-    st.markdown("### 📋 Copy this → paste into Claude.ai → get your PPTX")
-    st.code(st.session_state["prompt"], language=None)
+    st.download_button(
+        "⬇️ Download PPTX",
+        data=st.session_state["deck"],
+        file_name="SnapLogic_Pitch_Deck.pptx",
+        mime=PPTX_MIME,
+    )
+    reused, total = st.session_state.get("deck_reused", (0, 0))
+    if reused:
+        st.caption(f"♻️ Reused {reused} of {total} slides from earlier builds; only changed slides were regenerated.")
 
-    st.markdown("""
-    <div class="next-steps">
-      <div style="color:#00d4ff;font-weight:700;font-size:12px;letter-spacing:0.5px;margin-bottom:10px;">💡 NEXT STEPS</div>
-      <div style="color:rgba(255,255,255,0.65);font-size:13px;line-height:2.2;">
-        1️⃣ &nbsp;Click <strong style="color:white">Copy</strong> on the prompt above<br>
-        2️⃣ &nbsp;Open <strong style="color:white">claude.ai</strong> in a new tab<br>
-        3️⃣ &nbsp;Paste &amp; send — Claude builds your deck<br>
-        4️⃣ &nbsp;Download the <code style="color:#00d4ff">.pptx</code> file directly from Claude 🎉
-      </div>
-    </div>
-    """, unsafe_allow_html=True)
+if "prompt" in st.session_state:
+    with st.expander("📋 Prefer Claude.ai? Copy the prompt instead"):
+        st.code(st.session_state["prompt"], language=None)
@@ -0,0 +1,109 @@
+import uuid
+
+import streamlit as st
+
+from sl_common.admission import rate_limited
+from sl_common.agent import AgentError, read_json
+from sl_common.background import Job, can_submit, collect_finished, render_jobs, submit
+from sl_common.cache import Sized, get_response_cache
+from sl_common.config import get_config
+from sl_common.http import get_client
+from sl_common.results import ResultStore, build_reply, get_result_store, render_reply
+from sl_common.transcript import get_transcript, render_transcript
+
+# Endpoint, token and titles come from .env / the environment, loaded once per process
+AGENT = get_config().agents["snowflake"]
+URL = AGENT.url
+BEARER_TOKEN = AGENT.token
+page_title = AGENT.page_title
+title = AGENT.title
+
+st.set_page_config(page_title=page_title)
+
+st.title(title)
+
+st.markdown(
+    """  
+    ### This is a Snowflake Agent that allows Intuit users to gather information using Natural Language
+    Example Questions
+    - Show me opportunities with amount over 500000 with their related account details.
+    - What campaigns are completed and what were their performance metrics? Include names 
+    - How many tax payers missed the deadline in 2024?
+    """
+)
+
+get_transcript("SF_messages")
+
+if "SF_jobs" not in st.session_state:
+    st.session_state.SF_jobs = {}
+
+render_transcript(st.session_state.SF_messages, render_reply)
+
+def fetch_result(job: Job, prompt: str):
+    data = {"prompt": prompt}
+    headers = {
+        'Authorization': f'Bearer {BEARER_TOKEN}'
+    }
+    response = get_client().post(
+        url=URL,
+        json=data,
+        headers=headers,
+        idempotent=True,
+        job=job,
+        verify=False,
+        stream=True
+    )
+    if response.status_code != 200:
+        response.close()
+        raise AgentError(f"❌ Error from SnapLogic API: {response.status_code}")
+    # Decoded as it downloads; the first rows show up while the rest arrives
+    result = read_json(response, on_record=job.add_row)
+    return result, response.raw.tell()
+
+def answer(job: Job, prompt: str, results: ResultStore) -> dict:
+    """Runs on the background executor."""
+    cache = get_response_cache()
+
+    def fetch_reply() -> Sized:
+        result, size = fetch_result(job, prompt)
+        # Rows become a paged table; anything else size-capped Markdown bullets
+        return Sized(build_reply(result, results), size)
+
+    # Identical questions from any session share one SnapLogic run and the table saved from it
+    reply, cached = cache.get_or_compute(URL, prompt, fetch_reply, timeout=get_client().budget(URL))
+    if cached and reply.get("result_id") and not results.exists(reply["result_id"]):
+        # The saved table has been evicted from disk since
+        cache.discard(URL, prompt)
+        reply, _ = cache.get_or_compute(URL, prompt, fetch_reply, timeout=get_client().budget(URL))
+    # Each message gets its own id: a repeat question reuses the saved table but needs its own widgets
+    return dict(reply, message_id=uuid.uuid4().hex)
+
+# Pick up answers that finished in the background
+for job in collect_finished(st.session_state.SF_jobs):
+    if job.error is None:
+        reply = job.result()
+        with st.chat_message("assistant"):
+            render_reply(reply)
+        st.session_state.SF_messages.append(reply)
+    elif isinstance(job.error, AgentError):
+        st.error(str(job.error))
+    else:
+        st.error(f"❌ Exception occurred: {job.error}")
+
+degraded = get_client().degraded(URL)
+if degraded:
+    st.warning(degraded)
+
+prompt = st.chat_input("Ask me anything")
+if prompt and not can_submit(st.session_state.SF_jobs):
+    st.warning("⏳ Several questions are already running. Wait for one to finish or cancel it.")
+elif prompt and rate_limited():
+    st.warning("🚦 You're asking faster than this demo allows. Give it a few seconds and try again.")
+elif prompt:
+    st.session_state.SF_messages.append({"role": "user", "content": prompt})
+    # Shown in place; the history above picks it up on the next rerun
+    with st.chat_message("user"):
+        st.markdown(prompt)
+    submit(st.session_state.SF_jobs, "Working...", answer, prompt, get_result_store())
+
+render_jobs(st.session_state.SF_jobs)
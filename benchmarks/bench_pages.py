@@ -0,0 +1,250 @@
+"""Page benchmarks against the local SnapLogic stub.
+
+Starts ``tools/stub_server.py`` in-process, points every page at it and drives
+each page with ``streamlit.testing.v1.AppTest``: ``--sessions`` simulated users
+run concurrently, each sending ``--turns`` chat turns (or PO approvals) and
+then ``--reruns`` plain reruns. AppTest swaps a process-wide runtime while a
+script runs, so script runs are serialized; waiting, background jobs and the
+shared pool, cache and PO database still overlap across sessions. Reported per
+page:
+
+* ``rerun_ms``: time of a rerun with nothing to do, the cost of any widget click;
+* ``turn_ms``: submit to reply rendered (PO: approve to status applied);
+* ``session_kb``: size of the session's ``st.session_state`` after the turns.
+  Frames that share columns with the process-wide queue count in full, so
+  this is an upper bound.
+
+Results are compared with the saved baseline and the run fails when a metric
+regresses by more than ``--tolerance``::
+
+    python benchmarks/bench_pages.py                  # compare with the baseline
+    python benchmarks/bench_pages.py --save-baseline  # record a new baseline
+    python benchmarks/bench_pages.py --pages "CRM Agent" --sessions 8 --latency lognormal:0.3,0.5
+
+Timings depend on the machine; record the baseline on the machine that compares.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "pages.json")
+
+# page -> (script, kind, jobs key in session state)
+PAGES = {
+    "CRM Agent": ("app_pages/CRM Agent.py", "chat", "CRM_SQL_jobs"),
+    "CRM Agent - Thread History": ("app_pages/CRM Agent - Thread History.py", "chat", "CRM_SQL_thread_jobs"),
+    "Rays Agent": ("app_pages/Rays Agent.py", "chat", "Tampa_jobs"),
+    "Intuit Snowflake Agent": ("app_pages/Intuit Snowflake Agent.py", "chat", "SF_jobs"),
+    "Amazon PO Demo": ("app_pages/Amazon PO Demo.py", "po", "po_jobs"),
+}
+URL_VARS = ("SL_CRM_SQL_TASK_URL", "SL_Tampa_TASK_URL", "SL_SF_TASK_URL", "SL_PO_TASK_URL")
+# A metric only regresses when it is also this much worse in absolute terms, so
+# millisecond noise on fast paths does not fail the run.
+ABSOLUTE_SLACK = {"rerun_ms_p50": 5, "rerun_ms_p95": 20, "turn_ms_p50": 100, "turn_ms_p95": 300, "session_kb": 16}
+
+
+def deep_size(obj, seen: set = None) -> int:
+    """Approximate bytes held by ``obj`` and everything it references."""
+    import pandas as pd
+
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep=True).sum()) if isinstance(obj, pd.DataFrame) else int(obj.memory_usage(deep=True))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif type(obj).__module__.startswith("sl_common") and hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+def write_queue(path: str, rows: int):
+    import pandas as pd
+
+    # Rows pass the default approval policy, so every turn can approve: preferred suppliers,
+    # quantities within the tightest authority limit and a shortage date past every lead time
+    pd.DataFrame({
+        "rec_id": [f"R-{i:07d}" for i in range(rows)],
+        "sku": [f"SKU{i % 5000:05d}" for i in range(rows)],
+        "location": [("DAL-DC", "RNO-DC", "PHX-DC", "ATL-DC")[i % 4] for i in range(rows)],
+        "shortage_date": [(date.today() + timedelta(days=30 + i % 30)).strftime("%m/%d/%Y") for i in range(rows)],
+        "recommended_qty": [100 + i % 2000 for i in range(rows)],
+        "supplier": [f"Supplier {chr(65 + i % 3)}" for i in range(rows)],
+        "safety_stock": 3000,
+        "on_hand": [i % 3000 for i in range(rows)],
+        "inbound": 200,
+        "forecast_gap": [500 + i % 4000 for i in range(rows)],
+        "reason": "Forecast < Safety Stock",
+        "status": "Pending",
+    }).to_csv(path, index=False)
+
+
+_RUN_LOCK = threading.Lock()
+
+
+def _run(at) -> float:
+    """Rerun ``at``; returns the script time in ms, excluding the wait for the lock."""
+    with _RUN_LOCK:
+        start = time.perf_counter()
+        at.run()
+        return (time.perf_counter() - start) * 1000
+
+
+def _wait_for_jobs(at, jobs_key: str, timeout: float, poll: float):
+    deadline = time.monotonic() + timeout
+    while at.session_state[jobs_key]:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{jobs_key} still running after {timeout}s")
+        time.sleep(poll)
+        _run(at)
+
+
+def run_session(script: str, kind: str, jobs_key: str, index: int, args) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=args.timeout)
+    _run(at)
+    turn_ms = []
+    for turn in range(args.turns):
+        start = time.perf_counter()
+        if kind == "chat":
+            at.chat_input[0].set_value(f"session {index} question {turn}")
+        else:
+            # The chooser lists the most urgent rows only; each turn takes a different one
+            chooser = next(s for s in at.selectbox if s.label.startswith("🔍"))
+            chooser.set_value(chooser.options[(index * args.turns + turn) % len(chooser.options)])
+            _run(at)
+            next(b for b in at.button if b.label.startswith("✅ Approve &")).click()
+        _run(at)
+        _wait_for_jobs(at, jobs_key, args.timeout, args.poll)
+        turn_ms.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    rerun_ms = [_run(at) for _ in range(args.reruns)]
+    return {"turn_ms": turn_ms, "rerun_ms": rerun_ms, "session_kb": deep_size(at.session_state.to_dict()) / 1024}
+
+
+def bench_page(name: str, args) -> dict:
+    script, kind, jobs_key = PAGES[name]
+    results, errors = [None] * args.sessions, []
+
+    def worker(i):
+        try:
+            results[i] = run_session(script, kind, jobs_key, i, args)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    turns = [ms for r in results for ms in r["turn_ms"]]
+    reruns = [ms for r in results for ms in r["rerun_ms"]]
+    return {
+        "rerun_ms_p50": round(statistics.median(reruns), 1),
+        "rerun_ms_p95": round(percentile(reruns, 0.95), 1),
+        "turn_ms_p50": round(statistics.median(turns), 1),
+        "turn_ms_p95": round(percentile(turns, 0.95), 1),
+        "session_kb": round(statistics.mean(r["session_kb"] for r in results), 1),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for page, metrics in current.items():
+        for metric, value in metrics.items():
+            base = baseline.get(page, {}).get(metric)
+            if base is not None and value > base * (1 + tolerance) and value - base > ABSOLUTE_SLACK.get(metric, 0):
+                regressions.append(f"{page}: {metric} {base} -> {value}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="*", default=list(PAGES), choices=list(PAGES))
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated sessions per page")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--mode", default="choices", help="stub response mode for chat pages")
+    parser.add_argument("--latency", default="fixed:0.05", help="stub time to first byte distribution")
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--po-rows", type=int, default=10000, help="rows in the generated PO queue")
+    parser.add_argument("--poll", type=float, default=0.05, help="seconds between reruns while waiting for a reply")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    from stub_server import make_server
+
+    server = make_server(mode=args.mode, latency=args.latency, words=args.words, token_delay=args.token_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    workdir = tempfile.mkdtemp(prefix="sl-bench-")
+    for var in URL_VARS:
+        os.environ[var] = f"http://127.0.0.1:{server.server_port}/{var.lower()}"
+    os.environ["SL_PO_RECS_PATH"] = os.path.join(workdir, "recs.csv")
+    os.environ["SL_PO_DB_PATH"] = os.path.join(workdir, "po_status.sqlite3")
+    os.environ.setdefault("SL_TYPEWRITER_SPEED", "0")
+    # Keep deprecation warnings and their stack traces out of the report
+    from streamlit import logger
+
+    logger.set_log_level("error")
+    write_queue(os.environ["SL_PO_RECS_PATH"], args.po_rows)
+
+    config = {k: getattr(args, k) for k in ("sessions", "turns", "reruns", "mode", "latency", "words", "token_delay", "po_rows")}
+    current = {}
+    print(f"{'page':<30} {'rerun p50':>10} {'rerun p95':>10} {'turn p50':>10} {'turn p95':>10} {'session KB':>11}")
+    for name in args.pages:
+        current[name] = bench_page(name, args)
+        m = current[name]
+        print(f"{name:<30} {m['rerun_ms_p50']:>10} {m['rerun_ms_p95']:>10} {m['turn_ms_p50']:>10} {m['turn_ms_p95']:>10} {m['session_kb']:>11}")
+    stub_stats = server.RequestHandlerClass.stats
+    print(f"stub: {dict(stub_stats)}")
+    server.shutdown()
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "pages": current}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to record one.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"⚠️ Baseline was recorded with {baseline.get('config')}; comparison may be meaningless.")
+    regressions = compare(current, baseline["pages"], args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Render cost of the legacy typewriter vs. the shared incremental renderer.
+
+Both run with pacing off against a fake placeholder that only counts what
+would be sent to the frontend, so the numbers isolate string building and
+websocket payload size from Streamlit itself::
+
+    python benchmarks/bench_render.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sl_common.render import IncrementalRenderer  # noqa: E402
+
+
+class CountingContainer:
+    def __init__(self):
+        self.updates = 0
+        self.bytes_sent = 0
+
+    def markdown(self, text):
+        self.updates += 1
+        self.bytes_sent += len(text)
+
+
+def legacy_typewriter(text, container):
+    tokens = text.split()
+    for index in range(len(tokens) + 1):
+        container.markdown(" ".join(tokens[:index]))
+
+
+def incremental(text, container):
+    renderer = IncrementalRenderer(container)
+    for word in text.split(" "):
+        renderer.append(word + " ")
+    renderer.flush()
+
+
+def run(fn, text):
+    container = CountingContainer()
+    start = time.perf_counter()
+    fn(text, container)
+    return time.perf_counter() - start, container
+
+
+def main():
+    print(f"{'words':>7} | {'legacy ms':>10} {'updates':>8} {'KB sent':>10} | {'incr ms':>8} {'updates':>8} {'KB sent':>8}")
+    for words in (100, 500, 2000, 8000, 32000):
+        text = " ".join(f"token{i % 97}" for i in range(words))
+        legacy_s, legacy = run(legacy_typewriter, text)
+        incr_s, incr = run(incremental, text)
+        print(
+            f"{words:>7} | {legacy_s * 1000:>10.1f} {legacy.updates:>8} {legacy.bytes_sent / 1024:>10.0f} | "
+            f"{incr_s * 1000:>8.1f} {incr.updates:>8} {incr.bytes_sent / 1024:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Cold-start cost of each page: imports and first paint in a fresh process.
+
+Every sample starts a new interpreter, imports Streamlit, then runs the page
+once with ``streamlit.testing.v1.AppTest`` against the local stub. Reported
+per page (median of ``--repeats`` samples):
+
+* ``first_paint_ms``: the first script run, including the imports it triggers;
+* ``modules``: modules imported by that run;
+* ``heavy``: which of pandas, pyarrow, requests, anthropic, pptx it imported.
+
+Like ``bench_pages.py`` the result is compared with a saved baseline::
+
+    python benchmarks/bench_startup.py                  # compare with the baseline
+    python benchmarks/bench_startup.py --save-baseline  # record a new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "startup.json")
+PAGES = ["GenAI_Demo.py", *sorted(f"app_pages/{name}" for name in os.listdir(os.path.join(ROOT, "app_pages")) if name.endswith(".py"))]
+HEAVY = ("pandas", "pyarrow", "requests", "anthropic", "pptx")
+ABSOLUTE_SLACK = {"first_paint_ms": 50, "modules": 20}
+
+_PROBE = """
+import json, sys, time
+import streamlit
+from streamlit import logger
+from streamlit.testing.v1 import AppTest
+logger.set_log_level("error")
+before = set(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({
+    "first_paint_ms": elapsed * 1000,
+    "modules": len(loaded),
+    "heavy": sorted(m for m in sys.argv[2].split(",") if m in loaded),
+    "exception": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def sample(page: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, os.path.join(ROOT, page), ",".join(HEAVY)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    if result["exception"]:
+        raise RuntimeError(f"{page}: {result['exception'][0]}")
+    return result
+
+
+def bench_page(page: str, repeats: int, env: dict) -> dict:
+    samples = [sample(page, env) for _ in range(repeats)]
+    return {
+        "first_paint_ms": round(statistics.median(s["first_paint_ms"] for s in samples), 1),
+        "modules": int(statistics.median(s["modules"] for s in samples)),
+        "heavy": samples[-1]["heavy"],
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for page, metrics in current.items():
+        for metric, slack in ABSOLUTE_SLACK.items():
+            base, value = baseline.get(page, {}).get(metric), metrics[metric]
+            if base is not None and value > base * (1 + tolerance) and value - base > slack:
+                regressions.append(f"{page}: {metric} {base} -> {value}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="*", default=PAGES, choices=PAGES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    from stub_server import make_server
+
+    server = make_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = f"http://127.0.0.1:{server.server_port}"
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "ANTHROPIC_BASE_URL": stub,
+        **{var: f"{stub}/{var.lower()}" for var in ("SL_CRM_SQL_TASK_URL", "SL_Tampa_TASK_URL", "SL_SF_TASK_URL", "SL_PO_TASK_URL")},
+    }
+
+    current = {}
+    print(f"{'page':<40} {'first paint ms':>15} {'modules':>8}  heavy imports")
+    for page in args.pages:
+        current[page] = bench_page(page, args.repeats, env)
+        m = current[page]
+        print(f"{page:<40} {m['first_paint_ms']:>15} {m['modules']:>8}  {', '.join(m['heavy']) or '-'}")
+    server.shutdown()
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"config": {"repeats": args.repeats}, "pages": current}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to record one.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline["pages"], args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
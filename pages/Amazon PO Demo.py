@@ -1,314 +0,0 @@
-import streamlit as st
-import pandas as pd
-import time
-import requests
-from urllib.parse import quote
-
-# -----------------------------
-# Page config
-# -----------------------------
-st.set_page_config(page_title="PO Creation Workbench", layout="wide", page_icon="🛒")
-
-# -----------------------------
-# Custom Styling
-# -----------------------------
-st.markdown("""
-    <style>
-    .stButton>button[kind="primary"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border: none;
-        border-radius: 8px;
-        height: 3em;
-        font-weight: 600;
-    }
-    .stButton>button { border-radius: 8px; height: 3em; font-weight: 500; }
-    [data-testid="stMetricValue"] { font-size: 28px; font-weight: 700; }
-    h1 {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text; -webkit-text-fill-color: transparent;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# -----------------------------
-# Mock data for the demo (replace with your model output)
-# -----------------------------
-@st.cache_data
-def load_recommendations():
-    data = [
-        {
-            "rec_id": "R-1001",
-            "sku": "ABC123",
-            "location": "DAL-DC",
-            "shortage_date": "11/18/2025",
-            "recommended_qty": 4500,
-            "supplier": "Supplier A",
-            "safety_stock": 3000,
-            "on_hand": 1200,
-            "inbound": 200,
-            "forecast_gap": 3100,
-            "reason": "Forecast < Safety Stock",
-            "status": "Pending",
-        },
-        {
-            "rec_id": "R-1002",
-            "sku": "FGH987",
-            "location": "RNO-DC",
-            "shortage_date": "11/12/2025",
-            "recommended_qty": 800,
-            "supplier": "Supplier C",
-            "safety_stock": 2000,
-            "on_hand": 1600,
-            "inbound": 0,
-            "forecast_gap": 900,
-            "reason": "Seasonal demand increase",
-            "status": "Pending",
-        },
-        {
-            "rec_id": "R-1003",
-            "sku": "XYZ555",
-            "location": "PHX-DC",
-            "shortage_date": "11/20/2025",
-            "recommended_qty": 1200,
-            "supplier": "Supplier B",
-            "safety_stock": 1500,
-            "on_hand": 400,
-            "inbound": 50,
-            "forecast_gap": 1050,
-            "reason": "Backorder depletion",
-            "status": "Pending",
-        },
-    ]
-    df = pd.DataFrame(data)
-    # placeholders for ERP response enrichment
-    df["internal_id"] = None
-    df["url"] = None
-    return df
-
-if "recs" not in st.session_state:
-    st.session_state.recs = load_recommendations()
-
-# -----------------------------
-# Sidebar filters & configuration
-# -----------------------------
-st.sidebar.header("🔧 Filters & Configuration")
-
-location_filter = st.sidebar.multiselect(
-    "📍 Location", options=sorted(st.session_state.recs["location"].unique()), default=[]
-)
-supplier_filter = st.sidebar.multiselect(
-    "🏭 Supplier", options=sorted(st.session_state.recs["supplier"].unique()), default=[]
-)
-
-erp = st.sidebar.selectbox("💼 ERP System", ["SAP", "NetSuite"], index=0)
-env = st.sidebar.selectbox("🌐 Environment", ["Dev", "QA", "Prod"], index=0)
-
-# Always-send static account params (no conditionals)
-NS_ACCOUNT_NAME = "../../shared/NS_Token account_2018_2_TimToken vld 10.25.2023"
-SAP_ACCOUNT_NAME = "SAP_prod"
-NS_account_param = quote(NS_ACCOUNT_NAME, safe="")
-SAP_account_param = quote(SAP_ACCOUNT_NAME, safe="")
-
-st.sidebar.divider()
-st.sidebar.caption("Approving posts one JSON payload to a SnapLogic pipeline which creates the PO and returns status.")
-
-if st.sidebar.button("🔄 Refresh Data", use_container_width=True):
-    st.cache_data.clear()
-    st.rerun()
-
-# -----------------------------
-# Header stats
-# -----------------------------
-st.title("🛒 Review & Approve Suggested POs")
-
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("📋 Pending recommendations", int((st.session_state.recs["status"] == "Pending").sum()))
-with col2:
-    created = len([s for s in st.session_state.recs["status"] if "Created" in str(s)])
-    st.metric("✅ Created today", created)
-with col3:
-    failures = int((st.session_state.recs["status"] == "Failed").sum())
-    st.metric("⚠️ Failures (24h)", failures)
-
-# -----------------------------
-# Filtered table
-# -----------------------------
-df = st.session_state.recs.copy()
-if location_filter:
-    df = df[df["location"].isin(location_filter)]
-if supplier_filter:
-    df = df[df["supplier"].isin(supplier_filter)]
-
-st.subheader("📦 Recommendations queue")
-st.data_editor(
-    df[["rec_id","sku","location","shortage_date","recommended_qty","supplier","forecast_gap","reason","status"]],
-    column_config={
-        "rec_id": st.column_config.Column("🆔 Rec ID", disabled=True),
-        "sku": st.column_config.Column("📦 SKU", disabled=True),
-        "location": st.column_config.Column("📍 Location", disabled=True),
-        "shortage_date": st.column_config.Column("📅 Shortage Date", disabled=True),
-        "recommended_qty": st.column_config.NumberColumn("🔢 Recommended Qty", disabled=True),
-        "supplier": st.column_config.Column("🏭 Supplier", disabled=True),
-        "forecast_gap": st.column_config.NumberColumn("📊 Forecast Gap", disabled=True),
-        "reason": st.column_config.Column("💡 Reason / Driver", disabled=True),
-        "status": st.column_config.Column("✓ Status", disabled=True),
-    },
-    hide_index=True, use_container_width=True, num_rows="dynamic", disabled=True,
-)
-
-# -----------------------------
-# Row chooser
-# -----------------------------
-st.divider()
-left, right = st.columns([2, 1])
-with left:
-    chosen_id = st.selectbox("🔍 Select a recommendation to review", options=df["rec_id"].tolist())
-    chosen = df[df["rec_id"] == chosen_id].iloc[0].to_dict()
-
-with right:
-    st.download_button("📥 Download queue (CSV)", data=df.to_csv(index=False), file_name="po_recommendations.csv")
-
-# -----------------------------
-# Detail & approval panel
-# -----------------------------
-with st.container(border=True):
-    st.subheader("📄 Recommendation details")
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("📦 SKU", chosen["sku"])
-    c2.metric("📍 Location", chosen["location"])
-    c3.metric("📅 Shortage date", chosen["shortage_date"])
-    c4.metric("🔢 Rec qty", int(chosen["recommended_qty"]))
-
-    st.write(
-        f"**🏭 Supplier:** {chosen['supplier']}  |  **💡 Reason:** {chosen['reason']}  |  **📊 Forecast gap:** {int(chosen['forecast_gap'])}"
-    )
-
-    st.markdown("---")
-    st.markdown("**📝 Business justification**")
-    justification = st.text_area(
-        "",
-        value=f"Auto-generated: {chosen['reason']} (gap {int(chosen['forecast_gap'])})",
-        height=90,
-    )
-
-    st.markdown("**✅ Policy checks**")
-    pc_ok = chosen["recommended_qty"] >= 0 and chosen["recommended_qty"] <= 10000
-    st.checkbox("✓ Supplier is preferred", value=True, disabled=True)
-    st.checkbox("✓ Within buyer authority limit", value=True, disabled=True)
-    st.checkbox("✓ Delivery window acceptable", value=True, disabled=True)
-
-    st.divider()
-    colA, colB, colC = st.columns([1,1,2])
-
-    def build_payload(row: dict) -> dict:
-        return {
-            "rec_id": row["rec_id"],
-            "sku": row["sku"],
-            "sku_id": "15",
-            "internal_id": "11486",
-            "location": row["location"],
-            "shortage_date": row["shortage_date"],
-            "recommended_qty": int(row["recommended_qty"]),
-            "supplier": row["supplier"],
-            "justification": justification,
-            "erp": erp,
-            "environment": env,
-        }
-
-    with colA:
-        approve = st.button("✅ Approve & Create PO", type="primary", use_container_width=True, disabled=not pc_ok)
-    with colB:
-        reject = st.button("❌ Reject", use_container_width=True)
-    with colC:
-        st.caption("Approving will call the SnapLogic pipeline")
-
-    if approve:
-        payload = build_payload(chosen)
-        with st.status("🔄 Creating PO via SnapLogic…", expanded=True) as status:
-            st.write("📤 Posting payload to SnapLogic pipeline endpoint…")
-            time.sleep(0.6)
-            try:
-                # Always include both query params
-                SL_ENDPOINT = (
-                    "https://elastic.snaplogic.com/api/1/rest/slsched/feed/ConnectFasterInc/"
-                    "Dylan%20Vetter/DemoBucket/Amazon%20PO%20creation%20Task"
-                    f"?bearer_token=12345"
-                    f"&NS_accountName={NS_account_param}"
-                    f"&SAP_accountName={SAP_account_param}"
-                )
-
-                res = requests.post(SL_ENDPOINT, json=payload, timeout=60)
-
-                # Treat any 2xx as success
-                if 200 <= res.status_code < 300:
-                    # Try to extract internal_id and url if present
-                    internal_id, link_url = None, None
-                    try:
-                        body = res.json()
-                        if isinstance(body, list) and body:
-                            body = body[0]
-                        if isinstance(body, dict):
-                            internal_id = body.get("internal_id") or body.get("po_number") or body.get("id")
-                            link_url = body.get("url")
-                    except Exception:
-                        pass
-
-                    po_number = internal_id or "PO-CREATED"
-
-                    # Update in-memory table
-                    mask = st.session_state.recs["rec_id"] == chosen["rec_id"]
-                    st.session_state.recs.loc[mask, "status"] = f"Created: {po_number}"
-                    if internal_id:
-                        st.session_state.recs.loc[mask, "internal_id"] = internal_id
-                    if link_url:
-                        st.session_state.recs.loc[mask, "url"] = link_url
-
-                    status.update(label="✅ PO created", state="complete")
-                    st.toast("🎉 PO created", icon="✅")
-                    st.rerun()
-                else:
-                    raise Exception(f"Non-2xx status code: {res.status_code}")
-
-            except Exception as e:
-                st.error(f"❌ Failed to create PO: {e}")
-                st.session_state.recs.loc[
-                    st.session_state.recs["rec_id"] == chosen["rec_id"], "status"
-                ] = "Failed"
-                st.toast("PO creation failed", icon="❌")
-                status.update(label="Failed", state="error")
-                st.stop()
-
-    if reject:
-        st.session_state.recs.loc[
-            st.session_state.recs["rec_id"] == chosen["rec_id"], "status"
-        ] = "Rejected"
-        st.toast(f"🚫 Recommendation {chosen['rec_id']} rejected", icon="❌")
-        st.rerun()
-
-# -----------------------------
-# Activity log (with SalesOrder ID + clickable URL)
-# -----------------------------
-st.subheader("📜 Activity log")
-log_df = st.session_state.recs.copy()[["rec_id", "sku", "location", "status", "internal_id", "url"]]
-st.dataframe(
-    log_df,
-    use_container_width=True,
-    hide_index=True,
-    column_config={
-        "url": st.column_config.LinkColumn("URL", display_text="Open in ERP"),
-        "internal_id": st.column_config.Column("ERP Ref ID"),
-    },
-)
-
-# -----------------------------
-# Footer
-# -----------------------------
-st.divider()
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.caption("🔧 Powered by SnapLogic")
-with col2:
-    st.caption(f"📅 Last updated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}")
-with col3:
-    st.caption(f"🌐 Environment: {env} | ERP: {erp}")
@@ -0,0 +1,6 @@
+"""Shared helpers for the SnapLogic Agent Creator demo pages."""
+from sl_common import config
+
+# Before any submodule reads its SL_* settings
+config.load_env()
+config.validate()
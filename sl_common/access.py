@@ -0,0 +1,29 @@
+"""Who may change server-wide settings from the Admin page.
+
+Anyone who can reach the app can open the Admin page, so its numbers are
+read-only unless the visitor is an admin: signed in through Streamlit's
+``st.login`` with an email listed in ``SL_ADMIN_EMAILS`` (comma-separated), or
+holding ``SL_ADMIN_TOKEN``. With neither set, nobody is, and resetting metrics,
+clearing caches or switching on profiling for everyone is left to a restart.
+"""
+import hmac
+import os
+
+import streamlit as st
+
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("SL_ADMIN_EMAILS", "").split(",") if e.strip()}
+ADMIN_TOKEN = os.getenv("SL_ADMIN_TOKEN", "")
+
+
+def signed_in_email() -> str:
+    """The signed-in user's email; empty when authentication is not configured or nobody signed in."""
+    # st.user carries a placeholder email in local development, so only trust it after st.login
+    if not st.user.get("is_logged_in"):
+        return ""
+    return str(st.user.get("email") or "").lower()
+
+
+def is_admin(token: str = "") -> bool:
+    if ADMIN_EMAILS and signed_in_email() in ADMIN_EMAILS:
+        return True
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
@@ -0,0 +1,309 @@
+"""Server-wide admission control for outbound SnapLogic calls.
+
+When a demo goes out to a large audience every session calls the same
+feed-master queue at once. ``SnapLogicClient.request`` therefore waits for a
+slot before sending:
+
+* at most ``SL_MAX_CALLS`` calls are in flight for the whole server and
+  ``SL_MAX_CALLS_PER_ENDPOINT`` per endpoint; a slot is held until the response
+  body has been read or the response closed;
+* callers wait in one FIFO queue, and the oldest waiter whose endpoint has room
+  goes first, so a saturated endpoint does not hold up calls to the others;
+  a waiting job's ``queue_position`` is shown by ``render_jobs``;
+* a call that waits longer than ``SL_QUEUE_TIMEOUT`` seconds, or arrives when
+  ``SL_MAX_QUEUE`` calls are already waiting, fails with ``Overloaded``.
+
+Each session may also start ``SL_SESSION_RATE`` calls per minute (bursts of
+``SL_SESSION_BURST``); pages check ``rate_limited()`` before submitting.
+Queue depth, wait times and rejections are on the Admin page and in the
+Prometheus output.
+"""
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+
+from sl_common.agent import AgentError
+from sl_common.metrics import Histogram, escape_label, histogram_lines
+from sl_common.state import session_id
+
+MAX_CALLS = int(os.getenv("SL_MAX_CALLS", "32"))
+MAX_CALLS_PER_ENDPOINT = int(os.getenv("SL_MAX_CALLS_PER_ENDPOINT", "8"))
+MAX_QUEUE = int(os.getenv("SL_MAX_QUEUE", "200"))
+QUEUE_TIMEOUT = float(os.getenv("SL_QUEUE_TIMEOUT", "120"))
+SESSION_RATE = float(os.getenv("SL_SESSION_RATE", "10"))
+SESSION_BURST = int(os.getenv("SL_SESSION_BURST", "3"))
+
+# How often a waiting caller checks whether its job was cancelled
+_WAIT_POLL = 0.25
+_MAX_BUCKETS = 10000
+
+
+class Overloaded(AgentError):
+    """No slot could be given to the call in time."""
+
+
+class Slot:
+    """One admitted call; releasing it lets the next waiter in."""
+
+    def __init__(self, admission: "Admission", endpoint: str):
+        self.admission = admission
+        self.endpoint = endpoint
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.admission._release(self.endpoint)
+
+    def attach(self, response):
+        """Hold the slot until ``response``'s body is read or it is closed."""
+        iter_content, close = response.iter_content, response.close
+
+        def releasing_iter_content(*args, **kwargs):
+            try:
+                yield from iter_content(*args, **kwargs)
+            finally:
+                self.release()
+
+        def releasing_close():
+            self.release()
+            close()
+
+        response.iter_content = releasing_iter_content
+        response.close = releasing_close
+        # A response dropped without being read or closed must not leak the slot
+        weakref.finalize(response, self.release)
+        return response
+
+
+class _Waiter:
+    def __init__(self, endpoint: str, job):
+        self.endpoint = endpoint
+        self.job = job
+        self.enqueued_at = time.monotonic()
+        self.admitted = threading.Event()
+
+
+class _Bucket:
+    def __init__(self, capacity: float):
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+
+class Admission:
+    """Concurrency limits and a fair FIFO wait queue shared by every session."""
+
+    def __init__(self, max_calls: int = MAX_CALLS, max_per_endpoint: int = MAX_CALLS_PER_ENDPOINT,
+                 max_queue: int = MAX_QUEUE, queue_timeout: float = QUEUE_TIMEOUT,
+                 session_rate: float = SESSION_RATE, session_burst: int = SESSION_BURST):
+        self.max_calls = max_calls
+        self.max_per_endpoint = max_per_endpoint
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.in_flight = 0
+        self._by_endpoint = Counter()
+        self._queue = deque()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.peak_queue = 0
+        self.admitted = Counter()
+        self.queued = Counter()
+        self.rejected = Counter()     # queue full
+        self.timed_out = Counter()
+        self.rate_limited = 0
+        self.wait = Histogram()
+
+    def _has_room(self, endpoint: str) -> bool:
+        return self.in_flight < self.max_calls and self._by_endpoint[endpoint] < self.max_per_endpoint
+
+    def _admit(self, endpoint: str, waited: float):
+        self.in_flight += 1
+        self._by_endpoint[endpoint] += 1
+        self.admitted[endpoint] += 1
+        self.wait.observe(waited)
+
+    def _dispatch(self):
+        """Admit waiters in arrival order while there is room; caller holds the lock."""
+        now = time.monotonic()
+        waiting = deque()
+        for waiter in self._queue:
+            if self._has_room(waiter.endpoint):
+                self._admit(waiter.endpoint, now - waiter.enqueued_at)
+                if waiter.job is not None:
+                    waiter.job.queue_position = None
+                waiter.admitted.set()
+            else:
+                waiting.append(waiter)
+        self._queue = waiting
+        seen = set()
+        for position, waiter in enumerate(waiting, 1):
+            if waiter.job is not None and waiter.job.id not in seen:
+                seen.add(waiter.job.id)
+                waiter.job.queue_position = position
+
+    def acquire(self, endpoint: str, job=None, timeout: float = None) -> Slot:
+        """Wait for a slot for a call to ``endpoint``.
+
+        ``job`` (a ``background.Job``) gets its queue position while it waits
+        and stops waiting when it is cancelled.
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._lock:
+            if not self._queue and self._has_room(endpoint):
+                self._admit(endpoint, 0.0)
+                return Slot(self, endpoint)
+            if len(self._queue) >= self.max_queue:
+                self.rejected[endpoint] += 1
+                raise Overloaded(
+                    "⏳ The SnapLogic agents are handling as many requests as they can right now. "
+                    "Please try again in a minute."
+                )
+            waiter = _Waiter(endpoint, job)
+            self._queue.append(waiter)
+            self.queued[endpoint] += 1
+            self.peak_queue = max(self.peak_queue, len(self._queue))
+            self._dispatch()
+        give_up_at = waiter.enqueued_at + timeout
+        try:
+            while not waiter.admitted.wait(_WAIT_POLL):
+                if job is not None:
+                    job.check_cancelled()
+                if time.monotonic() >= give_up_at:
+                    with self._lock:
+                        self.timed_out[endpoint] += 1
+                    raise Overloaded(
+                        f"⏳ Waited {timeout:.0f}s for a free SnapLogic slot without getting one. "
+                        "The agents are very busy; please try again shortly."
+                    )
+        except BaseException:
+            with self._lock:
+                if waiter.admitted.is_set():
+                    # Admitted just as we gave up: hand the slot on
+                    self._release_locked(endpoint)
+                else:
+                    self._queue.remove(waiter)
+                    if job is not None:
+                        job.queue_position = None
+                    self._dispatch()
+            raise
+        return Slot(self, endpoint)
+
+    def _release_locked(self, endpoint: str):
+        self.in_flight -= 1
+        self._by_endpoint[endpoint] -= 1
+        self._dispatch()
+
+    def _release(self, endpoint: str):
+        with self._lock:
+            self._release_locked(endpoint)
+
+    def take(self, session_id: str) -> float:
+        """Spend one of the session's call tokens; seconds until one is available when none is left."""
+        if self.session_rate <= 0:
+            return 0.0
+        per_second = self.session_rate / 60
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(session_id)
+            if bucket is None:
+                if len(self._buckets) >= _MAX_BUCKETS:
+                    self._prune(now, per_second)
+                bucket = self._buckets[session_id] = _Bucket(self.session_burst)
+            bucket.tokens = min(self.session_burst, bucket.tokens + (now - bucket.updated) * per_second)
+            bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0.0
+            self.rate_limited += 1
+            return (1 - bucket.tokens) / per_second
+
+    def _prune(self, now: float, per_second: float):
+        """Forget sessions whose bucket has refilled; they start full again anyway."""
+        for session_id, bucket in list(self._buckets.items()):
+            if bucket.tokens + (now - bucket.updated) * per_second >= self.session_burst:
+                del self._buckets[session_id]
+
+    def stats(self) -> dict:
+        def ms(q):
+            value = self.wait.percentile(q)
+            return None if value is None else round(value * 1000, 1)
+
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_calls": self.max_calls,
+                "queue_depth": len(self._queue),
+                "peak_queue_depth": self.peak_queue,
+                "admitted": sum(self.admitted.values()),
+                "queued": sum(self.queued.values()),
+                "rejected": sum(self.rejected.values()),
+                "timed_out": sum(self.timed_out.values()),
+                "rate_limited": self.rate_limited,
+                "wait_p50_ms": ms(0.5),
+                "wait_p95_ms": ms(0.95),
+                "wait_p99_ms": ms(0.99),
+            }
+
+    def endpoint_stats(self) -> dict:
+        """In-flight and waiting calls plus admission counters keyed by endpoint."""
+        with self._lock:
+            waiting = Counter(waiter.endpoint for waiter in self._queue)
+            endpoints = set(self.admitted) | set(waiting) | set(self.rejected) | set(self.timed_out)
+            return {
+                endpoint: {
+                    "in_flight": self._by_endpoint[endpoint],
+                    "limit": self.max_per_endpoint,
+                    "waiting": waiting[endpoint],
+                    "admitted": self.admitted[endpoint],
+                    "queued": self.queued[endpoint],
+                    "rejected": self.rejected[endpoint],
+                    "timed_out": self.timed_out[endpoint],
+                }
+                for endpoint in sorted(endpoints)
+            }
+
+    def prometheus(self) -> str:
+        """Admission metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind, doc):
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            waiting = Counter(waiter.endpoint for waiter in self._queue)
+            header("snaplogic_admission_in_flight", "gauge", "Admitted calls still holding a slot.")
+            lines.append(f"snaplogic_admission_in_flight {self.in_flight}")
+            header("snaplogic_admission_queue_depth", "gauge", "Calls waiting for a slot.")
+            lines.append(f"snaplogic_admission_queue_depth {len(self._queue)}")
+            for name, counter, doc in (
+                ("snaplogic_admission_admitted_total", self.admitted, "Calls given a slot."),
+                ("snaplogic_admission_queued_total", self.queued, "Calls that had to wait for a slot."),
+                ("snaplogic_admission_rejected_total", self.rejected, "Calls refused because the queue was full."),
+                ("snaplogic_admission_timeouts_total", self.timed_out, "Calls that gave up waiting for a slot."),
+            ):
+                header(name, "counter", doc)
+                for endpoint, n in counter.items():
+                    lines.append(f'{name}{{endpoint="{escape_label(endpoint)}"}} {n}')
+            header("snaplogic_admission_waiting", "gauge", "Calls waiting for a slot by endpoint.")
+            for endpoint, n in waiting.items():
+                lines.append(f'snaplogic_admission_waiting{{endpoint="{escape_label(endpoint)}"}} {n}')
+            header("snaplogic_admission_rate_limited_total", "counter", "Calls refused by the per-session rate limit.")
+            lines.append(f"snaplogic_admission_rate_limited_total {self.rate_limited}")
+            header("snaplogic_admission_wait_seconds", "histogram", "Time spent waiting for a slot.")
+            lines.extend(histogram_lines("snaplogic_admission_wait_seconds", self.wait))
+        return "\n".join(lines) + "\n"
+
+
+def rate_limited() -> float:
+    """Take one call from this session's allowance; seconds to wait when it is used up, else 0."""
+    from sl_common.http import get_client
+
+    return get_client().admission.take(session_id())
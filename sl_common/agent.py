@@ -0,0 +1,274 @@
+"""Helpers for reading SnapLogic agent task responses.
+
+Task endpoints either return one JSON document (``choices`` or ``response``) or,
+when the pipeline supports it, stream the answer as Server-Sent Events, NDJSON
+or plain chunked text. ``iter_stream`` yields text as it arrives, which a
+background job passes to ``job.emit`` for its polling fragment to show.
+
+JSON documents are read with ``read_json``, which decodes the body as it
+arrives instead of buffering it for ``response.json()``: text is dropped once
+parsed, records of a top-level array (or of an array under a top-level key)
+are handed to a callback as soon as each is complete, and bodies over
+``SL_MAX_RESPONSE_MB`` are refused.
+"""
+import codecs
+import json
+import os
+import re
+from typing import Callable, Iterable, Iterator
+
+import requests
+
+STREAM_RESPONSES = os.getenv("SL_STREAM_RESPONSES", "true").lower() == "true"
+# Sent with agent requests so streaming-capable pipelines can opt in.
+STREAM_ACCEPT = "text/event-stream, application/x-ndjson;q=0.9, application/json;q=0.8"
+MAX_RESPONSE_MB = float(os.getenv("SL_MAX_RESPONSE_MB", "64"))
+
+_SSE_TYPES = ("text/event-stream",)
+_NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+_TEXT_TYPES = ("text/plain",)
+
+
+class AgentError(Exception):
+    """The task endpoint answered, but not with a usable reply."""
+
+
+class ResponseTooLarge(AgentError):
+    def __init__(self, limit: int):
+        super().__init__(f"❌ The SnapLogic response is larger than {limit / 1024 / 1024:.3g} MB; try a narrower question.")
+
+
+def extract_reply(result) -> str | None:
+    """Return the assistant text from a non-streamed task response, if any."""
+    if isinstance(result, list) and result:
+        result = result[0]
+    if not isinstance(result, dict):
+        return None
+    if "choices" in result:
+        return result["choices"][0]["message"]["content"].replace("NEWLINE ", "**") + "**\n\n"
+    if "response" in result:
+        return result["response"]
+    return None
+
+
+def _content_type(response: requests.Response) -> str:
+    return response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+
+def is_streaming(response: requests.Response) -> bool:
+    return _content_type(response) in _SSE_TYPES + _NDJSON_TYPES + _TEXT_TYPES
+
+
+def _delta_text(event) -> str:
+    """Pull the text fragment out of one streamed event."""
+    if isinstance(event, str):
+        return event
+    if not isinstance(event, dict):
+        return ""
+    choices = event.get("choices")
+    if choices:
+        choice = choices[0]
+        delta = choice.get("delta") or choice.get("message") or {}
+        return delta.get("content") or choice.get("text") or ""
+    for key in ("response", "content", "text", "token"):
+        if isinstance(event.get(key), str):
+            return event[key]
+    return ""
+
+
+def _parse_event(data: str):
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data
+
+
+def _iter_sse(response: requests.Response) -> Iterator[str]:
+    data_lines = []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                data = "\n".join(data_lines)
+                data_lines = []
+                if data.strip() == "[DONE]":
+                    return
+                text = _delta_text(_parse_event(data))
+                if text:
+                    yield text
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].removeprefix(" "))
+    if data_lines and "\n".join(data_lines).strip() != "[DONE]":
+        text = _delta_text(_parse_event("\n".join(data_lines)))
+        if text:
+            yield text
+
+
+def _iter_ndjson(response: requests.Response) -> Iterator[str]:
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.strip():
+            text = _delta_text(_parse_event(line.strip("\x1e ")))
+            if text:
+                yield text
+
+
+def iter_stream(response: requests.Response) -> Iterator[str]:
+    """Yield reply text from a streamed response as chunks arrive."""
+    if response.encoding is None:
+        response.encoding = "utf-8"
+    content_type = _content_type(response)
+    try:
+        if content_type in _SSE_TYPES:
+            yield from _iter_sse(response)
+        elif content_type in _NDJSON_TYPES:
+            yield from _iter_ndjson(response)
+        else:
+            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    yield chunk
+    finally:
+        response.close()
+
+
+_SPACE = " \t\n\r"
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]}])[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_NUMBER_END = " \t\n\r,]}"
+_READ_CHUNK = 64 * 1024
+
+
+class _Reader:
+    """Decoded text of a byte stream, read on demand; parsed text is discarded."""
+
+    def __init__(self, chunks: Iterable[bytes], max_bytes: int):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self, at_least: int = 1):
+        parts, got = [self.buf[self.pos:]], 0
+        while got < at_least and not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                text = self._utf8.decode(b"", final=True)
+                self.eof = True
+            else:
+                self.bytes_read += len(chunk)
+                if self.max_bytes and self.bytes_read > self.max_bytes:
+                    raise ResponseTooLarge(self.max_bytes)
+                text = self._utf8.decode(chunk)
+            parts.append(text)
+            got += len(text)
+        self.buf, self.pos = "".join(parts), 0
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it."""
+        if self.pos < len(self.buf) and self.buf[self.pos] not in _SPACE:
+            return self.buf[self.pos]
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                raise json.JSONDecodeError("Unexpected end of data", self.buf, self.pos)
+            self.more()
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def separator(self, close: str) -> bool:
+        """Consume ``,`` (True) or the closing bracket (False) after a member."""
+        match = _SEPARATOR.match(self.buf, self.pos)
+        char = match.group(1) if match else self.peek()
+        if char not in (",", close):
+            raise json.JSONDecodeError(f"Expecting ',' or '{close}'", self.buf, self.pos)
+        self.pos = match.end() if match else self.pos + 1
+        return char == ","
+
+    def value(self):
+        """Decode one complete JSON value with the C decoder."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # Retry once the pending text has doubled, so a huge value still costs linear time
+                self.more(len(self.buf) - self.pos + 1)
+                continue
+            if isinstance(obj, (int, float)) and not self.eof and (end == len(self.buf) or self.buf[end] not in _NUMBER_END):
+                self.more()  # the number may continue in the next chunk
+                continue
+            self.pos = end
+            return obj
+
+    def at_end(self) -> bool:
+        try:
+            self.peek()
+        except json.JSONDecodeError:
+            return True
+        return False
+
+
+def _parse(reader: _Reader, on_record, depth: int):
+    char = reader.peek()
+    if char == "[" and depth < 2:
+        reader.pos += 1
+        items = []
+        if reader.peek() == "]":
+            reader.pos += 1
+            return items
+        while True:
+            item = _parse(reader, on_record, depth + 1)
+            items.append(item)
+            if on_record is not None and isinstance(item, dict):
+                on_record(item)
+            if not reader.separator("]"):
+                return items
+    if char == "{" and depth == 0:
+        reader.pos += 1
+        obj = {}
+        if reader.peek() == "}":
+            reader.pos += 1
+            return obj
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", reader.buf, reader.pos)
+            reader.expect(":")
+            obj[key] = _parse(reader, on_record, depth + 1)
+            if not reader.separator("}"):
+                return obj
+    return reader.value()
+
+
+def decode_json(chunks: Iterable[bytes], on_record: Callable[[dict], None] = None,
+                max_bytes: int = int(MAX_RESPONSE_MB * 1024 * 1024)):
+    """Decode one JSON document from byte chunks as they arrive."""
+    reader = _Reader(chunks, max_bytes)
+    result = _parse(reader, on_record, 0)
+    if not reader.at_end():
+        raise json.JSONDecodeError("Extra data", reader.buf, reader.pos)
+    return result
+
+
+def read_json(response: requests.Response, on_record: Callable[[dict], None] = None,
+              max_bytes: int = int(MAX_RESPONSE_MB * 1024 * 1024)):
+    """``response.json()`` decoded incrementally; see ``decode_json``."""
+    try:
+        length = response.headers.get("Content-Length")
+        if max_bytes and length and length.isdigit() and int(length) > max_bytes:
+            raise ResponseTooLarge(max_bytes)
+        return decode_json(response.iter_content(chunk_size=_READ_CHUNK), on_record, max_bytes)
+    finally:
+        response.close()
@@ -0,0 +1,177 @@
+"""Background execution of SnapLogic calls.
+
+Agent turns and PO submissions can take minutes. Running them inline under
+``st.spinner`` ties up the session's script thread, and any widget interaction
+restarts the wait. Instead, pages submit work to a bounded thread pool shared by
+the server, keep the returned ``Job`` in ``st.session_state`` and let a polling
+``st.fragment`` show progress. When a job finishes the fragment triggers a full
+rerun, where the page picks up the result with ``collect_finished``.
+
+Job functions run outside the script thread, so they must not call ``st.*``;
+they receive the ``Job`` as first argument to stream partial output
+(``job.emit`` for text, ``job.add_row`` for records) and to notice
+cancellation (``job.check_cancelled``, or ``job.sleep`` while waiting).
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from sl_common.profiling import current_profile
+
+BACKGROUND_WORKERS = int(os.getenv("SL_BACKGROUND_WORKERS", "16"))
+MAX_JOBS_PER_SESSION = int(os.getenv("SL_MAX_JOBS_PER_SESSION", "3"))
+POLL_INTERVAL = float(os.getenv("SL_POLL_INTERVAL", "0.5"))
+PREVIEW_ROWS = 20
+
+
+class JobCancelled(BaseException):
+    """Raised inside a job function once the user cancelled it.
+
+    Like ``asyncio.CancelledError`` it is not an ``Exception``, so generic error
+    handling (and the answer cache) does not mistake it for a failed call.
+    """
+
+
+class Job:
+    def __init__(self, label: str, meta: dict = None):
+        self.id = uuid.uuid4().hex[:8]
+        self.label = label
+        self.meta = meta or {}
+        self.submitted_at = time.monotonic()
+        self.future = None
+        self._cancel = threading.Event()
+        self._chunks = []
+        self.rows = []        # the first PREVIEW_ROWS records received
+        self.row_count = 0
+        self.progress = None
+        self.queue_position = None   # set while a call waits for an admission slot
+        self.profile = None          # the profiled script run that submitted the job, if any
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.cancelled or self.future.done()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.submitted_at
+
+    @property
+    def partial(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def streamed(self) -> bool:
+        return bool(self._chunks)
+
+    @property
+    def error(self):
+        """The exception the job raised; ``None`` while it runs or once it was cancelled."""
+        if self.future.cancelled() or not self.future.done():
+            return None
+        return self.future.exception()
+
+    def result(self):
+        return self.future.result()
+
+    def cancel(self):
+        """Drop the job; a request already on the wire finishes but is ignored."""
+        self._cancel.set()
+        self.future.cancel()
+
+    def emit(self, chunk: str):
+        self.check_cancelled()
+        self._chunks.append(chunk)
+
+    def add_row(self, row: dict):
+        self.check_cancelled()
+        self.row_count += 1
+        if len(self.rows) < PREVIEW_ROWS:
+            self.rows.append(row)
+
+    def set_progress(self, done: int, total: int):
+        self.progress = (done, total)
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.label)
+
+    def sleep(self, seconds: float):
+        """``time.sleep`` that ends with ``JobCancelled`` as soon as the job is cancelled."""
+        if self._cancel.wait(seconds):
+            raise JobCancelled(self.label)
+
+
+@st.cache_resource(show_spinner=False)
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="sl-call")
+
+
+def can_submit(jobs: dict, limit: int = MAX_JOBS_PER_SESSION) -> bool:
+    return sum(not job.done for job in jobs.values()) < limit
+
+
+def submit(jobs: dict, label: str, fn, *args, meta: dict = None, limit: int = MAX_JOBS_PER_SESSION, **kwargs) -> Job | None:
+    """Run ``fn(job, *args, **kwargs)`` in the background and track it in ``jobs``.
+
+    Returns ``None`` when ``jobs`` already has ``limit`` jobs running
+    (``MAX_JOBS_PER_SESSION`` by default).
+    """
+    if not can_submit(jobs, limit):
+        return None
+    job = Job(label, meta)
+    # The job's thread has no profile of its own; its calls are timed into the submitting run's
+    job.profile = current_profile()
+    job.future = get_executor().submit(fn, job, *args, **kwargs)
+    jobs[job.id] = job
+    return job
+
+
+def collect_finished(jobs: dict, include_cancelled: bool = False) -> list:
+    """Remove finished jobs from ``jobs``; cancelled ones are dropped unless asked for."""
+    finished = [job for job in jobs.values() if job.done]
+    profile = current_profile()
+    for job in finished:
+        del jobs[job.id]
+        if profile is not None and job.profile is not None:
+            profile.collected(job.profile)
+    return [job for job in finished if include_cancelled or not job.cancelled]
+
+
+def render_jobs(jobs: dict, chat: bool = True):
+    """Show running jobs, polling until one of them finishes."""
+    if any(not job.done for job in jobs.values()):
+        _jobs_fragment(jobs, chat)
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _jobs_fragment(jobs: dict, chat: bool):
+    running = [job for job in list(jobs.values()) if not job.done]
+    if len(running) < len(jobs):
+        # Something finished (or was cancelled): let the page collect it.
+        st.rerun()
+    for job in running:
+        with st.chat_message("assistant") if chat else st.container(border=True):
+            if job.progress:
+                done, total = job.progress
+                st.progress(done / total if total else 1.0, text=f"{done}/{total}")
+            if job.partial:
+                st.markdown(job.partial)
+            if job.row_count:
+                st.dataframe(list(job.rows), hide_index=True)
+                st.caption(f"{job.row_count:,} rows received so far")
+            left, right = st.columns([4, 1])
+            if job.queue_position:
+                left.caption(f"🚦 Many people are asking right now · you are number {job.queue_position} in the queue · {job.elapsed:.0f}s")
+            else:
+                left.caption(f"⏳ {job.label} · {job.elapsed:.0f}s")
+            if right.button("✖ Cancel", key=f"cancel_{job.id}"):
+                job.cancel()
+                st.rerun()
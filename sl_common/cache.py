@@ -0,0 +1,193 @@
+"""Process-wide answer cache for the natural-language query agents.
+
+The CRM and Snowflake pages advertise fixed example questions, so many sessions
+ask exactly the same thing. ``ResponseCache`` keys answers on the endpoint plus
+a normalized prompt, expires them after a TTL, evicts least-recently-used
+entries past an entry/byte budget, and coalesces concurrent identical requests
+so only one of them reaches SnapLogic. Answers that stand for a larger
+response (a table saved to disk, say) are returned as ``Sized`` so they count
+the response's raw byte length instead of being measured.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple
+
+import streamlit as st
+
+from sl_common.agent import AgentError
+
+CACHE_TTL = float(os.getenv("SL_CACHE_TTL", "600"))
+CACHE_MAX_ENTRIES = int(os.getenv("SL_CACHE_MAX_ENTRIES", "500"))
+CACHE_MAX_MB = float(os.getenv("SL_CACHE_MAX_MB", "64"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _WHITESPACE.sub(" ", prompt).strip().rstrip("?!. ").lower()
+
+
+class Sized(NamedTuple):
+    """What ``compute`` returns for a value whose size is already known, e.g. the raw response length."""
+
+    value: Any
+    size: int
+
+
+def _size_of(value) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    # Only small structured values get here; large responses come as Sized
+    return len(json.dumps(value, default=str))
+
+
+class _Flight:
+    """One in-progress upstream call that identical requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.abandoned = False
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024)):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._in_flight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = self.evictions = self.expirations = self.errors = 0
+
+    @staticmethod
+    def make_key(endpoint: str, prompt: str) -> tuple:
+        return endpoint, normalize_prompt(prompt)
+
+    def get_or_compute(self, endpoint: str, prompt: str, compute: Callable[[], Any],
+                       timeout: float = None) -> tuple[Any, bool]:
+        """Return ``(value, from_cache)``, calling ``compute`` at most once per key at a time.
+
+        ``compute`` may return a ``Sized`` to give the entry's size. Exceptions
+        from ``compute`` are not cached; they are re-raised to every caller
+        waiting on the same flight. A caller waits at most ``timeout`` seconds
+        (the request's deadline) for another's identical call. If the computing
+        script run is interrupted (Streamlit stop/rerun), a waiter takes over the
+        call instead.
+        """
+        key = self.make_key(endpoint, prompt)
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value, True
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._in_flight[key] = _Flight()
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            if not flight.done.wait(timeout):
+                raise AgentError(
+                    f"⏳ The same question, asked in another session, is still unanswered after {timeout:.0f}s. "
+                    "Please try again later."
+                )
+            if flight.abandoned:
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            value = compute()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        except BaseException:
+            flight.abandoned = True
+            raise
+        else:
+            size = None
+            if isinstance(value, Sized):
+                value, size = value
+            flight.value = value
+            self.put(key, value, size)
+            return value, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+    def put(self, key: tuple, value, size: int = None):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        size = _size_of(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, endpoint: str, prompt: str):
+        with self._lock:
+            self._discard(self.make_key(endpoint, prompt))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "size_kb": round(self._bytes / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "errors": self.errors,
+                "in_flight": len(self._in_flight),
+            }
+
+    def _lookup(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._discard(key)
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache() -> ResponseCache:
+    return ResponseCache()
@@ -0,0 +1,132 @@
+"""Process-wide configuration, loaded and validated once.
+
+``load_env()`` runs when ``sl_common`` is first imported: ``.env`` (or the
+file named by ``SL_ENV_FILE``) fills in whatever the real environment does not
+set, so every module's ``SL_*`` settings — ``SL_TASK_TIMEOUT`` included — see
+the same values, and later reruns and pages never read the file again. The
+numeric, boolean and URL settings are then checked together, so a typo fails
+with one message naming every bad variable instead of a ``ValueError`` deep
+inside some import.
+
+Pages take their endpoint, token and titles from ``get_config()``, and the
+Deck Builder its Claude model (``SL_DECK_MODEL``).
+"""
+import os
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import streamlit as st
+from dotenv import dotenv_values
+
+ENV_FILE = os.getenv("SL_ENV_FILE", ".env")
+# Claude model the Deck Builder writes slides with, unless SL_DECK_MODEL names another
+DEFAULT_DECK_MODEL = "claude-sonnet-4-6"
+
+_INT_SETTINGS = (
+    "SL_BACKGROUND_WORKERS", "SL_BREAKER_FAILURES", "SL_CACHE_MAX_ENTRIES", "SL_CHAT_VISIBLE_MESSAGES",
+    "SL_DECK_CONCURRENCY", "SL_DECK_MAX_TOKENS", "SL_HISTORY_MAX_TOKENS", "SL_MARKDOWN_MAX_CHARS",
+    "SL_MAX_CALLS", "SL_MAX_CALLS_PER_ENDPOINT", "SL_MAX_JOBS_PER_SESSION", "SL_MAX_QUEUE", "SL_METRICS_PORT",
+    "SL_POOL_MAXSIZE", "SL_PO_BATCH_SIZE", "SL_PO_CONCURRENCY", "SL_RESULT_PAGE_SIZE", "SL_RETRIES",
+    "SL_SESSION_BURST", "SL_SESSION_HISTORY_KB",
+)
+_FLOAT_SETTINGS = (
+    "SL_BREAKER_RESET", "SL_CACHE_MAX_MB", "SL_CACHE_TTL", "SL_CONNECT_TIMEOUT", "SL_DEADLINE_FACTOR",
+    "SL_DECK_CACHE_MB", "SL_EXPORT_MAX_MB", "SL_MAX_RESPONSE_MB", "SL_MIN_TIMEOUT", "SL_POLL_INTERVAL",
+    "SL_PO_SYNC_INTERVAL", "SL_PO_URGENCY_HORIZON_DAYS", "SL_PROFILE_INTERVAL_MS", "SL_QUEUE_TIMEOUT",
+    "SL_RESULTS_MAX_MB", "SL_RETRY_BACKOFF", "SL_SESSION_IDLE_MINUTES", "SL_SESSION_RATE", "SL_SESSION_TTL_HOURS",
+    "SL_TASK_TIMEOUT", "SL_TRANSCRIPT_RETENTION_HOURS", "SL_TYPEWRITER_MAX_SECONDS", "SL_TYPEWRITER_SPEED",
+)
+_BOOL_SETTINGS = ("SL_HEDGE", "SL_HISTORY_SUMMARIZE", "SL_POOL_BLOCK", "SL_PROFILE", "SL_STREAM_RESPONSES")
+_STATE_SCHEMES = ("redis", "rediss", "unix", "sqlite")
+
+
+class ConfigError(ValueError):
+    """One or more settings are malformed."""
+
+
+def load_env(path: str = ENV_FILE) -> dict:
+    """Copy ``path`` into ``os.environ`` without overriding variables that are already set."""
+    values = {k: v for k, v in dotenv_values(path).items() if v is not None}
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+    return values
+
+
+def validate(environ=os.environ):
+    problems = []
+    for name in _INT_SETTINGS + _FLOAT_SETTINGS:
+        value = environ.get(name)
+        if value is None:
+            continue
+        try:
+            number = int(value) if name in _INT_SETTINGS else float(value)
+        except ValueError:
+            problems.append(f"{name}={value!r} is not {'an integer' if name in _INT_SETTINGS else 'a number'}")
+            continue
+        if number < 0:
+            problems.append(f"{name}={value!r} must not be negative")
+    for name in _BOOL_SETTINGS:
+        value = environ.get(name)
+        if value is not None and value.lower() not in ("true", "false"):
+            problems.append(f"{name}={value!r} must be true or false")
+    for name, value in environ.items():
+        if name == "SL_STATE_URL":
+            if value and urlsplit(value).scheme not in _STATE_SCHEMES:
+                problems.append(f"{name}={value!r} must be a redis://, rediss://, unix:// or sqlite:/// URL")
+        elif name.startswith("SL_") and name.endswith("_URL"):
+            parts = urlsplit(value)
+            if parts.scheme not in ("http", "https") or not parts.netloc:
+                problems.append(f"{name}={value!r} is not an http(s) URL")
+    if problems:
+        raise ConfigError("Invalid configuration: " + "; ".join(problems))
+
+
+@dataclass(frozen=True)
+class AgentConfig:
+    url: str
+    token: str
+    page_title: str
+    title: str
+
+
+@dataclass(frozen=True)
+class Config:
+    page_title: str
+    title: str
+    agents: dict
+    deck_model: str
+
+
+def _agent(prefix: str, url: str, token: str, title: str) -> AgentConfig:
+    return AgentConfig(
+        url=os.getenv(f"SL_{prefix}_TASK_URL", url),
+        token=os.getenv(f"SL_{prefix}_TASK_TOKEN", token),
+        page_title=os.getenv(f"{prefix}_PAGE_TITLE", title),
+        title=os.getenv(f"{prefix}_TITLE", title),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_config() -> Config:
+    return Config(
+        page_title=os.getenv("PAGE_TITLE", "SnapLogic Agent Creator"),
+        title=os.getenv("TITLE", "SnapLogic Agent Creator"),
+        agents={
+            "crm": _agent(
+                "CRM_SQL",
+                "https://demo-fm.snaplogic.io/api/1/rest/feed-master/queue/ConnectFasterInc/Dylan%20Vetter/CRM_Agent/CRM_Ultra",
+                "12345", "CRM Agent",
+            ),
+            "rays": _agent(
+                "Tampa",
+                "https://demo-fm.snaplogic.io/api/1/rest/feed-master/queue/ConnectFasterInc/Dylan%20Vetter/TampaBayRays/Driver%20Task",
+                "1234", "Tampa Bay Rays Agent",
+            ),
+            "snowflake": _agent(
+                "SF",
+                "https://elastic.snaplogic.com/api/1/rest/slsched/feed/ConnectFasterInc/Dylan%20Vetter/Intuit/Snowflake%20Agent%20Task",
+                "1234", "Intuit Snowflake Agent",
+            ),
+        },
+        deck_model=os.getenv("SL_DECK_MODEL", DEFAULT_DECK_MODEL),
+    )
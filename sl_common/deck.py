@@ -0,0 +1,180 @@
+"""Server-side pitch deck generation for the Deck Builder page.
+
+The content of each slide is asked from Claude separately, ``SL_DECK_CONCURRENCY``
+slides at a time, as a small JSON object (title, subtitle, bullets and, for the
+business value slide, ROI stats) rather than in one long serial completion.
+The slides are then drawn with python-pptx (``sl_common.slides``) on a copy of
+the master template, which is loaded once per process (``SL_DECK_TEMPLATE``, or
+a blank 16:9 deck), and the finished file is kept as bytes for
+``st.download_button``. Slides and
+decks are cached by content (``sl_common.deck_cache``), so a rebuild only
+regenerates the slides whose inputs changed.
+
+The model client is the ``anthropic`` SDK, configured from ``ANTHROPIC_API_KEY``
+and ``ANTHROPIC_BASE_URL``, so the latter can point at ``tools/stub_server.py``.
+It and python-pptx take over a second to import, so both are imported on first
+use rather than when the page loads; API errors surface as ``AgentError``.
+"""
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+from sl_common.agent import AgentError
+from sl_common.background import Job
+from sl_common.config import get_config
+from sl_common.deck_cache import DeckCache, content_key
+
+if TYPE_CHECKING:
+    import anthropic
+
+DECK_MODEL = get_config().deck_model
+DECK_CONCURRENCY = int(os.getenv("SL_DECK_CONCURRENCY", "4"))
+DECK_MAX_TOKENS = int(os.getenv("SL_DECK_MAX_TOKENS", "1024"))
+DECK_TEMPLATE_PATH = os.getenv("SL_DECK_TEMPLATE", "")
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+SLIDE_TYPES = {
+    6: ("Title", "Customer Challenges", "SnapLogic Solution", "Business Value", "Why SnapLogic", "Next Steps"),
+    8: ("Title", "Customer Challenges", "SnapLogic Solution", "Business Value", "Platform Capabilities",
+        "Use Cases", "Why SnapLogic", "Next Steps"),
+    10: ("Title", "Customer Challenges", "SnapLogic Solution", "Business Value", "Platform Capabilities",
+         "Use Cases", "Implementation Roadmap", "Customer Success Metrics", "Why SnapLogic", "Next Steps"),
+}
+
+# Slides about the customer alone; leaving the SnapLogic text out of their prompt
+# lets them be reused from the cache when only that text changes.
+CUSTOMER_ONLY_SLIDES = {"Customer Challenges"}
+
+SYSTEM_PROMPT = (
+    "You write the content of one slide of a SnapLogic sales pitch deck. "
+    "Answer with a single JSON object and nothing else."
+)
+
+
+@dataclass(frozen=True)
+class SlideSpec:
+    customer: str
+    snaplogic: str
+    slide_type: str
+    tone: str
+    index: int
+    total: int
+
+
+def plan_slides(customer: str, snaplogic: str, slide_count: int, tone: str) -> list:
+    types = SLIDE_TYPES[slide_count]
+    return [SlideSpec(customer, snaplogic, slide_type, tone, i + 1, len(types)) for i, slide_type in enumerate(types)]
+
+
+def slide_prompt(spec: SlideSpec) -> str:
+    stats = (
+        ', and "stats": exactly 3 objects {"value": a large, bold ROI figure such as "80%", "3x" or "40h saved", '
+        '"label": what it measures}'
+        if spec.slide_type == "Business Value" else ""
+    )
+    snaplogic = "" if spec.slide_type in CUSTOMER_ONLY_SLIDES else f"\nHOW SNAPLOGIC CAN HELP:\n{spec.snaplogic}\n"
+    return f"""Slide type: {spec.slide_type}
+Slide {spec.index} of {spec.total}, {spec.tone} tone.
+
+CUSTOMER INFORMATION:
+{spec.customer}
+{snaplogic}
+Return JSON with "title" (at most 8 words), "subtitle" (one sentence), "bullets" (3 to 5 items of at most 15 words){stats}.
+All content must be 100% specific to this customer — no generic filler."""
+
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_slide(text: str, spec: SlideSpec) -> dict:
+    """Slide content from the model's answer; plain text becomes bullets."""
+    try:
+        data = json.loads(_FENCE.sub("", text.strip()))
+    except ValueError:
+        data = {"bullets": [line.strip("-•* ") for line in text.splitlines() if line.strip()]}
+    if not isinstance(data, dict):
+        data = {}
+    return {
+        "type": spec.slide_type,
+        "title": str(data.get("title") or spec.slide_type),
+        "subtitle": str(data.get("subtitle") or ""),
+        "bullets": [str(b) for b in data.get("bullets") or []][:6],
+        "stats": [s for s in data.get("stats") or [] if isinstance(s, dict)][:3],
+    }
+
+
+def slide_key(spec: SlideSpec) -> str:
+    """Hash of everything the slide's content depends on."""
+    return content_key(DECK_MODEL, DECK_MAX_TOKENS, SYSTEM_PROMPT, slide_prompt(spec))
+
+
+def generate_slide(client: "anthropic.Anthropic", spec: SlideSpec) -> dict:
+    import anthropic
+
+    try:
+        message = client.messages.create(
+            model=DECK_MODEL,
+            max_tokens=DECK_MAX_TOKENS,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": slide_prompt(spec)}],
+        )
+    except anthropic.APIError as e:
+        raise AgentError(f"❌ Claude API error: {e}") from e
+    return parse_slide("".join(block.text for block in message.content if block.type == "text"), spec)
+
+
+def build_deck(job: Job, specs: list, client: "anthropic.Anthropic", template: bytes, cache: DeckCache) -> bytes:
+    """Generate changed slides in parallel and assemble the deck; runs on the background executor.
+
+    ``job.meta["reused"]`` reports how many of the ``job.meta["slides"]`` slides
+    came from the cache.
+    """
+    job.meta["slides"] = len(specs)
+    keys = [slide_key(spec) for spec in specs]
+    deck_key = content_key(template, *keys)
+    deck = cache.get_deck(deck_key)
+    if deck is not None:
+        job.meta["reused"] = len(specs)
+        return deck
+    slides = [cache.get_slide(key) for key in keys]
+    todo = [i for i, slide in enumerate(slides) if slide is None]
+    job.meta["reused"] = len(specs) - len(todo)
+    pool = ThreadPoolExecutor(max_workers=DECK_CONCURRENCY, thread_name_prefix="sl-deck")
+    try:
+        futures = {pool.submit(generate_slide, client, specs[i]): i for i in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            job.check_cancelled()
+            i = futures[future]
+            slides[i] = future.result()
+            cache.put_slide(keys[i], slides[i])
+            job.set_progress(done, len(todo))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    from sl_common.slides import render_deck
+
+    deck = render_deck(template, slides, cache)
+    cache.put_deck(deck_key, deck)
+    return deck
+
+
+@st.cache_resource(show_spinner=False)
+def get_model_client() -> "anthropic.Anthropic":
+    import anthropic
+
+    return anthropic.Anthropic()
+
+
+@st.cache_resource(show_spinner=False)
+def get_deck_template(path: str = DECK_TEMPLATE_PATH) -> bytes:
+    """The master template as bytes; every build opens its own copy."""
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    from sl_common.slides import blank_template
+
+    return blank_template()
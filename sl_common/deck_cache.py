@@ -0,0 +1,141 @@
+"""Content-addressed cache for Deck Builder slides and decks.
+
+Sales reps tweak one field and rebuild. Each slide's content is stored under a
+hash of everything that goes into it (the exact prompt, which carries the
+customer and SnapLogic text, slide type, tone and slide count, plus the model),
+so a rebuild asks Claude only for the slides whose inputs changed. Each slide's
+rendered PPTX part (its XML) is stored under the hash of the template, its
+content and position, so only changed slides are drawn again. Finished decks
+are stored under the hash of their slide keys and template, so an unchanged
+rebuild is a single file read.
+
+Entries are files under ``SL_DECK_CACHE_DIR``, shared by all sessions and
+kept across restarts. Least recently used files (by mtime, refreshed on every
+hit) are evicted once the directory exceeds ``SL_DECK_CACHE_MB``.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+import streamlit as st
+
+DECK_CACHE_DIR = os.getenv("SL_DECK_CACHE_DIR", ".data/deck_cache")
+DECK_CACHE_MB = float(os.getenv("SL_DECK_CACHE_MB", "64"))
+
+_SUFFIXES = {"slide": ".slide.json", "part": ".slide.xml", "deck": ".pptx"}
+
+
+def content_key(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DeckCache:
+    def __init__(self, directory: str = DECK_CACHE_DIR, max_bytes: int = int(DECK_CACHE_MB * 1024 * 1024)):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = {path.name: path.stat().st_size for path in self.directory.iterdir()
+                       if path.is_file() and not path.name.startswith(".")}
+        self._bytes = sum(self._sizes.values())
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+
+    def _get(self, kind: str, key: str) -> bytes | None:
+        path = self.directory / f"{key}{_SUFFIXES[kind]}"
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # recency for LRU eviction
+        except FileNotFoundError:
+            with self._lock:
+                self.misses[kind] += 1
+            return None
+        with self._lock:
+            self.hits[kind] += 1
+        return data
+
+    def _put(self, kind: str, key: str, data: bytes):
+        name = f"{key}{_SUFFIXES[kind]}"
+        tmp = self.directory / f".{name}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.directory / name)
+        with self._lock:
+            self._bytes += len(data) - self._sizes.get(name, 0)
+            self._sizes[name] = len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used files until 90% of the budget is free; caller holds the lock."""
+        def mtime(name):
+            try:
+                return (self.directory / name).stat().st_mtime
+            except FileNotFoundError:
+                return 0
+
+        for name in sorted(self._sizes, key=mtime):
+            if self._bytes <= self.max_bytes * 0.9:
+                break
+            (self.directory / name).unlink(missing_ok=True)
+            self._bytes -= self._sizes.pop(name)
+            self.evictions += 1
+
+    def get_slide(self, key: str) -> dict | None:
+        data = self._get("slide", key)
+        return None if data is None else json.loads(data)
+
+    def put_slide(self, key: str, content: dict):
+        self._put("slide", key, json.dumps(content).encode())
+
+    def get_part(self, key: str) -> bytes | None:
+        return self._get("part", key)
+
+    def put_part(self, key: str, xml: bytes):
+        self._put("part", key, xml)
+
+    def get_deck(self, key: str) -> bytes | None:
+        return self._get("deck", key)
+
+    def put_deck(self, key: str, data: bytes):
+        self._put("deck", key, data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            def rate(kind):
+                total = self.hits[kind] + self.misses[kind]
+                return self.hits[kind] / total if total else 0.0
+
+            return {
+                "slide_hit_rate": rate("slide"),
+                "part_hit_rate": rate("part"),
+                "deck_hit_rate": rate("deck"),
+                "slide_hits": self.hits["slide"],
+                "slide_misses": self.misses["slide"],
+                "parts_reused": self.hits["part"],
+                "parts_drawn": self.misses["part"],
+                "deck_hits": self.hits["deck"],
+                "deck_misses": self.misses["deck"],
+                "entries": len(self._sizes),
+                "size_kb": round(self._bytes / 1024, 1),
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            for name in self._sizes:
+                (self.directory / name).unlink(missing_ok=True)
+            self._sizes.clear()
+            self._bytes = 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_deck_cache(directory: str = DECK_CACHE_DIR) -> DeckCache:
+    return DeckCache(directory)
@@ -0,0 +1,130 @@
+"""Token-budgeted message payloads for the multi-turn agent pages.
+
+Posting the whole chat history every turn makes payload size (and upstream LLM
+cost) grow with the conversation. ``ContextWindow`` builds the ``messages``
+list sent to SnapLogic in one of three modes:
+
+* ``full``   - every message, as before.
+* ``window`` - the newest messages that fit in ``max_tokens``; older turns are
+  optionally folded into a rolling summary message.
+* ``delta``  - only messages the backend has not seen yet for this
+  ``session_id``, for pipelines that keep their own conversation memory.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+import streamlit as st
+
+HISTORY_MODE = os.getenv("SL_HISTORY_MODE", "window")
+HISTORY_MAX_TOKENS = int(os.getenv("SL_HISTORY_MAX_TOKENS", "3000"))
+HISTORY_SUMMARIZE = os.getenv("SL_HISTORY_SUMMARIZE", "true").lower() == "true"
+
+# Rough per-message overhead (role, separators) in the upstream tokenizer.
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def to_sl_message(message: dict) -> dict:
+    return {"sl_role": "user" if message["role"] == "user" else "assistant", "content": message["content"]}
+
+
+def extractive_summary(message: dict, max_chars: int = 160) -> str:
+    """First sentence of a message, truncated; used when no summarizer is given."""
+    text = " ".join(message["content"].split())
+    sentence = text.split(". ")[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[: max_chars - 1] + "…"
+    return f"{message['role']}: {sentence}"
+
+
+@dataclass
+class ContextWindow:
+    mode: str = HISTORY_MODE
+    max_tokens: int = HISTORY_MAX_TOKENS
+    summarize: bool = HISTORY_SUMMARIZE
+    summary_max_chars: int = 1500
+    summarizer: Callable[[dict], str] = extractive_summary
+
+    def build(self, messages: list, state: dict, session_id: str) -> tuple[list, dict]:
+        """Return the SnapLogic ``messages`` payload and per-turn stats.
+
+        ``state`` is a per-page dict kept in ``st.session_state``; it carries the
+        rolling summary and, in ``delta`` mode, how much of the history the
+        backend has already received for ``session_id``.
+        """
+        if state.get("session_id") != session_id:
+            state.clear()
+            state["session_id"] = session_id
+
+        if self.mode == "delta":
+            start = min(state.get("sent_upto", 0), len(messages))
+            selected = messages[start:]
+            summary = None
+        elif self.mode == "window":
+            start = self._window_start(messages)
+            if self.summarize:
+                # Never resend turns that are already folded into the summary.
+                start = max(start, state.get("summarized_upto", 0))
+                summary = self._roll_summary(messages, start, state)
+            else:
+                summary = None
+            selected = messages[start:]
+        else:
+            start, summary, selected = 0, None, messages
+
+        payload = [to_sl_message(m) for m in selected]
+        if summary:
+            payload.insert(0, {"sl_role": "system", "content": f"Summary of earlier conversation:\n{summary}"})
+        stats = {
+            "mode": self.mode,
+            "messages_total": len(messages),
+            "messages_sent": len(selected),
+            "messages_summarized": start if summary else 0,
+            "est_tokens": sum(estimate_tokens(m["content"]) + _MESSAGE_OVERHEAD_TOKENS for m in payload),
+            "payload_bytes": len(json.dumps(payload).encode()),
+        }
+        return payload, stats
+
+    def mark_sent(self, state: dict, message_count: int):
+        """Record that the backend now holds the first ``message_count`` messages."""
+        state["sent_upto"] = message_count
+
+    def _window_start(self, messages: list) -> int:
+        budget = self.max_tokens
+        start = len(messages)
+        while start > 0:
+            cost = estimate_tokens(messages[start - 1]["content"]) + _MESSAGE_OVERHEAD_TOKENS
+            # Always keep the newest message, even if it alone exceeds the budget.
+            if cost > budget and start < len(messages):
+                break
+            budget -= cost
+            start -= 1
+        return start
+
+    def _roll_summary(self, messages: list, start: int, state: dict) -> str | None:
+        summarized = state.get("summarized_upto", 0)
+        if start > summarized:
+            lines = [self.summarizer(m) for m in messages[summarized:start]]
+            summary = "\n".join(filter(None, [state.get("summary"), *lines]))
+            state["summary"] = summary[-self.summary_max_chars:]
+            state["summarized_upto"] = start
+        return state.get("summary")
+
+
+def render_payload_metrics(turns: list):
+    """Sidebar table of payload size per turn."""
+    if not turns:
+        return
+    with st.sidebar.expander("📦 Payload size per turn", expanded=False):
+        st.dataframe(turns, use_container_width=True, hide_index=True)
+        last = turns[-1]
+        st.caption(
+            f"Last turn: {last['messages_sent']}/{last['messages_total']} messages · "
+            f"~{last['est_tokens']} tokens · {last['payload_bytes'] / 1024:.1f} KB ({last['mode']})"
+        )
@@ -0,0 +1,210 @@
+"""Process-wide pooled HTTP client for SnapLogic task endpoints.
+
+Every page posts through ``get_client()`` so that calls to the same host reuse
+keep-alive connections (and the TLS session negotiated on them) instead of
+opening a new socket and handshake per turn. Each request runs under the
+endpoint's deadline, retry, hedging and circuit-breaker policy
+(``sl_common.resilience``); every attempt it sends first waits for its own slot
+from the server-wide admission controller (``sl_common.admission``) and is
+timed and sized into ``sl_common.metrics``.
+"""
+import os
+import ssl
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from sl_common.admission import Admission
+from sl_common.metrics import CallMetrics, endpoint_label, get_metrics
+from sl_common.profiling import phase
+from sl_common.resilience import CallPolicy, Resilience
+
+
+@dataclass(frozen=True)
+class EndpointSettings:
+    pool_maxsize: int = int(os.getenv("SL_POOL_MAXSIZE", "20"))
+    pool_block: bool = os.getenv("SL_POOL_BLOCK", "true").lower() == "true"
+    # Upper bound for a call, retries included; attempts get shorter deadlines once latency is known
+    timeout: float = float(os.getenv("SL_TASK_TIMEOUT", "1000"))
+    policy: CallPolicy = CallPolicy()
+
+
+# Per-host overrides; hosts not listed here use the defaults above.
+ENDPOINT_SETTINGS = {
+    "elastic.snaplogic.com": EndpointSettings(),
+    "demo-fm.snaplogic.io": EndpointSettings(),
+}
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter sharing one SSL context per host, counting in-flight sends and timing calls."""
+
+    def __init__(self, settings: EndpointSettings, metrics: CallMetrics = None):
+        self.settings = settings
+        self.metrics = metrics
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        # One verified and one unverified context per host, so the CA bundle is
+        # loaded once rather than for every new connection.
+        self._ssl_contexts = {"CERT_REQUIRED": ssl.create_default_context()}
+        unverified = ssl.create_default_context()
+        unverified.check_hostname = False
+        unverified.verify_mode = ssl.CERT_NONE
+        self._ssl_contexts["CERT_NONE"] = unverified
+        super().__init__(
+            pool_connections=1,
+            pool_maxsize=settings.pool_maxsize,
+            pool_block=settings.pool_block,
+        )
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if host_params["scheme"] == "https" and isinstance(verify, bool):
+            pool_kwargs["ssl_context"] = self._ssl_contexts[pool_kwargs["cert_reqs"]]
+        return host_params, pool_kwargs
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        call = self.metrics.start(request) if self.metrics is not None else None
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as e:
+            if call is not None:
+                call.finish(error=e)
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return call.attach(response) if call is not None else response
+
+    def stats(self) -> dict:
+        opened = requests_made = idle = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_made += pool.num_requests
+            idle += sum(1 for conn in list(pool.pool.queue) if conn is not None and conn.sock is not None)
+        in_flight = self.in_flight
+        return {
+            "pool_maxsize": self.settings.pool_maxsize,
+            "connections_opened": opened,
+            "connections_open": idle + min(in_flight, self.settings.pool_maxsize),
+            "connections_idle": idle,
+            "requests": requests_made,
+            "reused": max(requests_made - opened, 0),
+            "in_flight": in_flight,
+            "waiting": max(in_flight - self.settings.pool_maxsize, 0) if self.settings.pool_block else 0,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+class SnapLogicClient:
+    """Keeps one pooled ``requests.Session`` per host (and port)."""
+
+    def __init__(self, endpoint_settings: dict = None, metrics: CallMetrics = None):
+        self._endpoint_settings = dict(ENDPOINT_SETTINGS if endpoint_settings is None else endpoint_settings)
+        self.metrics = metrics
+        self.resilience = Resilience(metrics)
+        self.admission = Admission()
+        if metrics is not None:
+            metrics.add_collector(self.admission.prometheus)
+        self._sessions = {}
+        self._adapters = {}
+        self._lock = threading.Lock()
+
+    def settings_for(self, host: str) -> EndpointSettings:
+        return self._endpoint_settings.get(host, EndpointSettings())
+
+    def session_for(self, url: str) -> requests.Session:
+        parts = urlsplit(url)
+        # Keyed like the adapter mount, so another port on the same host gets its own pool
+        key = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                adapter = _PooledAdapter(self.settings_for(parts.hostname or ""), self.metrics)
+                session = requests.Session()
+                session.mount(f"{key}/", adapter)
+                self._sessions[key] = session
+                self._adapters[key] = adapter
+            return session
+
+    def request(self, method: str, url: str, idempotent: bool = False, job=None, **kwargs) -> requests.Response:
+        """Send through the host's pool under its ``CallPolicy`` once admitted.
+
+        Only ``idempotent`` calls are retried after the server may have seen
+        them, or hedged. An explicit ``timeout`` replaces the derived deadline.
+        ``job`` shows its queue position while the call waits for a slot, and
+        its cancellation ends waits for a slot or between retries.
+        """
+        settings = self.settings_for(urlsplit(url).hostname or "")
+        session = self.session_for(url)
+        timeout = kwargs.pop("timeout", None)
+        endpoint = endpoint_label(url)
+
+        def send(attempt_timeout):
+            # Every attempt holds its own slot, so retries and hedged duplicates count against the limits
+            slot = self.admission.acquire(endpoint, job)
+            try:
+                response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except BaseException:
+                slot.release()
+                raise
+            if not kwargs.get("stream"):
+                # The body has been read already
+                slot.release()
+                return response
+            return slot.attach(response)
+
+        with phase("network", job.profile if job is not None else None):
+            return self.resilience.call(endpoint, settings.policy, send, timeout, settings.timeout, idempotent, job)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def budget(self, url: str) -> float:
+        """Upper bound in seconds for one call to ``url``, retries included."""
+        return self.settings_for(urlsplit(url).hostname or "").timeout
+
+    def pool_stats(self) -> dict:
+        """Connection pool counters keyed by scheme://host[:port]."""
+        with self._lock:
+            adapters = dict(self._adapters)
+        return {host: adapter.stats() for host, adapter in adapters.items()}
+
+    def degraded(self, url: str) -> str | None:
+        """A message to show while calls to ``url`` are being refused."""
+        return self.resilience.degraded(endpoint_label(url))
+
+    def policy_stats(self) -> dict:
+        """Circuit state and retry/hedge counters keyed by endpoint."""
+        return self.resilience.stats()
+
+    def admission_stats(self) -> tuple:
+        """Server-wide admission counters, and the same per endpoint."""
+        return self.admission.stats(), self.admission.endpoint_stats()
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._adapters.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_client() -> SnapLogicClient:
+    return SnapLogicClient(metrics=get_metrics())
@@ -0,0 +1,309 @@
+"""Latency and payload metrics for outbound SnapLogic calls.
+
+The pooled client (``sl_common.http``) reports every request here: status,
+time to first byte, total duration (including reading a streamed body), request
+and response size, and whether it timed out. Durations go into fixed-bucket
+histograms per endpoint, so memory stays constant however many calls are made
+and p50/p95/p99 are read straight from the buckets.
+
+The numbers are shown on the Admin page and can be scraped in Prometheus text
+format from ``SL_METRICS_PORT`` when set, on ``SL_METRICS_HOST`` (loopback by
+default). With ``SL_TRACE_FILE`` set, one JSON line per call is appended there
+for offline analysis.
+"""
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import requests
+import streamlit as st
+from urllib3.exceptions import ReadTimeoutError
+
+TRACE_FILE = os.getenv("SL_TRACE_FILE", "")
+METRICS_PORT = int(os.getenv("SL_METRICS_PORT", "0"))
+# Loopback by default; set to 0.0.0.0 (or an interface address) for a scraper on another host.
+METRICS_HOST = os.getenv("SL_METRICS_HOST", "127.0.0.1")
+
+# Upper bounds in seconds, 1 ms to ~20 min in steps of 25%.
+BUCKETS = tuple(round(0.001 * 1.25 ** i, 6) for i in range(63))
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> float | None:
+        """Estimate the ``q`` quantile (0-1) by interpolating inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.statuses = Counter()
+        self.duration = Histogram()
+        self.ttfb = Histogram()
+        self.timeouts = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.max_response_bytes = 0
+
+
+def endpoint_label(url: str) -> str:
+    """``host/path`` without the query string, which may carry tokens."""
+    parts = urlsplit(url)
+    return f"{parts.netloc.rpartition('@')[2]}{unquote(parts.path)}"
+
+
+def _is_timeout(error: BaseException) -> bool:
+    if isinstance(error, requests.Timeout):
+        return True
+    # requests re-raises read timeouts hit while consuming a body as ConnectionError
+    return any(isinstance(arg, ReadTimeoutError) for arg in getattr(error, "args", ()))
+
+
+class _Call:
+    """One outbound request, finished once its body is read or the response closed."""
+
+    def __init__(self, metrics: "CallMetrics", request: requests.PreparedRequest):
+        self.metrics = metrics
+        self.method = request.method
+        self.endpoint = endpoint_label(request.url)
+        body = request.body
+        self.request_bytes = len(body) if isinstance(body, (bytes, str)) else 0
+        self.started = time.perf_counter()
+        self.ttfb = None
+        self.status = None
+        self.body_bytes = 0
+        self._finished = False
+
+    def attach(self, response: requests.Response) -> requests.Response:
+        """Record the headers and wrap the body so the end of the call is noticed."""
+        self.ttfb = time.perf_counter() - self.started
+        self.status = response.status_code
+        iter_content, close = response.iter_content, response.close
+
+        def tracked_iter_content(*args, **kwargs):
+            try:
+                for chunk in iter_content(*args, **kwargs):
+                    self.body_bytes += len(chunk)
+                    yield chunk
+            except Exception as e:
+                self.finish(response, e)
+                raise
+            self.finish(response)
+
+        def tracked_close():
+            self.finish(response)
+            close()
+
+        # .content, .json(), iter_lines() and streaming all read through iter_content
+        response.iter_content = tracked_iter_content
+        response.close = tracked_close
+        return response
+
+    def finish(self, response: requests.Response = None, error: BaseException = None):
+        if self._finished:
+            return
+        self._finished = True
+        # Bytes off the wire where urllib3 tracks them (not for chunked bodies), else as read
+        raw_read = getattr(getattr(response, "raw", None), "tell", None)
+        response_bytes = max(raw_read() if raw_read else 0, self.body_bytes)
+        self.metrics.record(
+            method=self.method,
+            endpoint=self.endpoint,
+            status=self.status,
+            ttfb=self.ttfb,
+            duration=time.perf_counter() - self.started,
+            request_bytes=self.request_bytes,
+            response_bytes=response_bytes,
+            error=error,
+        )
+
+
+class CallMetrics:
+    def __init__(self, trace_file: str = TRACE_FILE):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self._trace = open(trace_file, "a", buffering=1, encoding="utf-8") if trace_file else None
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Append ``collector()`` (Prometheus text) to ``prometheus()``, e.g. for admission control."""
+        self._collectors.append(collector)
+
+    def start(self, request: requests.PreparedRequest) -> _Call:
+        return _Call(self, request)
+
+    def record(self, method: str, endpoint: str, status: int | None, ttfb: float | None, duration: float,
+               request_bytes: int, response_bytes: int, error: BaseException = None):
+        timed_out = error is not None and _is_timeout(error)
+        label = "timeout" if timed_out else ("error" if error is not None and status is None else str(status))
+        with self._lock:
+            m = self._endpoints.get(endpoint)
+            if m is None:
+                m = self._endpoints[endpoint] = EndpointMetrics()
+            m.statuses[label] += 1
+            m.duration.observe(duration)
+            if ttfb is not None:
+                m.ttfb.observe(ttfb)
+            m.timeouts += timed_out
+            m.errors += error is not None or status is None or status >= 400
+            m.request_bytes += request_bytes
+            m.response_bytes += response_bytes
+            m.max_response_bytes = max(m.max_response_bytes, response_bytes)
+            if self._trace is not None:
+                self._trace.write(json.dumps({
+                    "ts": time.time(),
+                    "method": method,
+                    "endpoint": endpoint,
+                    "status": label,
+                    "ttfb_ms": None if ttfb is None else round(ttfb * 1000, 1),
+                    "duration_ms": round(duration * 1000, 1),
+                    "request_bytes": request_bytes,
+                    "response_bytes": response_bytes,
+                    "error": None if error is None else repr(error),
+                }) + "\n")
+
+    def quantile(self, endpoint: str, q: float, ttfb: bool = False, min_count: int = 1) -> float | None:
+        """Observed duration (or time to first byte) quantile in seconds, once ``min_count`` calls were seen."""
+        with self._lock:
+            m = self._endpoints.get(endpoint)
+            hist = None if m is None else (m.ttfb if ttfb else m.duration)
+            if hist is None or hist.count < min_count:
+                return None
+            return hist.percentile(q)
+
+    def summary(self) -> dict:
+        """Per-endpoint counters and latency percentiles in milliseconds."""
+        def ms(hist, q):
+            value = hist.percentile(q)
+            return None if value is None else round(value * 1000, 1)
+
+        with self._lock:
+            return {
+                endpoint: {
+                    "calls": m.duration.count,
+                    "errors": m.errors,
+                    "timeouts": m.timeouts,
+                    "p50_ms": ms(m.duration, 0.5),
+                    "p95_ms": ms(m.duration, 0.95),
+                    "p99_ms": ms(m.duration, 0.99),
+                    "ttfb_p50_ms": ms(m.ttfb, 0.5),
+                    "ttfb_p95_ms": ms(m.ttfb, 0.95),
+                    "avg_request_kb": round(m.request_bytes / m.duration.count / 1024, 1),
+                    "avg_response_kb": round(m.response_bytes / m.duration.count / 1024, 1),
+                    "max_response_kb": round(m.max_response_bytes / 1024, 1),
+                    "statuses": dict(m.statuses),
+                }
+                for endpoint, m in self._endpoints.items()
+            }
+
+    def prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind, doc):
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            endpoints = {escape_label(endpoint): m for endpoint, m in self._endpoints.items()}
+            header("snaplogic_requests_total", "counter", "Outbound SnapLogic calls by status.")
+            for endpoint, m in endpoints.items():
+                for status, n in m.statuses.items():
+                    lines.append(f'snaplogic_requests_total{{endpoint="{endpoint}",status="{status}"}} {n}')
+            header("snaplogic_request_timeouts_total", "counter", "Calls that timed out.")
+            for endpoint, m in endpoints.items():
+                lines.append(f'snaplogic_request_timeouts_total{{endpoint="{endpoint}"}} {m.timeouts}')
+            header("snaplogic_request_duration_seconds", "histogram", "Time until the response body was read.")
+            for endpoint, m in endpoints.items():
+                lines.extend(histogram_lines("snaplogic_request_duration_seconds", m.duration, f'endpoint="{endpoint}"'))
+            header("snaplogic_time_to_first_byte_seconds", "histogram", "Time until response headers arrived.")
+            for endpoint, m in endpoints.items():
+                lines.extend(histogram_lines("snaplogic_time_to_first_byte_seconds", m.ttfb, f'endpoint="{endpoint}"'))
+            header("snaplogic_request_bytes_total", "counter", "Request body bytes sent.")
+            for endpoint, m in endpoints.items():
+                lines.append(f'snaplogic_request_bytes_total{{endpoint="{endpoint}"}} {m.request_bytes}')
+            header("snaplogic_response_bytes_total", "counter", "Response body bytes received.")
+            for endpoint, m in endpoints.items():
+                lines.append(f'snaplogic_response_bytes_total{{endpoint="{endpoint}"}} {m.response_bytes}')
+        return "\n".join(lines) + "\n" + "".join(collector() for collector in self._collectors)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def histogram_lines(name: str, hist: Histogram, labels: str = "") -> list:
+    """Prometheus ``_bucket``, ``_sum`` and ``_count`` lines for ``hist``."""
+    lines = []
+    cumulative = 0
+    sep = "," if labels else ""
+    for bound, n in zip(hist.buckets + (math.inf,), hist.counts):
+        cumulative += n
+        le = "+Inf" if bound == math.inf else repr(bound)
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {hist.sum}")
+    lines.append(f"{name}_count{suffix} {hist.count}")
+    return lines
+
+
+def start_metrics_server(metrics: CallMetrics, port: int, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """Serve ``metrics.prometheus()`` on ``/metrics`` from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="sl-metrics", daemon=True).start()
+    return server
+
+
+@st.cache_resource(show_spinner=False)
+def get_metrics() -> CallMetrics:
+    metrics = CallMetrics()
+    if METRICS_PORT:
+        start_metrics_server(metrics, METRICS_PORT)
+    return metrics
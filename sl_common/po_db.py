@@ -0,0 +1,108 @@
+"""Shared, persistent PO status and activity log.
+
+Statuses, ERP ids and links used to live in each session's copy of the queue,
+so every buyer saw a private queue, approvals vanished on restart and two
+buyers could approve the same recommendation. They are now kept in the shared
+state backend (``sl_common.state``: Redis with ``SL_STATE_URL``, otherwise a
+SQLite file at ``SL_PO_DB_PATH``), so every session on every replica sees them:
+
+* ``po:status`` is a hash of the current status of every recommendation that
+  has left its loaded state; rows absent from it keep the status from the
+  queue file.
+* ``po:log`` is an append-only list: one entry per status transition. Its
+  length doubles as the revision, and the ``po:revs`` sorted set scores each
+  recommendation by the log entry that last touched it, so sessions can
+  cheaply check whether anything changed and fetch only the rows that did.
+"""
+import os
+import time
+
+import streamlit as st
+
+from sl_common.state import StateBackend, get_state, pack, state_url, unpack
+
+PO_DB_PATH = os.getenv("SL_PO_DB_PATH", ".data/po_status.sqlite3")
+
+_STATUS = "po:status"
+_REVS = "po:revs"
+_LOG = "po:log"
+
+
+class POStatusDB:
+    def __init__(self, state: StateBackend):
+        self.state = state
+
+    def revision(self) -> int:
+        """Number of activity entries; changes whenever any status changes."""
+        return self.state.llen(_LOG)
+
+    def changes_since(self, revision: int) -> tuple[dict, int]:
+        """Current values of rows changed after ``revision``, and the new revision."""
+        # Revision first: a row written meanwhile is returned now and again next time, never missed
+        new_revision = self.revision()
+        rec_ids = self.state.zrangebyscore(_REVS, revision + 1, float("inf"))
+        changes = {}
+        for rec_id, row in zip(rec_ids, self.state.hmget(_STATUS, rec_ids)):
+            if row is not None:
+                row = unpack(row)
+                changes[rec_id] = {"status": row["status"], "internal_id": row["internal_id"], "url": row["url"]}
+        return changes, new_revision
+
+    def transition(self, changes: dict, current: dict, actor: str = "", allowed: tuple = None) -> list:
+        """Apply ``{rec_id: {"status", "internal_id", "url"}}`` atomically.
+
+        With ``allowed``, a row only moves if its current status is one of them,
+        which is how two buyers are kept from claiming the same recommendation.
+        ``current`` gives the loaded status for rows never written before.
+        Returns the rec_ids that actually changed.
+        """
+        applied = []
+        now = time.time()
+        statuses, revs, log = {}, {}, []
+        with self.state.lock("po"):
+            rev = self.revision()
+            rec_ids = list(changes)
+            for rec_id, row in zip(rec_ids, self.state.hmget(_STATUS, rec_ids)):
+                row = unpack(row)
+                from_status = row["status"] if row else current.get(rec_id)
+                if allowed is not None and from_status not in allowed:
+                    continue
+                change = changes[rec_id]
+                internal_id, url = change.get("internal_id"), change.get("url")
+                rev += 1
+                log.append(pack({
+                    "id": rev, "ts": now, "rec_id": rec_id, "from_status": from_status, "to_status": change["status"],
+                    "internal_id": internal_id, "url": url, "actor": actor,
+                }))
+                statuses[rec_id] = pack({
+                    "status": change["status"],
+                    "internal_id": internal_id if internal_id is not None else (row or {}).get("internal_id"),
+                    "url": url if url is not None else (row or {}).get("url"),
+                    "rev": rev, "updated_at": now, "updated_by": actor,
+                })
+                revs[rec_id] = rev
+                applied.append(rec_id)
+            if applied:
+                # Rows before the log: readers take the revision first, so they never skip a change
+                self.state.hset(_STATUS, statuses)
+                self.state.zadd(_REVS, revs)
+                self.state.rpush(_LOG, *log)
+        return applied
+
+    def activity(self, limit: int, offset: int = 0) -> list:
+        """Newest-first page of the activity log."""
+        total = self.revision()
+        stop = total - offset - 1
+        if limit <= 0 or stop < 0:
+            return []
+        entries = self.state.lrange(_LOG, max(stop - limit + 1, 0), stop)
+        return [unpack(entry) for entry in reversed(entries)]
+
+    def activity_count(self) -> int:
+        # The log is append-only, so its length is the entry count.
+        return self.revision()
+
+
+@st.cache_resource(show_spinner=False)
+def get_po_db(path: str = PO_DB_PATH) -> POStatusDB:
+    return POStatusDB(get_state(state_url(path)))
@@ -0,0 +1,140 @@
+"""On-demand exports of the PO recommendations queue.
+
+The page used to serialize the filtered queue to CSV on every rerun, whether
+or not anyone downloaded it. Exports are now written only when a buyer asks
+for one, ``EXPORT_CHUNK_ROWS`` rows at a time straight to a file under
+``SL_EXPORT_DIR``, so no full-size string is ever built, and the file is
+reused for as long as the data version, filters and format stay the same
+(another buyer with the same filters gets it too). Files are evicted oldest
+first past ``SL_EXPORT_MAX_MB``.
+
+CSV is always offered; Parquet needs pyarrow and Excel needs xlsxwriter, both
+imported on first use and only offered when installed.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+EXPORT_DIR = os.getenv("SL_EXPORT_DIR", ".data/exports")
+EXPORT_MAX_MB = float(os.getenv("SL_EXPORT_MAX_MB", "256"))
+EXPORT_CHUNK_ROWS = 50_000
+# One row of an Excel sheet is taken by the header.
+XLSX_MAX_ROWS = 1_048_575
+
+
+def _write_csv(df: pd.DataFrame, path: Path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        df.head(0).to_csv(f, index=False)
+        for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+            df.iloc[start:start + EXPORT_CHUNK_ROWS].to_csv(f, header=False, index=False)
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    # An empty object column has no type to infer; the queue's object columns hold text
+    for column in df.columns[df.dtypes == object]:
+        i = schema.get_field_index(str(column))
+        schema = schema.set(i, schema.field(i).with_type(pa.string()))
+    with pq.ParquetWriter(path, schema) as writer:
+        # One row group per chunk
+        for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+            chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_xlsx(df: pd.DataFrame, path: Path):
+    import xlsxwriter
+
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {XLSX_MAX_ROWS:,} rows; filter the queue or export CSV or Parquet")
+    # constant_memory flushes each row as it is written instead of keeping the sheet in memory
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "remove_timezone": True,
+                                          "default_date_format": "yyyy-mm-dd"})
+    sheet = workbook.add_worksheet("Recommendations")
+    sheet.write_row(0, 0, [str(c) for c in df.columns])
+    row = 1
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS].astype(object)
+        for values in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.write_row(row, 0, values)
+            row += 1
+    workbook.close()
+
+
+# Label -> (suffix, mime type, writer, module it needs)
+FORMATS = {
+    "CSV": (".csv", "text/csv", _write_csv, None),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", _write_parquet, "pyarrow"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", _write_xlsx, "xlsxwriter"),
+}
+
+
+def export_formats() -> list:
+    """Formats whose writer is installed."""
+    return [name for name, (*_, module) in FORMATS.items() if module is None or importlib.util.find_spec(module)]
+
+
+class ExportCache:
+    """Export files named by a hash of what they contain."""
+
+    def __init__(self, directory: str = EXPORT_DIR, max_bytes: int = int(EXPORT_MAX_MB * 1024 * 1024)):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(version, filters: dict, fmt: str, columns: list) -> str:
+        spec = {"version": version, "filters": {k: sorted(map(str, v or [])) for k, v in filters.items()},
+                "format": fmt, "columns": [str(c) for c in columns]}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+    def export(self, df: pd.DataFrame, fmt: str, version, filters: dict) -> Path:
+        """Path of ``df`` written as ``fmt``; written only if this version and filter set has not been already."""
+        suffix, _, write, _ = FORMATS[fmt]
+        path = self.directory / f"{self.key(version, filters, fmt, list(df.columns))}{suffix}"
+        with self._lock:
+            key_lock = self._locks[path.name]
+        # Sessions asking for the same export at once wait for one writer
+        with key_lock:
+            if path.exists():
+                path.touch()
+                return path
+            tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                write(df, tmp)
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path):
+        files = sorted(
+            (p for p in self.directory.iterdir() if p.suffix in {s for s, *_ in FORMATS.values()}),
+            key=lambda p: p.stat().st_mtime,
+        )
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                total -= path.stat().st_size
+                path.unlink(missing_ok=True)
+
+
+@st.cache_resource(show_spinner=False)
+def get_export_cache(directory: str = EXPORT_DIR) -> ExportCache:
+    return ExportCache(directory)
@@ -0,0 +1,184 @@
+"""Approval policy for the PO recommendations queue.
+
+The detail panel's policy checks used to be hard-coded checkboxes, and the
+only real check was ``0 <= recommended_qty <= 10000`` on the chosen row.
+Policies are now declared as data, ``DEFAULT_POLICY`` or a JSON file of the
+same shape named by ``SL_PO_POLICY_PATH``::
+
+    {"rules": [{"id": "preferred_supplier", "type": "preferred_supplier",
+                "label": "Supplier is preferred", "suppliers": ["Supplier A"]}]}
+
+``compile_policy`` turns each rule into a predicate over whole columns, so the
+queue is checked in one vectorized pass per rule: the table shows a pass/fail
+column per rule and bulk approval takes the rows that pass all of them.
+
+Built-in rule types:
+
+* ``preferred_supplier``: ``supplier`` is one of ``suppliers``;
+* ``authority_limit``: ``0 <= recommended_qty <=`` the buyer's limit for the
+  selected ERP and environment, ``limits[erp][env]`` or else ``default``;
+* ``delivery_window``: an order placed today arrives by ``shortage_date``
+  (plus ``grace_days``), given the supplier's lead time,
+  ``lead_time_days[supplier]`` or else ``default_lead_time_days``. Rows whose
+  shortage date cannot be parsed fail.
+
+``register_rule_type`` adds others.
+"""
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sl_common.po_scoring import shortage_days
+
+POLICY_PATH = os.getenv("SL_PO_POLICY_PATH", "")
+
+DEFAULT_POLICY = {
+    "rules": [
+        {
+            "id": "preferred_supplier",
+            "type": "preferred_supplier",
+            "label": "Supplier is preferred",
+            "suppliers": ["Supplier A", "Supplier B", "Supplier C"],
+        },
+        {
+            "id": "authority_limit",
+            "type": "authority_limit",
+            "label": "Within buyer authority limit",
+            "default": 10000,
+            "limits": {"SAP": {"Prod": 5000}, "NetSuite": {"Prod": 2500}},
+        },
+        {
+            "id": "delivery_window",
+            "type": "delivery_window",
+            "label": "Delivery window acceptable",
+            "default_lead_time_days": 14,
+            "lead_time_days": {"Supplier A": 7, "Supplier B": 14, "Supplier C": 21},
+            "grace_days": 0,
+        },
+    ]
+}
+
+
+@dataclass(frozen=True)
+class PolicyContext:
+    """What a check may depend on besides the row itself."""
+
+    erp: str
+    env: str
+    as_of: date
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    label: str
+    # (frame, context) -> one bool per row
+    predicate: Callable[[pd.DataFrame, PolicyContext], np.ndarray]
+    # context -> what the rule requires, for help text
+    explain: Callable[[PolicyContext], str]
+
+    @property
+    def column(self) -> str:
+        return f"check_{self.id}"
+
+
+def _preferred_supplier(spec: dict):
+    suppliers = [str(s) for s in spec["suppliers"]]
+
+    def predicate(frame: pd.DataFrame, context: PolicyContext) -> np.ndarray:
+        return frame["supplier"].isin(suppliers).to_numpy()
+
+    return predicate, lambda context: f"Preferred suppliers: {', '.join(suppliers)}"
+
+
+def _authority_limit(spec: dict):
+    default = float(spec["default"])
+    limits = {erp: {env: float(limit) for env, limit in envs.items()} for erp, envs in spec.get("limits", {}).items()}
+
+    def limit_for(context: PolicyContext) -> float:
+        return limits.get(context.erp, {}).get(context.env, default)
+
+    def predicate(frame: pd.DataFrame, context: PolicyContext) -> np.ndarray:
+        qty = frame["recommended_qty"].to_numpy(float)
+        return (qty >= 0) & (qty <= limit_for(context))
+
+    return predicate, lambda context: f"Up to {limit_for(context):,.0f} units in {context.erp} {context.env}"
+
+
+def _delivery_window(spec: dict):
+    default = float(spec.get("default_lead_time_days", 0))
+    lead_times = {str(supplier): float(days) for supplier, days in spec.get("lead_time_days", {}).items()}
+    grace = float(spec.get("grace_days", 0))
+
+    def predicate(frame: pd.DataFrame, context: PolicyContext) -> np.ndarray:
+        if "days_to_shortage" in frame:
+            # Already worked out by the urgency scores
+            days = frame["days_to_shortage"].to_numpy(float)
+        else:
+            days = shortage_days(frame["shortage_date"]) - np.datetime64(context.as_of, "D").astype("int64")
+        # On a categorical column this maps each supplier once
+        lead = frame["supplier"].map(lead_times).astype(float).fillna(default).to_numpy()
+        # NaN days (no parseable shortage date) compare False
+        return days + grace >= lead
+
+    def explain(context: PolicyContext) -> str:
+        times = ", ".join(f"{supplier} {days:g}d" for supplier, days in lead_times.items())
+        return f"Lead time ({times}; otherwise {default:g}d) must end by the shortage date" + (
+            f" + {grace:g}d" if grace else ""
+        )
+
+    return predicate, explain
+
+
+# Rule type -> compiler returning (predicate, explain); extend with register_rule_type().
+RULE_TYPES = {
+    "preferred_supplier": _preferred_supplier,
+    "authority_limit": _authority_limit,
+    "delivery_window": _delivery_window,
+}
+
+
+def register_rule_type(name: str, compiler: Callable[[dict], tuple]):
+    RULE_TYPES[name] = compiler
+
+
+class Policy:
+    def __init__(self, rules: list):
+        self.rules = rules
+
+    def evaluate(self, frame: pd.DataFrame, context: PolicyContext) -> pd.DataFrame:
+        """One bool column per rule (``rule.column``), plus ``policy_ok`` when every rule passes."""
+        results = {rule.column: rule.predicate(frame, context) for rule in self.rules}
+        results["policy_ok"] = np.logical_and.reduce(list(results.values())) if results else np.ones(len(frame), bool)
+        return pd.DataFrame(results, index=frame.index)
+
+
+def compile_policy(spec: dict) -> Policy:
+    rules = []
+    for i, rule in enumerate(spec.get("rules", [])):
+        rule_type = rule.get("type")
+        if rule_type not in RULE_TYPES:
+            raise ValueError(f"Policy rule {i}: unknown type {rule_type!r} (known: {', '.join(RULE_TYPES)})")
+        rule_id = str(rule.get("id") or rule_type)
+        if any(r.id == rule_id for r in rules):
+            raise ValueError(f"Policy rule {i}: duplicate id {rule_id!r}")
+        try:
+            predicate, explain = RULE_TYPES[rule_type](rule)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Policy rule {rule_id!r} is malformed: {e!r}") from e
+        rules.append(Rule(rule_id, str(rule.get("label") or rule_id), predicate, explain))
+    return Policy(rules)
+
+
+@st.cache_resource(show_spinner=False)
+def get_policy(path: str = POLICY_PATH) -> Policy:
+    if not path:
+        return compile_policy(DEFAULT_POLICY)
+    return compile_policy(json.loads(Path(path).read_text(encoding="utf-8")))
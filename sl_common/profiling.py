@@ -0,0 +1,306 @@
+"""Opt-in profiling of page script runs.
+
+When a page feels slow it is hard to tell whether the time goes to page setup,
+building elements and DataFrames, typewriter pauses or network calls. With
+``?profile=1`` in a page's URL, or profiling switched on for everyone on the
+Admin page (``SL_PROFILE`` sets the default), the page's run is profiled:
+
+* a sampler thread records the script thread's call stack every
+  ``SL_PROFILE_INTERVAL_MS`` milliseconds;
+* wall-clock time is split by phase: ``render`` by default, ``config`` inside
+  ``phase("config")`` (CSS injection and other page setup), ``sleep`` inside
+  ``phase("sleep")`` (typewriter pauses) and ``network`` inside
+  ``phase("network")`` (SnapLogic calls);
+* background jobs submitted during the run are handed its profile
+  (``Job.profile``), and their SnapLogic calls add to its ``background``
+  times, which overlap the script's own; the run that picks a finished job
+  up with ``collect_finished`` shows them too.
+
+The sidebar then shows the phase breakdown and a flame-graph-style call tree,
+with the raw profile as JSON and as folded stacks (for speedscope or
+flamegraph.pl) to download. The previous run's profile is shown collapsed
+above it in the next profiled run: that is where a run that ended in
+``st.stop()`` or ``st.rerun()`` appears, and where background calls that
+finished after their run are counted.
+
+Pages do nothing for this: the entry point, ``GenAI_Demo.py``, picks the page
+with ``st.navigation`` and runs it inside ``profiled_run()``.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+PROFILE = os.getenv("SL_PROFILE", "false").lower() == "true"
+PROFILE_INTERVAL_MS = float(os.getenv("SL_PROFILE_INTERVAL_MS", "5"))
+# Call tree nodes below this share of the samples are left out of the summary.
+_MIN_SHARE = 0.02
+_MAX_DEPTH = 12
+_BAR_WIDTH = 12
+
+_local = threading.local()
+# Each session's last profiled run, until its next profiled run shows it
+_previous = OrderedDict()
+_previous_lock = threading.Lock()
+_MAX_PREVIOUS = 256
+
+
+class ProfilingSettings:
+    """Process-wide switch, flipped from the Admin page."""
+
+    def __init__(self, all_sessions: bool = PROFILE):
+        self.all_sessions = all_sessions
+
+
+@st.cache_resource(show_spinner=False)
+def get_profiling_settings() -> ProfilingSettings:
+    return ProfilingSettings()
+
+
+def profiling_enabled() -> bool:
+    value = st.query_params.get("profile", "")
+    if value:
+        return value.lower() not in ("0", "false", "off")
+    return get_profiling_settings().all_sessions
+
+
+@functools.lru_cache(maxsize=4096)
+def _label(code) -> str:
+    path = Path(code.co_filename)
+    try:
+        where = path.relative_to(Path.cwd())
+    except ValueError:
+        where = Path(*path.parts[-2:])
+    return f"{code.co_name} ({where}:{code.co_firstlineno})"
+
+
+class PageProfile:
+    def __init__(self, page: str, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.page = page
+        self.interval = interval_ms / 1000
+        self.started_at = time.time()
+        self.wall = 0.0
+        self.phases = Counter()      # seconds spent in each phase, nested phases excluded
+        self.background = Counter()  # seconds background jobs spent in each phase
+        self.collected_from = []     # earlier runs whose jobs finished and were picked up in this one
+        self.samples = Counter()     # (phase, call stack from the page down) -> samples
+        self.outcome = "running"
+        self.thread_id = None
+        self._stack = ["render"]
+        self._since = self._start = time.perf_counter()
+        self._done = threading.Event()
+        self._sampler = None
+        self._lock = threading.Lock()
+
+    def _switch(self):
+        now = time.perf_counter()
+        self.phases[self._stack[-1]] += now - self._since
+        self._since = now
+
+    def push(self, name: str):
+        self._switch()
+        self._stack.append(name)
+
+    def pop(self):
+        self._switch()
+        self._stack.pop()
+
+    def add_background(self, name: str, seconds: float):
+        with self._lock:
+            self.background[name] += seconds
+
+    def collected(self, submitted_by: "PageProfile"):
+        """Note that a job started by ``submitted_by`` was picked up in this run."""
+        if submitted_by is not self and all(p is not submitted_by for p in self.collected_from):
+            self.collected_from.append(submitted_by)
+
+    def background_times(self) -> list:
+        """``(phase, seconds)`` spent by background jobs, largest first."""
+        with self._lock:
+            return self.background.most_common()
+
+    def start(self, root_code):
+        self.thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, args=(self.thread_id, root_code), daemon=True,
+                                         name="page-profiler")
+        self._sampler.start()
+
+    def _sample(self, thread_id: int, root_code):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame.f_code))
+                if frame.f_code is root_code:
+                    break
+                frame = frame.f_back
+            if frame is not None:
+                self.samples[(self._stack[-1], tuple(reversed(stack)))] += 1
+
+    def finish(self, outcome: str = "completed"):
+        self._switch()
+        self.wall = time.perf_counter() - self._start
+        self.outcome = outcome
+        self._done.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def folded(self) -> str:
+        """Samples as folded stacks, one ``phase;caller;callee count`` line each."""
+        return "".join(
+            f"{';'.join((phase, *stack))} {n}\n" for (phase, stack), n in sorted(self.samples.items())
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "page": self.page,
+            "started_at": self.started_at,
+            "outcome": self.outcome,
+            "wall_ms": round(self.wall * 1000, 2),
+            "phases_ms": {name: round(s * 1000, 2) for name, s in self.phases.most_common()},
+            "background_ms": {name: round(s * 1000, 2) for name, s in self.background_times()},
+            "sample_interval_ms": self.interval * 1000,
+            "samples": {";".join((phase, *stack)): n for (phase, stack), n in self.samples.items()},
+        }
+
+    def call_tree(self) -> str:
+        """Samples as an indented tree with bars, widest callers first."""
+        total = sum(self.samples.values())
+        if not total:
+            return "(run too short to sample)"
+        tree = {}
+        for (_, stack), n in self.samples.items():
+            node = tree
+            for label in stack:
+                entry = node.setdefault(label, [0, {}])
+                entry[0] += n
+                node = entry[1]
+        lines = []
+
+        def walk(node: dict, depth: int):
+            for label, (n, children) in sorted(node.items(), key=lambda item: -item[1][0]):
+                if n / total < _MIN_SHARE or depth > _MAX_DEPTH:
+                    continue
+                # A caller whose time is all in one callee shares its line
+                while len(children) == 1 and next(iter(children.values()))[0] == n:
+                    child_label, (_, children) = next(iter(children.items()))
+                    label = f"{label} › {child_label}"
+                bar = "█" * max(1, round(_BAR_WIDTH * n / total))
+                lines.append(f"{bar:<{_BAR_WIDTH}} {n / total:>4.0%} {'  ' * depth}{label}")
+                walk(children, depth + 1)
+
+        walk(tree, 0)
+        return "\n".join(lines)
+
+
+def current_profile() -> PageProfile | None:
+    """The profile of the script run on this thread, if it is being profiled."""
+    return getattr(_local, "profile", None)
+
+
+@contextmanager
+def phase(name: str, profile: PageProfile = None):
+    """Count the block's time as ``name`` in ``profile``, by default the current thread's run.
+
+    Off the profiled run's own thread (background jobs) the time is added to
+    the profile's ``background`` times instead.
+    """
+    profile = profile or current_profile()
+    if profile is None:
+        yield
+        return
+    if profile.thread_id != threading.get_ident():
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.add_background(name, time.perf_counter() - start)
+        return
+    profile.push(name)
+    try:
+        yield
+    finally:
+        profile.pop()
+
+
+@contextmanager
+def profiled_run(page: str = None):
+    """Profile the ``with`` block, named ``page``, when profiling is on for this run.
+
+    Nothing is drawn until the block ends, so the page can still call
+    ``st.set_page_config`` first; then the previous run's profile and this
+    one's are drawn in the sidebar, unless the run was stopped.
+    """
+    if current_profile() is not None or not profiling_enabled():
+        yield None
+        return
+    # The caller's frame, below this generator and contextlib's __enter__
+    root = sys._getframe(2).f_code
+    if "profile_key" not in st.session_state:
+        st.session_state.profile_key = uuid.uuid4().hex
+    key = st.session_state.profile_key
+    with _previous_lock:
+        previous = _previous.pop(key, None)
+    profile = _local.profile = PageProfile(page or Path(root.co_filename).name)
+    profile.start(root)
+    try:
+        yield profile
+    except Exception:
+        _end(key, profile, "error")
+        _render(previous, profile)
+        raise
+    except BaseException:
+        # st.stop() or st.rerun(): nothing more can be drawn in this run
+        _end(key, profile, "stopped")
+        raise
+    _end(key, profile)
+    _render(previous, profile)
+
+
+def _render(previous: PageProfile | None, profile: PageProfile):
+    if previous is not None:
+        render_profile(previous, f"Previous run ({previous.outcome})", expanded=False)
+    render_profile(profile)
+
+
+def _end(key: str, profile: PageProfile, outcome: str = "completed"):
+    profile.finish(outcome)
+    _local.profile = None
+    with _previous_lock:
+        _previous[key] = profile
+        while len(_previous) > _MAX_PREVIOUS:
+            _previous.popitem(last=False)
+
+
+def render_profile(profile: PageProfile, title: str = "Profile", expanded: bool = True):
+    with st.sidebar.expander(f"🔬 {title} · {profile.wall * 1000:.0f} ms", expanded=expanded):
+        st.caption(f"{profile.page} · {profile.outcome} · {sum(profile.samples.values())} samples")
+        total = profile.wall or 1
+        st.code("\n".join(
+            f"{name:<8} {'█' * max(1, round(_BAR_WIDTH * seconds / total)):<{_BAR_WIDTH}} "
+            f"{seconds / total:>4.0%} {seconds * 1000:>8.1f} ms"
+            for name, seconds in profile.phases.most_common()
+        ), language=None)
+        for source in (profile, *profile.collected_from):
+            background = source.background_times()
+            if background:
+                at = time.strftime("%H:%M:%S", time.localtime(source.started_at))
+                started_by = "this run" if source is profile else f"the run at {at}"
+                st.caption(f"Background jobs started by {started_by}: " + ", ".join(
+                    f"{name} {seconds * 1000:.0f} ms" for name, seconds in background
+                ))
+        st.code(profile.call_tree(), language=None)
+        name = f"profile_{Path(profile.page).stem.replace(' ', '_')}_{int(profile.started_at * 1000)}"
+        c1, c2 = st.columns(2)
+        c1.download_button("📥 JSON", data=json.dumps(profile.to_dict(), indent=1), file_name=f"{name}.json",
+                           mime="application/json", key=f"{name}_json")
+        c2.download_button("📥 Folded stacks", data=profile.folded(), file_name=f"{name}.folded.txt",
+                           key=f"{name}_folded")
@@ -0,0 +1,83 @@
+"""Incremental rendering of agent replies (the typewriter effect).
+
+Streamlit markdown elements are replaced wholesale on every update, so sending
+the text after each word costs O(n^2) bytes over the websocket. The renderer
+here buffers appended text and only flushes once the pending text is a fixed
+fraction of what is already on screen (or a time budget has passed), which
+keeps the total bytes sent linear in the answer length. Streamed replies are
+read by a background job and shown by its polling fragment (``sl_common.background``).
+"""
+import math
+import os
+import time
+
+import streamlit as st
+
+from sl_common.profiling import phase
+
+# Words per second for the typewriter effect; 0 renders replies immediately.
+TYPEWRITER_SPEED = float(os.getenv("SL_TYPEWRITER_SPEED", "35"))
+# Upper bound on artificial typing delay, however long the reply is.
+TYPEWRITER_MAX_SECONDS = float(os.getenv("SL_TYPEWRITER_MAX_SECONDS", "3"))
+
+
+class IncrementalRenderer:
+    """Appends text to a single placeholder, batching frontend updates."""
+
+    def __init__(self, container=None, min_bytes: int = 64, growth: float = 0.25, max_interval: float = 0.25):
+        self._container = container if container is not None else st.empty()
+        self._parts = []
+        self._text = ""
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.min_bytes = min_bytes
+        self.growth = growth
+        self.max_interval = max_interval
+        self.flushes = 0
+        self.bytes_sent = 0
+
+    @property
+    def text(self) -> str:
+        if self._parts:
+            self._text += "".join(self._parts)
+            self._parts = []
+        return self._text
+
+    def append(self, chunk: str):
+        if not chunk:
+            return
+        self._parts.append(chunk)
+        self._pending += len(chunk)
+        budget = max(self.min_bytes, self.growth * len(self._text))
+        if self._pending >= budget or time.monotonic() - self._last_flush >= self.max_interval:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        text = self.text
+        self._container.markdown(text)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.flushes += 1
+        self.bytes_sent += len(text)
+
+
+def typewriter(text: str, speed: float = TYPEWRITER_SPEED, container=None, max_seconds: float = TYPEWRITER_MAX_SECONDS):
+    """Reveal ``text`` word by word, capped at ``max_seconds`` of pacing."""
+    container = container if container is not None else st.empty()
+    words = text.split(" ")
+    if speed <= 0 or len(words) <= 1:
+        container.markdown(text)
+        return
+    # Reveal several words per step when the reply is too long to type out in time.
+    steps = max(1, min(len(words), int(speed * max_seconds)))
+    per_step = math.ceil(len(words) / steps)
+    delay = min(1 / speed, max_seconds / steps)
+    renderer = IncrementalRenderer(container, min_bytes=0, max_interval=0)
+    for start in range(0, len(words), per_step):
+        end = start + per_step
+        renderer.append(" ".join(words[start:end]) + (" " if end < len(words) else ""))
+        with phase("sleep"):
+            time.sleep(delay)
+    renderer.flush()
@@ -0,0 +1,260 @@
+"""Deadlines, retries, hedging and circuit breaking for SnapLogic calls.
+
+``SnapLogicClient.request`` runs every call through an ``EndpointGuard``:
+
+* the read timeout is derived from the endpoint's observed time to first byte
+  (p99 × ``SL_DEADLINE_FACTOR``, between ``SL_MIN_TIMEOUT`` and
+  ``SL_TASK_TIMEOUT``) once ``min_samples`` calls have been seen;
+* idempotent calls (agent questions) are retried on timeouts, connection errors
+  and 429/502/503/504 with full-jitter exponential backoff, honouring
+  ``Retry-After``; other calls (PO creation) are only retried when the request
+  never reached the server;
+* with ``SL_HEDGE=true`` an idempotent call that has no response after the p95
+  time to first byte is sent a second time and the first answer wins;
+* after ``SL_BREAKER_FAILURES`` consecutive failures the endpoint's circuit
+  opens and calls fail fast with ``CircuitOpen`` for ``SL_BREAKER_RESET``
+  seconds, after which one trial call decides whether it closes again.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from sl_common.agent import AgentError
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    connect_timeout: float = float(os.getenv("SL_CONNECT_TIMEOUT", "10"))
+    min_timeout: float = float(os.getenv("SL_MIN_TIMEOUT", "10"))
+    deadline_factor: float = float(os.getenv("SL_DEADLINE_FACTOR", "3"))
+    deadline_quantile: float = 0.99
+    min_samples: int = 20
+    retries: int = int(os.getenv("SL_RETRIES", "2"))
+    backoff: float = float(os.getenv("SL_RETRY_BACKOFF", "0.5"))
+    backoff_max: float = 8.0
+    hedge: bool = os.getenv("SL_HEDGE", "false").lower() == "true"
+    hedge_quantile: float = 0.95
+    breaker_failures: int = int(os.getenv("SL_BREAKER_FAILURES", "5"))
+    breaker_reset: float = float(os.getenv("SL_BREAKER_RESET", "30"))
+
+
+class CircuitOpen(AgentError):
+    """The endpoint failed repeatedly; calls are refused until it cools down."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"⚠️ {endpoint} is not responding reliably, so new requests are paused for "
+            f"{retry_in:.0f}s. Answers already cached are still available."
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True when the request provably never reached the server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.replace(".", "", 1).isdigit() else None
+
+
+def _backoff(policy: CallPolicy, attempt: int) -> float:
+    """Full jitter: uniform between 0 and the exponential backoff cap."""
+    return random.uniform(0, min(policy.backoff_max, policy.backoff * 2 ** (attempt + 1)))
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class EndpointGuard:
+    """Circuit breaker and retry/hedge counters for one endpoint."""
+
+    def __init__(self, policy: CallPolicy):
+        self.policy = policy
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.calls = self.retries = self.hedges = self.hedge_wins = self.short_circuited = self.trips = 0
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        return max(self.opened_at + self.policy.breaker_reset - time.monotonic(), 0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and self.retry_in() <= 0:
+                self.state = "half_open"  # let exactly one trial call through
+                return True
+            if self.state != "closed":
+                self.short_circuited += 1
+                return False
+            return True
+
+    def release_trial(self):
+        """Let the next call be the trial when this one ended without an outcome."""
+        with self._lock:
+            if self.state == "half_open":
+                # opened_at is already past the reset, so the next allow() lets a call through
+                self.state = "open"
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.state, self.failures = "closed", 0
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.policy.breaker_failures:
+                if self.state != "open":
+                    self.trips += 1
+                self.state, self.opened_at = "open", time.monotonic()
+
+    def count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "circuit": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_s": round(self.retry_in()) if self.state == "open" else None,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+                "calls": self.calls,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+class Resilience:
+    """Runs calls under their endpoint's deadline, retry, hedge and breaker policy."""
+
+    def __init__(self, metrics=None, hedge_workers: int = 16):
+        self.metrics = metrics
+        self._guards = {}
+        self._lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="sl-hedge")
+
+    def guard_for(self, endpoint: str, policy: CallPolicy) -> EndpointGuard:
+        with self._lock:
+            guard = self._guards.get(endpoint)
+            if guard is None:
+                guard = self._guards[endpoint] = EndpointGuard(policy)
+            return guard
+
+    def _quantile(self, endpoint: str, q: float, policy: CallPolicy) -> float | None:
+        if self.metrics is None:
+            return None
+        return self.metrics.quantile(endpoint, q, ttfb=True, min_count=policy.min_samples)
+
+    def deadline(self, endpoint: str, policy: CallPolicy, ceiling: float) -> tuple:
+        """``(connect, read)`` timeout for the next attempt."""
+        observed = self._quantile(endpoint, policy.deadline_quantile, policy)
+        read = ceiling if observed is None else min(max(observed * policy.deadline_factor, policy.min_timeout), ceiling)
+        return policy.connect_timeout, read
+
+    def call(self, endpoint: str, policy: CallPolicy, send, timeout, budget: float, idempotent: bool,
+             job=None) -> requests.Response:
+        """``send(timeout)`` with retries within ``budget`` seconds.
+
+        ``timeout`` None derives the deadline of each attempt from the endpoint's
+        latency. Backoff between attempts waits on ``job``, if given, so a
+        cancelled job stops retrying at once.
+        """
+        guard = self.guard_for(endpoint, policy)
+        give_up_at = time.monotonic() + budget
+        attempt = 0
+        last_error = None
+        while True:
+            if not guard.allow():
+                if last_error is not None:
+                    # This call's own failure opened the circuit (or failed its trial): report that failure
+                    raise last_error
+                raise CircuitOpen(endpoint, guard.retry_in())
+            guard.count("calls")
+            attempt_timeout = timeout or self.deadline(endpoint, policy, max(give_up_at - time.monotonic(), policy.min_timeout))
+            try:
+                if idempotent and policy.hedge:
+                    response = self._hedged(endpoint, policy, guard, send, attempt_timeout)
+                else:
+                    response = send(attempt_timeout)
+            except requests.RequestException as e:
+                guard.record(False)
+                delay = _backoff(policy, attempt)
+                if not (idempotent or _not_sent(e)) or attempt >= policy.retries or time.monotonic() + delay >= give_up_at:
+                    raise
+                last_error = e
+            except BaseException:
+                # Refused a slot, cancelled or stopped: say nothing about the endpoint, but free a trial call
+                guard.release_trial()
+                raise
+            else:
+                guard.record(response.status_code < 500)
+                if not idempotent or response.status_code not in RETRY_STATUSES or attempt >= policy.retries:
+                    return response
+                delay = min(_retry_after(response) or _backoff(policy, attempt), policy.backoff_max)
+                if time.monotonic() + delay >= give_up_at or guard.state == "open":
+                    # Out of time, or the circuit just opened: the server's own answer beats CircuitOpen
+                    return response
+                response.close()
+            guard.count("retries")
+            attempt += 1
+            if job is not None:
+                job.sleep(delay)
+            else:
+                time.sleep(delay)
+
+    def _hedged(self, endpoint: str, policy: CallPolicy, guard: EndpointGuard, send, timeout) -> requests.Response:
+        hedge_after = self._quantile(endpoint, policy.hedge_quantile, policy)
+        if hedge_after is None:
+            return send(timeout)
+        first = self._hedge_pool.submit(send, timeout)
+        try:
+            return first.result(timeout=hedge_after)
+        except FutureTimeout:
+            pass
+        guard.count("hedges")
+        second = self._hedge_pool.submit(send, timeout)
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winners = [f for f in done if f.exception() is None]
+            if winners:
+                winner = winners[0]
+                for loser in [*winners[1:], *pending]:
+                    loser.add_done_callback(_close_response)
+                if winner is second:
+                    guard.count("hedge_wins")
+                return winner.result()
+            error = next(iter(done)).exception()
+        raise error
+
+    def degraded(self, endpoint: str) -> str | None:
+        """The degraded-mode message while ``endpoint``'s circuit is open."""
+        with self._lock:
+            guard = self._guards.get(endpoint)
+        if guard is None or guard.state == "closed":
+            return None
+        return str(CircuitOpen(endpoint, guard.retry_in()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            guards = dict(self._guards)
+        return {endpoint: guard.stats() for endpoint, guard in guards.items()}
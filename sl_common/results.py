@@ -0,0 +1,248 @@
+"""Rendering of structured agent results.
+
+The Snowflake agent returns JSON. Lists of records (rows) become Arrow tables
+saved as Parquet under ``SL_RESULTS_DIR`` and are shown as a paginated,
+sortable ``st.dataframe``: only the current page is sliced and sent to the
+browser, and CSV/Parquet downloads are prepared on request. Everything else
+is rendered as Markdown bullets, built in linear time and capped in size,
+items per level and depth so one huge answer cannot stall the browser.
+pyarrow is imported on first use, so a page without tables never loads it.
+"""
+import io
+import json
+import math
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+RESULTS_DIR = os.getenv("SL_RESULTS_DIR", ".data/results")
+RESULTS_MAX_MB = float(os.getenv("SL_RESULTS_MAX_MB", "512"))
+RESULT_PAGE_SIZE = int(os.getenv("SL_RESULT_PAGE_SIZE", "50"))
+MARKDOWN_MAX_CHARS = int(os.getenv("SL_MARKDOWN_MAX_CHARS", "20000"))
+MARKDOWN_MAX_ITEMS = 50
+MARKDOWN_MAX_DEPTH = 6
+
+# Fewer rows than this read better as bullets than as a table.
+_MIN_TABLE_ROWS = 2
+_LOADED_TABLES = 8
+
+
+def json_to_markdown(obj, max_chars: int = MARKDOWN_MAX_CHARS, max_items: int = MARKDOWN_MAX_ITEMS,
+                     max_depth: int = MARKDOWN_MAX_DEPTH) -> str:
+    """Render a dict or list as Markdown bullets, like the original recursive renderer.
+
+    Lines are collected in a list and joined once. At most ``max_items`` entries
+    are shown per level, anything deeper than ``max_depth`` is shown as compact
+    JSON, and output stops after ``max_chars``.
+    """
+    lines = []
+    size = 0
+
+    def emit(line: str) -> bool:
+        nonlocal size
+        lines.append(line)
+        size += len(line)
+        return size < max_chars
+
+    def walk(value, indent: int) -> bool:
+        prefix = "    " * indent + "- "
+        if indent > max_depth and isinstance(value, (dict, list)):
+            text = json.dumps(value, default=str)
+            return emit(f"{prefix}`{text[:200]}{'…' if len(text) > 200 else ''}`\n")
+        if isinstance(value, dict):
+            for i, (k, v) in enumerate(value.items()):
+                if i == max_items:
+                    return emit(f"{prefix}_… {len(value) - max_items} more keys_\n")
+                if isinstance(v, (dict, list)):
+                    if not emit(f"{prefix}**{k}:**\n") or not walk(v, indent + 1):
+                        return False
+                elif not emit(f"{prefix}**{k}:** {v}\n"):
+                    return False
+        elif isinstance(value, list):
+            for idx, item in enumerate(value):
+                if idx == max_items:
+                    return emit(f"{prefix}_… {len(value) - max_items} more items_\n")
+                if not emit(f"{prefix}{idx + 1}.\n") or not walk(item, indent + 1):
+                    return False
+        else:
+            return emit(f"{prefix}{value}\n")
+        return True
+
+    if not walk(obj, 0):
+        lines.append("\n_… output truncated_\n")
+    return "".join(lines)
+
+
+def find_records(obj, depth: int = 0) -> list | None:
+    """Return the list of row dicts in a result, looking through one or two wrappers."""
+    if isinstance(obj, list) and obj and all(isinstance(row, dict) for row in obj):
+        if len(obj) >= _MIN_TABLE_ROWS:
+            return obj
+        obj = obj[0]
+    if isinstance(obj, dict) and depth < 2:
+        lists = [v for v in obj.values() if isinstance(v, list)]
+        if len(lists) == 1:
+            return find_records(lists[0], depth + 1)
+    return None
+
+
+def _cell(value):
+    return json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+
+
+def records_to_table(records: list) -> "pa.Table":
+    """Columnar Arrow table; nested values become JSON text, mixed types become text."""
+    import pyarrow as pa
+
+    columns = {}
+    for row in records:
+        for key in row:
+            columns.setdefault(str(key), None)
+    arrays = {}
+    for key in columns:
+        values = [_cell(row.get(key)) for row in records]
+        try:
+            arrays[key] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays[key] = pa.array([None if v is None else str(v) for v in values], pa.string())
+    return pa.table(arrays)
+
+
+class ResultStore:
+    """Parquet files for table results, with a few recently used ones kept loaded."""
+
+    def __init__(self, directory: str = RESULTS_DIR, max_bytes: int = int(RESULTS_MAX_MB * 1024 * 1024)):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._tables = OrderedDict()
+        self._sort_indices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, result_id: str, suffix: str = ".parquet") -> Path:
+        return self.directory / f"{result_id}{suffix}"
+
+    def save(self, table: "pa.Table") -> str:
+        import pyarrow.parquet as pq
+
+        result_id = uuid.uuid4().hex
+        pq.write_table(table, self._path(result_id))
+        self._evict()
+        return result_id
+
+    def _evict(self):
+        files = sorted(self.directory.glob("*.*"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+
+    def exists(self, result_id: str) -> bool:
+        return self._path(result_id).exists()
+
+    def load(self, result_id: str) -> "pa.Table | None":
+        import pyarrow.parquet as pq
+
+        with self._lock:
+            if result_id in self._tables:
+                self._tables.move_to_end(result_id)
+                return self._tables[result_id]
+        path = self._path(result_id)
+        if not path.exists():
+            return None
+        table = pq.read_table(path, memory_map=True)
+        with self._lock:
+            self._tables[result_id] = table
+            while len(self._tables) > _LOADED_TABLES:
+                self._tables.popitem(last=False)
+        return table
+
+    def page(self, result_id: str, start: int, size: int, sort_by: str = None, descending: bool = False) -> "pa.Table":
+        table = self.load(result_id)
+        if not sort_by:
+            return table.slice(start, size)
+        key = (result_id, sort_by, descending)
+        with self._lock:
+            indices = self._sort_indices.get(key)
+        if indices is None:
+            import pyarrow.compute as pc
+
+            indices = pc.sort_indices(table, sort_keys=[(sort_by, "descending" if descending else "ascending")])
+            with self._lock:
+                self._sort_indices[key] = indices
+                while len(self._sort_indices) > _LOADED_TABLES:
+                    self._sort_indices.popitem(last=False)
+        return table.take(indices.slice(start, size))
+
+    def parquet_bytes(self, result_id: str) -> bytes:
+        return self._path(result_id).read_bytes()
+
+    def csv_bytes(self, result_id: str) -> bytes:
+        path = self._path(result_id, ".csv")
+        if not path.exists():
+            import pyarrow.csv as pa_csv
+
+            buffer = io.BytesIO()
+            pa_csv.write_csv(self.load(result_id), buffer)
+            path.write_bytes(buffer.getvalue())
+        return path.read_bytes()
+
+
+@st.cache_resource(show_spinner=False)
+def get_result_store(directory: str = RESULTS_DIR) -> ResultStore:
+    return ResultStore(directory)
+
+
+def build_reply(result, results: ResultStore) -> dict:
+    """Assistant message for a JSON result: a table reference or Markdown bullets."""
+    records = find_records(result)
+    if records is None:
+        return {"role": "assistant", "content": json_to_markdown(result)}
+    table = records_to_table(records)
+    return {
+        "role": "assistant",
+        "content": f"**{table.num_rows:,} rows × {table.num_columns} columns**",
+        "result_id": results.save(table),
+    }
+
+
+def render_reply(message: dict):
+    st.markdown(message["content"])
+    if message.get("result_id"):
+        # Cached answers share a result_id, so widgets are keyed per message
+        render_result_table(get_result_store(), message["result_id"], message.get("message_id", message["result_id"]))
+
+
+def render_result_table(results: ResultStore, result_id: str, key: str = None, page_size: int = RESULT_PAGE_SIZE):
+    """Paged, sortable view of a saved result; ``key`` (default ``result_id``) must be unique on the page."""
+    key = key or result_id
+    table = results.load(result_id)
+    if table is None:
+        st.caption("⌛ This result is no longer stored; ask again to see it.")
+        return
+    pages = max(1, math.ceil(table.num_rows / page_size))
+    c1, c2, c3 = st.columns([2, 1, 1])
+    sort_by = c1.selectbox("Sort by", [None, *table.column_names], format_func=lambda c: c or "(original order)",
+                           key=f"sort_{key}")
+    descending = c2.toggle("Descending", key=f"desc_{key}", disabled=sort_by is None)
+    page = c3.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"page_{key}")
+    start = (page - 1) * page_size
+    st.dataframe(results.page(result_id, start, page_size, sort_by, descending), hide_index=True, use_container_width=True)
+    st.caption(f"Rows {start + 1:,}–{min(start + page_size, table.num_rows):,} of {table.num_rows:,}")
+    # Downloads are only prepared on request, so large results cost nothing per rerun
+    if st.toggle("📥 Download full result", key=f"dl_{key}"):
+        d1, d2 = st.columns(2)
+        d1.download_button("CSV", data=results.csv_bytes(result_id), file_name="result.csv", mime="text/csv",
+                           key=f"csv_{key}")
+        d2.download_button("Parquet", data=results.parquet_bytes(result_id), file_name="result.parquet",
+                           key=f"parquet_{key}")
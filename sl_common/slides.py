@@ -0,0 +1,127 @@
+"""python-pptx drawing of Deck Builder slides.
+
+Kept apart from ``sl_common.deck`` so python-pptx is only imported once a deck
+is actually rendered, not when the Deck Builder page is first shown. Each
+drawn slide's XML part is cached under a hash of the template, its content and
+its position, so a rebuild only draws the slides that changed.
+"""
+import io
+import json
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+from pptx.oxml import parse_xml
+from pptx.util import Inches, Pt
+
+from sl_common.deck_cache import DeckCache, content_key
+
+NAVY = RGBColor(0x0A, 0x16, 0x28)
+BLUE = RGBColor(0x0A, 0x4F, 0xA8)
+CYAN = RGBColor(0x00, 0xD4, 0xFF)
+WHITE = RGBColor(0xFF, 0xFF, 0xFF)
+MUTED = RGBColor(0xB8, 0xC4, 0xD6)
+
+
+def _fill(shape, color: RGBColor):
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = color
+    shape.line.fill.background()
+
+
+def _text(slide, left, top, width, height, lines, size: int, color: RGBColor = WHITE, bold: bool = False,
+          align=PP_ALIGN.LEFT, anchor=MSO_ANCHOR.TOP):
+    frame = slide.shapes.add_textbox(left, top, width, height).text_frame
+    frame.word_wrap = True
+    frame.vertical_anchor = anchor
+    for i, line in enumerate([lines] if isinstance(lines, str) else lines):
+        paragraph = frame.paragraphs[0] if i == 0 else frame.add_paragraph()
+        paragraph.alignment = align
+        paragraph.space_after = Pt(size * 0.6)
+        run = paragraph.add_run()
+        run.text = line
+        run.font.size = Pt(size)
+        run.font.bold = bold
+        run.font.color.rgb = color
+
+
+def _blank_layout(prs: Presentation):
+    for layout in prs.slide_layouts:
+        if layout.name.lower() == "blank":
+            return layout
+    return prs.slide_layouts[len(prs.slide_layouts) - 1]
+
+
+def _draw_slide(slide, prs: Presentation, content: dict, number: int, total: int):
+    width, height = prs.slide_width, prs.slide_height
+    slide.background.fill.solid()
+    slide.background.fill.fore_color.rgb = NAVY
+    margin = Inches(0.6)
+    if content["type"] == "Title":
+        _fill(slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, int(height * 0.62), width, Inches(0.08)), CYAN)
+        _text(slide, margin, int(height * 0.25), width - 2 * margin, Inches(1.6), content["title"], 40, bold=True,
+              anchor=MSO_ANCHOR.BOTTOM)
+        _text(slide, margin, int(height * 0.66), width - 2 * margin, Inches(1.2), content["subtitle"], 20, CYAN)
+        return
+    _fill(slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, width, Inches(1.1)), BLUE)
+    _fill(slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, Inches(1.1), width, Inches(0.06)), CYAN)
+    _text(slide, margin, Inches(0.15), width - 2 * margin, Inches(0.8), content["title"], 30, bold=True,
+          anchor=MSO_ANCHOR.MIDDLE)
+    top = Inches(1.4)
+    if content["subtitle"]:
+        _text(slide, margin, top, width - 2 * margin, Inches(0.7), content["subtitle"], 18, CYAN)
+        top += Inches(0.8)
+    if content["stats"]:
+        gap = Inches(0.3)
+        box_width = int((width - 2 * margin - gap * (len(content["stats"]) - 1)) / len(content["stats"]))
+        for i, stat in enumerate(content["stats"]):
+            left = margin + i * (box_width + gap)
+            _fill(slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, left, top, box_width, Inches(1.9)), BLUE)
+            _text(slide, left, top + Inches(0.15), box_width, Inches(1.0), str(stat.get("value", "")), 44, CYAN,
+                  bold=True, align=PP_ALIGN.CENTER)
+            _text(slide, left + Inches(0.15), top + Inches(1.15), box_width - Inches(0.3), Inches(0.7),
+                  str(stat.get("label", "")), 14, align=PP_ALIGN.CENTER)
+        top += Inches(2.2)
+    if content["bullets"]:
+        _text(slide, margin, top, width - 2 * margin, height - top - Inches(0.7),
+              [f"▸  {bullet}" for bullet in content["bullets"]], 18, MUTED)
+    _text(slide, width - Inches(1.6), height - Inches(0.55), Inches(1.2), Inches(0.4), f"{number} / {total}", 11,
+          MUTED, align=PP_ALIGN.RIGHT)
+
+
+def _restore_slide(slide, xml: bytes):
+    """Give a new blank slide the shapes and background of a cached slide part."""
+    root = slide.element
+    for child in list(root):
+        root.remove(child)
+    # Slides only hold shapes and text, so the part has no relationships to carry over
+    root.extend(list(parse_xml(xml)))
+
+
+def render_deck(template: bytes, slides: list, cache: DeckCache = None) -> bytes:
+    prs = Presentation(io.BytesIO(template))
+    layout = _blank_layout(prs)
+    template_key = content_key(template)
+    for number, content in enumerate(slides, 1):
+        slide = prs.slides.add_slide(layout)
+        key = content_key(template_key, json.dumps(content, sort_keys=True), number, len(slides))
+        xml = cache.get_part(key) if cache is not None else None
+        if xml is not None:
+            _restore_slide(slide, xml)
+            continue
+        _draw_slide(slide, prs, content, number, len(slides))
+        if cache is not None:
+            cache.put_part(key, slide.part.blob)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def blank_template() -> bytes:
+    """An empty 16:9 deck, used when no ``SL_DECK_TEMPLATE`` is configured."""
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Inches(13.333), Inches(7.5)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,457 @@
+"""Shared state backend, so any replica can serve any session.
+
+Chat transcripts, PO statuses and the little per-session data worth keeping
+(``save_session``) live behind ``StateBackend``: a handful of Redis commands
+(strings, lists, hashes, sorted sets, expiry and a lock) with two
+implementations, chosen by ``SL_STATE_URL``:
+
+* ``redis://`` / ``rediss://`` / ``unix://`` URLs use ``RedisState`` on any
+  Redis-compatible server (Redis, Valkey, KeyDB, ...); it needs the optional
+  ``redis`` package;
+* ``sqlite:///path`` (or no URL) uses ``SQLiteState``, an embedded stand-in with
+  the same semantics for a single host and for tests. Without ``SL_STATE_URL``
+  each store keeps using its own file (``SL_TRANSCRIPT_DB_PATH``,
+  ``SL_PO_DB_PATH``).
+
+Values are compact JSON, zlib-compressed above ``COMPRESS_MIN_BYTES``, and
+stores read only what they need (the newest messages of a transcript, the PO
+rows changed since a revision). ``session_id()`` combines who is asking (the
+signed-in user, or else the ``SL_SESSION_COOKIE`` browser cookie) with a
+per-tab ``?tab=`` token, so a browser reconnecting to another replica, or after
+a rolling deploy, picks up the same transcripts while each tab keeps its own.
+The id itself never appears in the URL: the tab token alone, leaked through
+history, logs or a shared link, does not lead to anyone's transcripts.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+from sl_common.config import ConfigError
+
+STATE_URL = os.getenv("SL_STATE_URL", "")
+STATE_PREFIX = os.getenv("SL_STATE_PREFIX", "sl:")
+SESSION_TTL_HOURS = float(os.getenv("SL_SESSION_TTL_HOURS", "24"))
+SESSION_COOKIE = os.getenv("SL_SESSION_COOKIE", "sl_session")
+TAB_PARAM = "tab"
+COMPRESS_MIN_BYTES = 512
+LOCK_TIMEOUT = 30
+
+
+def pack(value) -> bytes:
+    data = json.dumps(value, separators=(",", ":"), default=str).encode()
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data)
+    return b"j" + data
+
+
+def unpack(data: bytes | None):
+    if data is None:
+        return None
+    return json.loads(zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:])
+
+
+class StateBackend(ABC):
+    """The Redis commands the stores use. Values are bytes; ``lrange`` stops are inclusive."""
+
+    url = ""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float = None):
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    def expire(self, key: str, ttl: float):
+        ...
+
+    @abstractmethod
+    def rpush(self, key: str, *values: bytes) -> int:
+        ...
+
+    @abstractmethod
+    def llen(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def lrange(self, key: str, start: int, stop: int) -> list:
+        ...
+
+    @abstractmethod
+    def hset(self, key: str, mapping: dict):
+        ...
+
+    @abstractmethod
+    def hmget(self, key: str, fields: list) -> list:
+        ...
+
+    @abstractmethod
+    def hgetall(self, key: str) -> dict:
+        ...
+
+    @abstractmethod
+    def zadd(self, key: str, mapping: dict):
+        ...
+
+    @abstractmethod
+    def zrangebyscore(self, key: str, low: float, high: float) -> list:
+        ...
+
+    @abstractmethod
+    def lock(self, name: str, timeout: float = LOCK_TIMEOUT):
+        """Context manager held by one caller across all replicas."""
+
+    def purge(self):
+        """Drop expired keys; Redis does this itself."""
+
+
+class RedisState(StateBackend):
+    def __init__(self, url: str, prefix: str = STATE_PREFIX):
+        try:
+            import redis
+        except ImportError as e:
+            raise ConfigError(f"SL_STATE_URL={url!r} needs the redis package (pip install redis)") from e
+        self.url = url
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, health_check_interval=30)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def get(self, key):
+        return self._redis.get(self._key(key))
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(self._key(key), value, px=None if ttl is None else int(ttl * 1000))
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*map(self._key, keys))
+
+    def expire(self, key, ttl):
+        self._redis.pexpire(self._key(key), int(ttl * 1000))
+
+    def rpush(self, key, *values):
+        return self._redis.rpush(self._key(key), *values)
+
+    def llen(self, key):
+        return self._redis.llen(self._key(key))
+
+    def lrange(self, key, start, stop):
+        return self._redis.lrange(self._key(key), start, stop)
+
+    def hset(self, key, mapping):
+        if mapping:
+            self._redis.hset(self._key(key), mapping=mapping)
+
+    def hmget(self, key, fields):
+        return self._redis.hmget(self._key(key), fields) if fields else []
+
+    def hgetall(self, key):
+        return {field.decode(): value for field, value in self._redis.hgetall(self._key(key)).items()}
+
+    def zadd(self, key, mapping):
+        if mapping:
+            self._redis.zadd(self._key(key), mapping)
+
+    def zrangebyscore(self, key, low, high):
+        return [member.decode() for member in self._redis.zrangebyscore(self._key(key), low, high)]
+
+    def lock(self, name, timeout=LOCK_TIMEOUT):
+        return self._redis.lock(self._key(f"lock:{name}"), timeout=timeout, blocking_timeout=timeout)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS list_items (
+    key TEXT NOT NULL, idx INTEGER NOT NULL, value BLOB NOT NULL, PRIMARY KEY (key, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hash_items (
+    key TEXT NOT NULL, field TEXT NOT NULL, value BLOB NOT NULL, PRIMARY KEY (key, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS zset_items (
+    key TEXT NOT NULL, member TEXT NOT NULL, score REAL NOT NULL, PRIMARY KEY (key, member)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS zset_items_score ON zset_items (key, score);
+CREATE TABLE IF NOT EXISTS expiry (key TEXT PRIMARY KEY, expires REAL NOT NULL) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS expiry_expires ON expiry (expires);
+"""
+_TABLES = ("kv", "list_items", "hash_items", "zset_items", "expiry")
+
+
+class SQLiteState(StateBackend):
+    """Redis semantics on a SQLite file; WAL, so readers never block the writer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.url = f"sqlite:///{path}"
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self):
+        """A write transaction, or the one ``lock`` already holds."""
+        conn = self._conn()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _live(self, conn: sqlite3.Connection, key: str) -> bool:
+        """False (and the key dropped) once its TTL has passed."""
+        row = conn.execute("SELECT expires FROM expiry WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] > time.time():
+            return True
+        with self._tx() as tx:
+            self._drop(tx, [key])
+        return False
+
+    @staticmethod
+    def _drop(conn: sqlite3.Connection, keys: list):
+        for table in _TABLES:
+            conn.executemany(f"DELETE FROM {table} WHERE key = ?", [(key,) for key in keys])
+
+    def get(self, key):
+        conn = self._conn()
+        if not self._live(conn, key):
+            return None
+        row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key, value, ttl=None):
+        with self._tx() as conn:
+            conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, value))
+            if ttl is None:
+                conn.execute("DELETE FROM expiry WHERE key = ?", (key,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO expiry (key, expires) VALUES (?, ?)", (key, time.time() + ttl))
+
+    def delete(self, *keys):
+        with self._tx() as conn:
+            self._drop(conn, list(keys))
+
+    def expire(self, key, ttl):
+        with self._tx() as conn:
+            conn.execute("INSERT OR REPLACE INTO expiry (key, expires) VALUES (?, ?)", (key, time.time() + ttl))
+
+    def rpush(self, key, *values):
+        with self._tx() as conn:
+            self._live(conn, key)
+            length = conn.execute("SELECT COUNT(*) FROM list_items WHERE key = ?", (key,)).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO list_items (key, idx, value) VALUES (?, ?, ?)",
+                [(key, length + i, value) for i, value in enumerate(values)],
+            )
+            return length + len(values)
+
+    def llen(self, key):
+        conn = self._conn()
+        if not self._live(conn, key):
+            return 0
+        return conn.execute("SELECT COUNT(*) FROM list_items WHERE key = ?", (key,)).fetchone()[0]
+
+    def lrange(self, key, start, stop):
+        conn = self._conn()
+        if start < 0 or stop < 0:
+            length = self.llen(key)
+            start, stop = (start + length if start < 0 else start), (stop + length if stop < 0 else stop)
+        elif not self._live(conn, key):
+            return []
+        rows = conn.execute(
+            "SELECT value FROM list_items WHERE key = ? AND idx BETWEEN ? AND ? ORDER BY idx",
+            (key, max(start, 0), stop),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def hset(self, key, mapping):
+        with self._tx() as conn:
+            self._live(conn, key)
+            conn.executemany(
+                "INSERT OR REPLACE INTO hash_items (key, field, value) VALUES (?, ?, ?)",
+                [(key, field, value) for field, value in mapping.items()],
+            )
+
+    def hmget(self, key, fields):
+        conn = self._conn()
+        if not fields or not self._live(conn, key):
+            return [None] * len(fields)
+        found = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(fields), 500):
+            chunk = fields[i:i + 500]
+            found.update(conn.execute(
+                f"SELECT field, value FROM hash_items WHERE key = ? AND field IN ({', '.join('?' * len(chunk))})",
+                (key, *chunk),
+            ).fetchall())
+        return [found.get(field) for field in fields]
+
+    def hgetall(self, key):
+        conn = self._conn()
+        if not self._live(conn, key):
+            return {}
+        return dict(conn.execute("SELECT field, value FROM hash_items WHERE key = ?", (key,)).fetchall())
+
+    def zadd(self, key, mapping):
+        with self._tx() as conn:
+            self._live(conn, key)
+            conn.executemany(
+                "INSERT OR REPLACE INTO zset_items (key, member, score) VALUES (?, ?, ?)",
+                [(key, member, score) for member, score in mapping.items()],
+            )
+
+    def zrangebyscore(self, key, low, high):
+        conn = self._conn()
+        if not self._live(conn, key):
+            return []
+        rows = conn.execute(
+            "SELECT member FROM zset_items WHERE key = ? AND score BETWEEN ? AND ? ORDER BY score, member",
+            (key, low, high),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def lock(self, name, timeout=LOCK_TIMEOUT):
+        # SQLite has one writer at a time: holding a write transaction is the lock,
+        # and everything done under it commits atomically.
+        return self._tx()
+
+    def purge(self):
+        with self._tx() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM expiry WHERE expires <= ?", (time.time(),))]
+            self._drop(conn, keys)
+
+
+def state_url(sqlite_path: str) -> str:
+    """``SL_STATE_URL``, or a SQLite file for a store that has its own path setting."""
+    return STATE_URL or f"sqlite:///{sqlite_path}"
+
+
+def open_state(url: str) -> StateBackend:
+    scheme = url.partition("://")[0]
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisState(url)
+    if scheme == "sqlite":
+        path = url.partition("://")[2]
+        return SQLiteState(path[1:] if path.startswith("/") else path)
+    raise ConfigError(f"Unsupported state backend {url!r}; use redis://, rediss://, unix:// or sqlite:///")
+
+
+@st.cache_resource(show_spinner=False)
+def get_state(url: str) -> StateBackend:
+    return open_state(url)
+
+
+def describe_state(state: StateBackend) -> str:
+    """The backend's URL with any password masked, for display."""
+    return re.sub(r"//([^/@:]*):[^/@]*@", r"//\1:***@", state.url)
+
+
+def _set_cookie(name: str, value: str, max_age: float):
+    """Set a cookie on the app's origin from the browser; Streamlit has no server-side way to."""
+    cookie = json.dumps(f"{name}={value}; Path=/; Max-Age={int(max_age)}; SameSite=Strict")
+    script = (
+        f"<script>window.parent.document.cookie = {cookie}"
+        " + (window.parent.location.protocol === 'https:' ? '; Secure' : '');</script>"
+    )
+    if hasattr(st, "iframe"):
+        st.iframe(script, height="content")
+    else:  # Streamlit before st.iframe
+        import streamlit.components.v1 as components
+
+        components.html(script, height=0)
+
+
+def session_id() -> str:
+    """This tab's session id, the same on every replica.
+
+    Who is asking comes from the signed-in user (``st.login``), else from the
+    ``SL_SESSION_COOKIE`` cookie. A load balancer or auth proxy may set it
+    (ideally httpOnly); otherwise the app sets one itself on the first visit,
+    from script, so it is not httpOnly. The ``?tab=`` token keeps the tabs of
+    one user apart; a duplicated tab keeps its token, and with it the
+    conversation. Everything is hashed, so the id shown on the Admin page or
+    sent to agents reveals neither. With ``SL_SESSION_COOKIE`` empty and
+    nobody signed in, the session cannot be resumed elsewhere and gets a
+    random id.
+    """
+    if "session_tab" not in st.session_state:
+        tab = st.query_params.get(TAB_PARAM, "")
+        if not re.fullmatch(r"[0-9a-f]{8,32}", tab):
+            tab = uuid.uuid4().hex[:16]
+        if st.user.get("is_logged_in"):
+            identity = f"user:{st.user.get('sub') or st.user.get('email')}"
+        elif SESSION_COOKIE:
+            cookie = st.context.cookies.get(SESSION_COOKIE)
+            # Only real cookie values count; AppTest hands back a mock
+            if not (isinstance(cookie, str) and cookie):
+                cookie = uuid.uuid4().hex
+                _set_cookie(SESSION_COOKIE, cookie, SESSION_TTL_HOURS * 3600)
+            identity = f"cookie:{cookie}"
+        else:
+            identity = None
+        st.session_state.session_tab = tab
+        st.session_state.session_id = (
+            str(uuid.UUID(bytes=hashlib.sha256(f"{identity}|tab:{tab}".encode()).digest()[:16]))
+            if identity else str(uuid.uuid4())
+        )
+    if st.query_params.get(TAB_PARAM) != st.session_state.session_tab:
+        # Also restores the token after switching pages, which clears the query string
+        st.query_params[TAB_PARAM] = st.session_state.session_tab
+    if "sid" in st.query_params:
+        # Links from before the id left the URL
+        del st.query_params["sid"]
+    return st.session_state.session_id
+
+
+def _session_key() -> str:
+    return f"session:{session_id()}"
+
+
+def load_session() -> dict:
+    """Small values saved for this session with ``save_session``, from any replica."""
+    state = get_state(STATE_URL) if STATE_URL else None
+    if state is None:
+        return {}
+    return {field: unpack(value) for field, value in state.hgetall(_session_key()).items()}
+
+
+def save_session(**values):
+    state = get_state(STATE_URL) if STATE_URL else None
+    if state is None:
+        return
+    key = _session_key()
+    state.hset(key, {field: pack(value) for field, value in values.items()})
+    state.expire(key, SESSION_TTL_HOURS * 3600)
@@ -0,0 +1,265 @@
+"""Chat transcripts in the shared state backend with a bounded in-memory tail.
+
+Chat histories used to be plain lists in ``st.session_state``, so a kiosk
+session left open all day kept every answer in server memory, and a session
+only existed on the replica that created it. Every message of a
+``Transcript`` is now written through to the state backend
+(``sl_common.state``: Redis with ``SL_STATE_URL``, otherwise a SQLite file at
+``SL_TRANSCRIPT_DB_PATH``) as one list per transcript, and only the newest
+messages, up to ``SL_SESSION_HISTORY_KB`` per transcript, stay in memory.
+It behaves like a read-only list with ``append`` (``len``, indexing, slicing),
+so ``ContextWindow`` and the pages use it unchanged; only reads of older
+messages touch the backend. A transcript opened on another replica, or after
+a restart, starts with nothing in memory and reads its newest messages back
+when first rendered.
+
+Pages render the transcript with ``render_transcript``: only the newest
+``SL_CHAT_VISIBLE_MESSAGES`` messages plus any earlier pages the user asked
+for with "Load earlier messages", inside a fragment, so a rerun costs the same
+however long the thread and paging back reruns only the history. Transcripts
+idle for ``SL_SESSION_IDLE_MINUTES`` are dropped from memory, and the backend
+forgets a transcript ``SL_TRANSCRIPT_RETENTION_HOURS`` after its last message.
+"""
+import os
+import threading
+import time
+import weakref
+from collections.abc import Sequence
+
+import streamlit as st
+
+from sl_common.state import StateBackend, get_state, pack, session_id, state_url, unpack
+
+TRANSCRIPT_DB_PATH = os.getenv("SL_TRANSCRIPT_DB_PATH", ".data/transcripts.sqlite3")
+SESSION_HISTORY_KB = int(os.getenv("SL_SESSION_HISTORY_KB", "64"))
+SESSION_IDLE_MINUTES = float(os.getenv("SL_SESSION_IDLE_MINUTES", "30"))
+TRANSCRIPT_RETENTION_HOURS = float(os.getenv("SL_TRANSCRIPT_RETENTION_HOURS", "24"))
+CHAT_VISIBLE_MESSAGES = int(os.getenv("SL_CHAT_VISIBLE_MESSAGES", "20"))
+EARLIER_PAGE_SIZE = 20
+
+# The newest exchange always stays in memory, whatever its size.
+_MIN_IN_MEMORY = 2
+# Dict, key and bookkeeping overhead per message, on top of its text.
+_MESSAGE_OVERHEAD_BYTES = 200
+_MAINTENANCE_INTERVAL = 60
+
+
+def message_size(message: dict) -> int:
+    return len(message["content"]) + _MESSAGE_OVERHEAD_BYTES
+
+
+class TranscriptStore:
+    """Messages of every transcript in the state backend, plus a registry of this process's live transcripts."""
+
+    def __init__(self, state: StateBackend, retention_hours: float = TRANSCRIPT_RETENTION_HOURS):
+        self.state = state
+        self.retention_seconds = retention_hours * 3600
+        self._live = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._last_maintenance = time.monotonic()
+
+    @staticmethod
+    def _key(transcript_id: str) -> str:
+        return f"transcript:{transcript_id}"
+
+    def register(self, transcript: "Transcript"):
+        with self._lock:
+            self._live[transcript.id] = transcript
+
+    def append(self, transcript_id: str, messages: list) -> int:
+        """Store ``messages`` after the transcript's others; returns its new length."""
+        key = self._key(transcript_id)
+        length = self.state.rpush(key, *(pack(m) for m in messages))
+        self.state.expire(key, self.retention_seconds)
+        return length
+
+    def length(self, transcript_id: str) -> int:
+        return self.state.llen(self._key(transcript_id))
+
+    def read(self, transcript_id: str, start: int, stop: int) -> list:
+        if stop <= start:
+            return []
+        return [unpack(m) for m in self.state.lrange(self._key(transcript_id), start, stop - 1)]
+
+    def maintain(self, force: bool = False):
+        """Drop idle transcripts from memory and expired ones from the backend; at most once a minute."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_maintenance < _MAINTENANCE_INTERVAL:
+                return
+            self._last_maintenance = now
+            live = list(self._live.values())
+        for transcript in live:
+            if transcript.idle_seconds > SESSION_IDLE_MINUTES * 60:
+                transcript.evict()
+        self.state.purge()
+
+    def report(self) -> list:
+        """Memory held per live transcript, for the Admin page."""
+        with self._lock:
+            live = list(self._live.values())
+        return [transcript.stats() for transcript in live]
+
+
+class Transcript(Sequence):
+    def __init__(self, transcript_id: str, store: TranscriptStore, budget_bytes: int = SESSION_HISTORY_KB * 1024):
+        self.id = transcript_id
+        self.store = store
+        self.budget_bytes = budget_bytes
+        self._tail = []       # newest messages, seq numbers offset..offset+len(tail)-1
+        self._offset = store.length(transcript_id)  # messages before this seq are only in the backend
+        self._tail_bytes = 0
+        self._paged_back = 0  # messages shown beyond the newest visible_limit
+        self._earlier = []    # spilled messages paged back in for display
+        self._earlier_range = None
+        self.visible_limit = CHAT_VISIBLE_MESSAGES
+        self._lock = threading.RLock()
+        self.last_active = time.monotonic()
+        store.register(self)
+
+    def __len__(self) -> int:
+        return self._offset + len(self._tail)
+
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                start, stop, step = index.indices(len(self))
+                if step != 1:
+                    return [self[i] for i in range(start, stop, step)]
+                return self._range(start, stop)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("transcript index out of range")
+            return self._range(index, index + 1)[0]
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def _range(self, start: int, stop: int) -> list:
+        if stop <= start:
+            return []
+        in_memory = self._tail[max(start - self._offset, 0):max(stop - self._offset, 0)]
+        if start >= self._offset:
+            return list(in_memory)
+        return self.store.read(self.id, start, min(stop, self._offset)) + in_memory
+
+    def append(self, message: dict):
+        with self._lock:
+            self.touch()
+            length = self.store.append(self.id, [message])
+            if length == len(self) + 1:
+                self._tail.append(message)
+                self._tail_bytes += message_size(message)
+            else:
+                # Another replica wrote to this transcript too; read it back from the backend
+                self._tail, self._tail_bytes, self._offset = [], 0, length
+            # Once the user moves on, stop holding paged-back messages
+            self._paged_back = 0
+            self._earlier, self._earlier_range = [], None
+            self._trim(self.budget_bytes, _MIN_IN_MEMORY)
+        self.store.maintain()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_active
+
+    def _trim(self, budget_bytes: int, keep: int):
+        # Every message is already in the backend, so dropping the oldest from memory loses nothing
+        count = size = 0
+        while len(self._tail) - count > keep and self._tail_bytes - size > budget_bytes:
+            size += message_size(self._tail[count])
+            count += 1
+        if count:
+            del self._tail[:count]
+            self._offset += count
+            self._tail_bytes -= size
+
+    def evict(self):
+        """Drop every message from memory; they are read back when needed."""
+        with self._lock:
+            self._earlier, self._earlier_range = [], None
+            self._trim(0, 0)
+
+    def visible(self) -> list:
+        """Messages to render: the newest ``visible_limit`` plus any paged-back ones.
+
+        After an eviction, or when the session moved from another replica, the
+        newest messages are read back so a returning user sees where they left off.
+        """
+        with self._lock:
+            self.touch()
+            if not self._tail and self._offset:
+                self._tail = self.store.read(self.id, max(self._offset - _MIN_IN_MEMORY, 0), self._offset)
+                self._offset -= len(self._tail)
+                self._tail_bytes = sum(message_size(m) for m in self._tail)
+            start = self.hidden
+            if start >= self._offset:
+                return self._tail[start - self._offset:]
+            # Read the older part once per page-back, not on every rerun
+            if self._earlier_range != (start, self._offset):
+                self._earlier = self.store.read(self.id, start, self._offset)
+                self._earlier_range = (start, self._offset)
+            return self._earlier + self._tail
+
+    @property
+    def hidden(self) -> int:
+        """Messages older than the ones shown."""
+        return max(len(self) - self.visible_limit - self._paged_back, 0)
+
+    def load_earlier(self, count: int = EARLIER_PAGE_SIZE):
+        with self._lock:
+            self._paged_back += count
+
+    def stats(self) -> dict:
+        with self._lock:
+            session_id, _, name = self.id.rpartition(":")
+            return {
+                "session": session_id[:8],
+                "transcript": name,
+                "messages": len(self),
+                "in_memory": len(self._tail) + len(self._earlier),
+                "memory_kb": round((self._tail_bytes + sum(message_size(m) for m in self._earlier)) / 1024, 1),
+                "not_in_memory": self._offset,
+                "idle_min": round(self.idle_seconds / 60, 1),
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_transcript_store(path: str = TRANSCRIPT_DB_PATH) -> TranscriptStore:
+    return TranscriptStore(get_state(state_url(path)))
+
+
+def get_transcript(key: str) -> Transcript:
+    """The session's transcript stored under ``st.session_state[key]``, created on first use."""
+    if key not in st.session_state:
+        # Same key on two pages (both CRM pages) means one shared transcript, as before
+        st.session_state[key] = Transcript(f"{session_id()}:{key}", get_transcript_store())
+    transcript = st.session_state[key]
+    transcript.touch()
+    return transcript
+
+
+def _render_markdown(message: dict):
+    st.markdown(message["content"])
+
+
+@st.fragment
+def render_transcript(transcript: Transcript, render_message=_render_markdown):
+    """Chat history with a "Load earlier messages" page-back.
+
+    ``render_message`` draws one message's body inside its chat bubble.
+    """
+    if transcript.hidden > 0:
+        # A click reruns only this fragment; the callback runs first, so the history below is already extended
+        st.button(
+            f"⬆️ Load earlier messages ({transcript.hidden} more)",
+            key=f"earlier_{transcript.id}",
+            on_click=transcript.load_earlier,
+        )
+    for message in transcript.visible():
+        with st.chat_message(message["role"]):
+            render_message(message)
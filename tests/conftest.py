@@ -0,0 +1,90 @@
+"""Shared setup for the page tests.
+
+Starts ``tools/stub_server.py`` in-process and points every page, the PO
+pipeline and the Deck Builder's Anthropic client at it before any
+``sl_common`` module reads its settings. State (PO database, results, deck
+cache) goes to a temporary directory, and the PO queue is the generated one
+from ``benchmarks/bench_pages.py``, whose rows all pass the default policy.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+URL_VARS = ("SL_CRM_SQL_TASK_URL", "SL_Tampa_TASK_URL", "SL_SF_TASK_URL", "SL_PO_TASK_URL")
+QUEUE_ROWS = 50
+
+
+def pytest_configure(config):
+    from bench_pages import write_queue
+    from stub_server import make_server
+
+    server = make_server(words=20, token_delay=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config.stub = server
+    base = f"http://127.0.0.1:{server.server_port}"
+    workdir = tempfile.mkdtemp(prefix="sl-tests-")
+    for var in URL_VARS:
+        os.environ[var] = f"{base}/{var.lower()}"
+    # The Snowflake agent answers with rows, like a real query result
+    os.environ["SL_SF_TASK_URL"] += "?mode=rows&rows=120"
+    os.environ.update({
+        "ANTHROPIC_BASE_URL": base,
+        "ANTHROPIC_API_KEY": "stub",
+        "SL_PO_RECS_PATH": os.path.join(workdir, "recs.csv"),
+        "SL_PO_DB_PATH": os.path.join(workdir, "po_status.sqlite3"),
+        "SL_TRANSCRIPT_DB_PATH": os.path.join(workdir, "transcripts.sqlite3"),
+        "SL_RESULTS_DIR": os.path.join(workdir, "results"),
+        "SL_EXPORT_DIR": os.path.join(workdir, "exports"),
+        "SL_DECK_CACHE_DIR": os.path.join(workdir, "deck_cache"),
+        "SL_TYPEWRITER_SPEED": "0",
+    })
+    write_queue(os.environ["SL_PO_RECS_PATH"], QUEUE_ROWS)
+
+
+def pytest_unconfigure(config):
+    if hasattr(config, "stub"):
+        config.stub.shutdown()
+
+
+@pytest.fixture
+def stub_stats(pytestconfig):
+    """Requests served by the stub so far, by kind (``feed_master``, ``slsched``, ``po``, ``model``)."""
+    return pytestconfig.stub.RequestHandlerClass.stats
+
+
+@pytest.fixture
+def app():
+    """Open a page with AppTest and run it once."""
+    from streamlit.testing.v1 import AppTest
+
+    def open_page(script: str):
+        at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=60)
+        at.run()
+        assert not at.exception, at.exception[0].value
+        return at
+
+    return open_page
+
+
+@pytest.fixture
+def wait_for_jobs():
+    """Rerun a page until its background jobs under ``jobs_key`` are collected."""
+    def wait(at, jobs_key: str, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        while at.session_state[jobs_key]:
+            assert time.monotonic() < deadline, f"{jobs_key} still running after {timeout}s"
+            time.sleep(0.05)
+            at.run()
+        assert not at.exception, at.exception[0].value
+        return at
+
+    return wait
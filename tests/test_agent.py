@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from sl_common.agent import ResponseTooLarge, decode_json, extract_reply
+
+
+def _chunks(text: str, size: int) -> list:
+    data = text.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+DOCUMENTS = [
+    {"rows": [{"id": i, "name": f"Row {i}", "amount": i * 1.5, "tags": ["a", "é"]} for i in range(20)], "total": 20},
+    [{"id": 1}, {"id": 2, "nested": {"deep": [1, 2, {"x": None}]}}],
+    {"choices": [{"message": {"content": "Hello \"world\" ✓"}}]},
+    12345678901234567890,
+    [],
+    {},
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("size", [1, 3, 7, 64 * 1024])
+def test_matches_json_loads_whatever_the_chunking(document, size):
+    text = json.dumps(document, ensure_ascii=False, indent=1)
+
+    assert decode_json(_chunks(text, size)) == json.loads(text)
+
+
+def test_records_are_handed_over_as_they_complete():
+    seen = []
+    result = decode_json(_chunks(json.dumps({"rows": [{"id": 1}, {"id": 2}], "count": 2}), 5), seen.append)
+
+    assert seen == [{"id": 1}, {"id": 2}]
+    assert result["count"] == 2
+
+
+def test_numbers_split_across_chunks_are_not_truncated():
+    assert decode_json([b"[12", b"34.5", b"6]"]) == [1234.56]
+
+
+def test_oversized_body_is_refused():
+    with pytest.raises(ResponseTooLarge):
+        decode_json(_chunks(json.dumps(["x" * 100] * 100), 256), max_bytes=1000)
+
+
+@pytest.mark.parametrize("text", ['{"a": 1', '[1, 2', '{"a": 1} extra', '{"a" 1}'])
+def test_malformed_documents_raise(text):
+    with pytest.raises(json.JSONDecodeError):
+        decode_json(_chunks(text, 2))
+
+
+def test_extract_reply_reads_both_contracts():
+    assert extract_reply({"response": "hi"}) == "hi"
+    assert extract_reply([{"choices": [{"message": {"content": "hi"}}]}]) == "hi**\n\n"
+    assert extract_reply([]) is None
@@ -0,0 +1,28 @@
+def test_entry_point_opens_the_home_page(app):
+    at = app("GenAI_Demo.py")
+
+    assert at.sidebar.title[0].value == "Agent Creator Catalog"
+    # Not profiled unless asked for
+    assert not at.sidebar.expander
+
+
+def test_every_page_is_reachable_through_the_entry_point(app):
+    at = app("GenAI_Demo.py")
+
+    at.switch_page("app_pages/Rays Agent.py").run()
+    assert not at.exception
+    assert at.title[0].value == "Tampa Bay Rays Agent"
+
+
+def test_profile_query_param_profiles_the_selected_page(app):
+    at = app("GenAI_Demo.py")
+    at.switch_page("app_pages/Rays Agent.py").run()
+    at.query_params["profile"] = "1"
+    at.run()
+    at.run()
+
+    assert not at.exception
+    expanders = [e.label for e in at.sidebar.expander]
+    assert expanders[0].startswith("🔬 Previous run (completed)")
+    assert expanders[1].startswith("🔬 Profile")
+    assert at.sidebar.caption[-1].value.startswith("Rays Agent · completed")
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from sl_common.agent import AgentError
+from sl_common.cache import ResponseCache, Sized
+
+
+def test_identical_questions_are_computed_once():
+    cache = ResponseCache(ttl=60, max_entries=10, max_bytes=1 << 20)
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("crm", "Top accounts", compute)))
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute("crm", "  top ACCOUNTS ", compute)))
+    waiter.start()
+    release.set()
+    leader.join()
+    waiter.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False), ("answer", True)]
+    assert cache.stats()["coalesced"] == 1
+
+
+def test_waiter_gives_up_at_its_timeout():
+    cache = ResponseCache(ttl=60, max_entries=10, max_bytes=1 << 20)
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    leader = threading.Thread(target=cache.get_or_compute, args=("crm", "slow question", compute))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(AgentError, match="still unanswered"):
+        cache.get_or_compute("crm", "slow question", compute, timeout=0.1)
+    release.set()
+    leader.join()
+
+
+def test_sized_values_are_stored_with_their_size():
+    cache = ResponseCache(ttl=60, max_entries=10, max_bytes=1 << 20)
+
+    value, from_cache = cache.get_or_compute("sf", "revenue", lambda: Sized({"reply": "ok"}, 2048))
+
+    assert (value, from_cache) == ({"reply": "ok"}, False)
+    assert cache.stats()["size_kb"] == 2.0
+
+
+def test_discard_forces_a_recompute():
+    cache = ResponseCache(ttl=60, max_entries=10, max_bytes=1 << 20)
+    cache.get_or_compute("sf", "revenue", lambda: "first")
+    cache.discard("sf", "revenue")
+
+    assert cache.get_or_compute("sf", "revenue", lambda: "second") == ("second", False)
@@ -0,0 +1,34 @@
+def _ask(at, wait_for_jobs, jobs_key: str, question: str):
+    at.chat_input[0].set_value(question).run()
+    return wait_for_jobs(at, jobs_key)
+
+
+def _replies(at) -> list:
+    return [m.markdown[-1].value for m in at.chat_message if m.name == "assistant" and m.markdown]
+
+
+def test_crm_agent_answers_a_turn(app, wait_for_jobs, stub_stats):
+    before = stub_stats["slsched"]
+    at = _ask(app("app_pages/CRM Agent.py"), wait_for_jobs, "CRM_SQL_jobs", "top accounts by revenue")
+
+    assert any("You asked: top accounts by revenue" in reply for reply in _replies(at))
+    assert stub_stats["slsched"] == before + 1
+
+
+def test_crm_agent_repeat_question_is_served_from_the_answer_cache(app, wait_for_jobs, stub_stats):
+    _ask(app("app_pages/CRM Agent.py"), wait_for_jobs, "CRM_SQL_jobs", "open opportunities in EMEA")
+    before = stub_stats["slsched"]
+    # Another session asking the same question shares the answer
+    at = _ask(app("app_pages/CRM Agent.py"), wait_for_jobs, "CRM_SQL_jobs", "open opportunities in EMEA")
+
+    assert any("You asked: open opportunities in EMEA" in reply for reply in _replies(at))
+    assert stub_stats["slsched"] == before
+
+
+def test_rays_agent_keeps_the_conversation_per_session(app, wait_for_jobs):
+    at = app("app_pages/Rays Agent.py")
+    _ask(at, wait_for_jobs, "Tampa_jobs", "first question")
+    _ask(at, wait_for_jobs, "Tampa_jobs", "second question")
+
+    replies = _replies(at)
+    assert "(turn 1)" in replies[0] and "(turn 2)" in replies[1]
@@ -0,0 +1,40 @@
+import io
+
+from pptx import Presentation
+
+PAGE = "app_pages/Deck Builder.py"
+
+
+def _generate(at, wait_for_jobs, customer: str, snaplogic: str):
+    at.text_area[0].set_value(customer)
+    at.text_area[1].set_value(snaplogic)
+    next(b for b in at.button if "Generate" in b.label).click().run()
+    return wait_for_jobs(at, "deck_jobs")
+
+
+def test_generates_a_deck_with_the_selected_slide_count(app, wait_for_jobs, stub_stats):
+    before = stub_stats["model"]
+    at = _generate(app(PAGE), wait_for_jobs, "Globex runs 40 plants on SAP", "Snaps for SAP and Kafka")
+
+    deck = Presentation(io.BytesIO(at.session_state["deck"]))
+    assert len(deck.slides) == 8
+    assert stub_stats["model"] == before + 8
+    assert at.session_state["deck_reused"] == (0, 8)
+
+
+def test_unchanged_rebuild_reuses_every_slide(app, wait_for_jobs, stub_stats):
+    at = _generate(app(PAGE), wait_for_jobs, "Initech has 12 legacy ERPs", "Replace point-to-point scripts")
+    before = stub_stats["model"]
+    _generate(at, wait_for_jobs, "Initech has 12 legacy ERPs", "Replace point-to-point scripts")
+
+    assert stub_stats["model"] == before
+    assert at.session_state["deck_reused"] == (8, 8)
+    assert any(c.value.startswith("♻️ Reused 8 of 8 slides") for c in at.caption)
+
+
+def test_missing_fields_are_reported(app):
+    at = app(PAGE)
+    next(b for b in at.button if "Generate" in b.label).click().run()
+
+    assert [e.value for e in at.error] == ["Please fill in both fields before continuing."]
+    assert not at.session_state["deck_jobs"]
@@ -0,0 +1,47 @@
+import pytest
+
+from sl_common.po_db import POStatusDB
+from sl_common.po_store import RecommendationStore, load_frame
+from sl_common.state import SQLiteState
+
+
+@pytest.fixture
+def db(tmp_path):
+    return POStatusDB(SQLiteState(str(tmp_path / "po.sqlite3")))
+
+
+def _store(db):
+    return RecommendationStore(load_frame(), db)
+
+
+def test_two_buyers_cannot_claim_the_same_row(db):
+    alice, bob = _store(db), _store(db)
+
+    assert alice.set_status(["R-1001", "R-1002"], "Submitting", "alice", allowed=("Pending",)) == ["R-1001", "R-1002"]
+    assert bob.set_status(["R-1002", "R-1003"], "Submitting", "bob", allowed=("Pending",)) == ["R-1003"]
+    # Bob's copy learns about Alice's claim on the way
+    assert bob.row("R-1001")["status"] == "Submitting"
+
+
+def test_sync_pulls_only_what_changed(db):
+    alice, bob = _store(db), _store(db)
+    revision = bob.revision
+    alice.update({"R-1003": {"status": "Created: PO-7", "internal_id": "PO-7", "url": "https://erp/PO-7"}}, "alice")
+
+    assert db.changes_since(revision)[0] == {"R-1003": {"status": "Created: PO-7", "internal_id": "PO-7", "url": "https://erp/PO-7"}}
+    assert bob.sync() and not bob.sync()
+    assert bob.row("R-1003")["internal_id"] == "PO-7"
+    assert bob.version == alice.version
+
+
+def test_activity_log_records_every_transition(db):
+    store = _store(db)
+    store.set_status(["R-1001"], "Submitting", "alice", allowed=("Pending",))
+    store.update({"R-1001": {"status": "Created: PO-1", "internal_id": "PO-1"}}, "alice")
+
+    entries = db.activity(10)
+    assert [(e["from_status"], e["to_status"]) for e in entries] == [("Submitting", "Created: PO-1"), ("Pending", "Submitting")]
+    assert db.activity_count() == 2
+    # A later status change without an id keeps the ERP id
+    store.set_status(["R-1001"], "Created: PO-1 (confirmed)", "alice")
+    assert store.row("R-1001")["internal_id"] == "PO-1"
@@ -0,0 +1,50 @@
+PAGE = "app_pages/Amazon PO Demo.py"
+
+
+def _statuses(at, rec_ids: list) -> list:
+    return at.session_state["po_store"].df.loc[rec_ids, "status"].tolist()
+
+
+def _button(at, label: str):
+    return next(b for b in at.button if b.label.startswith(label))
+
+
+def test_approve_creates_the_po(app, wait_for_jobs, stub_stats):
+    at = app(PAGE)
+    chooser = next(s for s in at.selectbox if s.label.startswith("🔍"))
+    rec_id = chooser.options[0]
+    chooser.set_value(rec_id).run()
+    before = stub_stats["po"]
+
+    _button(at, "✅ Approve &").click().run()
+    wait_for_jobs(at, "po_jobs")
+
+    assert _statuses(at, [rec_id])[0].startswith("Created")
+    assert stub_stats["po"] == before + 1
+
+
+def test_bulk_approve_creates_every_selected_po(app, wait_for_jobs):
+    at = app(PAGE)
+    rec_ids = ["R-0000040", "R-0000041", "R-0000042"]
+    at.session_state["po_selected_ids"] = rec_ids
+    at.run()
+
+    approve = _button(at, "✅ Approve selected")
+    assert approve.label == "✅ Approve selected (3)" and not approve.disabled
+    approve.click().run()
+    wait_for_jobs(at, "po_jobs")
+
+    assert all(status.startswith("Created") for status in _statuses(at, rec_ids))
+
+
+def test_bulk_approve_skips_rows_that_are_not_pending(app, wait_for_jobs):
+    at = app(PAGE)
+    at.session_state["po_selected_ids"] = ["R-0000043"]
+    at.run()
+    _button(at, "✅ Approve selected").click().run()
+    wait_for_jobs(at, "po_jobs")
+
+    at.session_state["po_selected_ids"] = ["R-0000043", "R-0000044"]
+    at.run()
+
+    assert _button(at, "✅ Approve selected").label == "✅ Approve selected (1)"
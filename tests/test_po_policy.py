@@ -0,0 +1,70 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from sl_common import po_policy
+from sl_common.po_policy import DEFAULT_POLICY, PolicyContext, compile_policy, register_rule_type
+
+CONTEXT = PolicyContext(erp="SAP", env="Prod", as_of=date(2026, 3, 1))
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "supplier": ["Supplier A", "Supplier C", "Supplier Z", "Supplier A"],
+        "recommended_qty": [100, 100, 100, 6000],
+        "shortage_date": ["03/20/2026", "03/10/2026", "04/30/2026", "bad"],
+    }, index=["R-1", "R-2", "R-3", "R-4"])
+
+
+def test_default_policy_checks_every_row():
+    checks = compile_policy(DEFAULT_POLICY).evaluate(_frame(), CONTEXT)
+
+    assert list(checks["check_preferred_supplier"]) == [True, True, False, True]
+    # SAP Prod has a 5,000 unit limit
+    assert list(checks["check_authority_limit"]) == [True, True, True, False]
+    # Supplier C needs 21 days; the unknown supplier gets the 14 day default; a bad date fails
+    assert list(checks["check_delivery_window"]) == [True, False, True, False]
+    assert list(checks["policy_ok"]) == [True, False, False, False]
+
+
+def test_authority_limit_depends_on_erp_and_environment():
+    policy = compile_policy(DEFAULT_POLICY)
+    frame = _frame()
+
+    assert list(policy.evaluate(frame, PolicyContext("NetSuite", "Prod", CONTEXT.as_of))["check_authority_limit"]) == [True, True, True, False]
+    assert policy.evaluate(frame, PolicyContext("SAP", "Dev", CONTEXT.as_of))["check_authority_limit"].all()
+    rule = next(r for r in policy.rules if r.id == "authority_limit")
+    assert rule.explain(CONTEXT) == "Up to 5,000 units in SAP Prod"
+
+
+def test_delivery_window_uses_scored_days_when_present():
+    frame = _frame().assign(days_to_shortage=[30, 30, 30, 30])
+    checks = compile_policy(DEFAULT_POLICY).evaluate(frame, CONTEXT)
+
+    assert checks["check_delivery_window"].all()
+
+
+def test_no_rules_passes_everything():
+    checks = compile_policy({"rules": []}).evaluate(_frame(), CONTEXT)
+
+    assert list(checks.columns) == ["policy_ok"]
+    assert checks["policy_ok"].all()
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"rules": [{"type": "nope"}]}, "unknown type"),
+    ({"rules": [{"type": "preferred_supplier", "suppliers": []}] * 2}, "duplicate id"),
+    ({"rules": [{"type": "authority_limit"}]}, "malformed"),
+])
+def test_bad_policies_are_refused(spec, message):
+    with pytest.raises(ValueError, match=message):
+        compile_policy(spec)
+
+
+def test_registered_rule_types_can_be_used(monkeypatch):
+    monkeypatch.setattr(po_policy, "RULE_TYPES", dict(po_policy.RULE_TYPES))
+    register_rule_type("small", lambda spec: (lambda frame, context: frame["recommended_qty"].to_numpy() < spec["below"], lambda context: "small"))
+    checks = compile_policy({"rules": [{"type": "small", "below": 1000}]}).evaluate(_frame(), CONTEXT)
+
+    assert list(checks["check_small"]) == [True, True, True, False]
@@ -0,0 +1,86 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from sl_common.po_scoring import QueueScorer, QueueScores, base_scores, shortage_days
+
+TODAY = date(2026, 3, 1)
+
+
+def _frame(**overrides) -> pd.DataFrame:
+    frame = pd.DataFrame({
+        "rec_id": ["R-1", "R-2", "R-3"],
+        "safety_stock": [100, 100, 0],
+        "on_hand": [200, 10, 0],
+        "inbound": [0, 0, 0],
+        "forecast_gap": [0, 150, 5],
+        "shortage_date": ["06/01/2026", "03/05/2026", "not a date"],
+    }).set_index("rec_id", drop=False)
+    for column, values in overrides.items():
+        frame[column] = values
+    return frame
+
+
+def test_shortage_days_parses_each_format_and_blanks_bad_dates():
+    days = shortage_days(pd.Series(["03/02/2026", None, "bad", "03/02/2026"]))
+    as_of = np.datetime64(TODAY, "D").astype("int64")
+
+    assert list(days[[0, 3]] - as_of) == [1, 1]
+    assert np.isnan(days[1]) and np.isnan(days[2])
+    assert shortage_days(pd.Series(pd.to_datetime(["2026-03-02", None])))[0] - as_of == 1
+
+
+def test_urgent_rows_rank_first():
+    scores = QueueScores(base_scores(_frame()), TODAY)
+
+    # R-2 is short in four days and well below safety stock; R-1 is covered
+    assert list(scores.frame.index[scores.order]) == ["R-2", "R-3", "R-1"]
+    assert scores.row("R-2")["days_to_shortage"] == 4
+    assert 0 <= scores.frame["priority"].min() and scores.frame["priority"].max() <= 100
+
+
+def test_missing_inputs_keep_scores_finite():
+    frame = _frame(on_hand=[np.nan, 10, 0], forecast_gap=[np.nan, np.nan, 5], shortage_date=[None, None, None])
+    scores = QueueScores(base_scores(frame), TODAY)
+
+    assert np.isfinite(scores.frame["priority"]).all()
+    assert np.isnan(scores.frame["days_to_shortage"]).all()
+    assert len(scores.order) == len(frame)
+
+
+def test_scores_are_cached_per_version_and_day():
+    scorer = QueueScorer()
+    frame = _frame()
+    frame.attrs["source_version"] = "v1"
+
+    first = scorer.scores(frame, TODAY)
+    assert scorer.scores(frame, TODAY) is first
+    assert scorer.scores(frame, date(2026, 3, 2)) is not first
+    # Unversioned frames are always scored afresh
+    assert scorer.scores(_frame(), TODAY) is not scorer.scores(_frame(), TODAY)
+
+
+def test_reloaded_queue_rescores_only_changed_rows():
+    scorer = QueueScorer()
+    frame = _frame()
+    frame.attrs["source_version"] = "v1"
+    scorer.scores(frame, TODAY)
+
+    changed = _frame(on_hand=[0, 10, 0])
+    changed.attrs["source_version"] = "v2"
+    rescored = scorer.scores(changed, TODAY)
+
+    expected = QueueScores(base_scores(changed), TODAY)
+    pd.testing.assert_frame_equal(rescored.frame, expected.frame)
+    assert list(rescored.order) == list(expected.order)
+
+
+def test_ranked_view_is_built_once():
+    frame = _frame()
+    scores = QueueScores(base_scores(frame), TODAY)
+    ranked = scores.ranked(frame, ["rec_id", "shortage_date"])
+
+    assert scores.ranked(frame, ["rec_id", "shortage_date"]) is ranked
+    assert list(ranked["rec_id"]) == ["R-2", "R-3", "R-1"]
+    assert list(ranked["priority"]) == list(scores.frame["priority"].to_numpy()[scores.order])
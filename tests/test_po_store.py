@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from sl_common.po_store import RecommendationStore, load_frame, mock_recommendations, prepare_frame
+
+
+def _store():
+    return RecommendationStore(load_frame())
+
+
+def test_counts_follow_status_changes():
+    store = _store()
+    assert store.counts["pending"] == 3
+
+    store.set_status(["R-1001"], "Created: PO-1")
+    store.set_status(["R-1002"], "Failed")
+
+    assert (store.counts["pending"], store.counts["created"], store.counts["failed"]) == (1, 1, 1)
+    assert store.row("R-1001")["status"] == "Created: PO-1"
+
+
+def test_only_allowed_rows_move():
+    store = _store()
+    store.set_status(["R-1001"], "Submitting")
+
+    assert store.set_status(["R-1001", "R-1002"], "Submitting", allowed=("Pending",)) == ["R-1002"]
+    assert store.set_status(["R-9999"], "Submitting") == []
+
+
+def test_duplicate_rec_ids_are_rejected():
+    frame = mock_recommendations()
+    with pytest.raises(ValueError, match="rec_id must be unique"):
+        prepare_frame(pd.concat([frame, frame]))
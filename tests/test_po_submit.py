@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sl_common import po_submit
+from sl_common.background import Job
+from sl_common.po_db import POStatusDB
+from sl_common.po_submit import create_pos
+from sl_common.state import SQLiteState
+
+REC_IDS = ["R-1", "R-2", "R-3"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = POStatusDB(SQLiteState(str(tmp_path / "po.sqlite3")))
+    # The page claims rows before submitting them
+    db.transition({rec_id: {"status": "Submitting"} for rec_id in REC_IDS}, dict.fromkeys(REC_IDS, "Pending"), "buyer")
+    return db
+
+
+def _statuses(db) -> dict:
+    changes, _ = db.changes_since(0)
+    return {rec_id: changes[rec_id]["status"] for rec_id in REC_IDS}
+
+
+def _run(post, db, executor=None):
+    job = Job("test", meta={"results": {}})
+    executor = executor or ThreadPoolExecutor(max_workers=1)
+    job.future = executor.submit(create_pos, job, [{"rec_id": rec_id} for rec_id in REC_IDS], db, "buyer", post)
+    return job
+
+
+def _wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_created_and_failed_rows_are_recorded(db):
+    def post(batch, job):
+        if batch[0]["rec_id"] == "R-2":
+            raise RuntimeError("Non-2xx status code: 500")
+        return [(f"PO-{p['rec_id']}", None) for p in batch]
+
+    job = _run(post, db)
+    results = job.result()
+
+    assert _statuses(db) == {"R-1": "Created: PO-R-1", "R-2": "Failed", "R-3": "Created: PO-R-3"}
+    assert results["R-2"]["status"] == "Failed"
+    assert job.progress == (3, 3)
+    assert "❌ R-2: Non-2xx status code: 500" in job.partial
+
+
+def test_cancel_waits_for_posts_in_flight_and_releases_only_unsent_rows(db, monkeypatch):
+    # One request at a time, as if other jobs held the rest of the shared pool
+    monkeypatch.setattr(po_submit, "get_po_pool", lambda: ThreadPoolExecutor(max_workers=1))
+    sending, release = threading.Event(), threading.Event()
+
+    def post(batch, job):
+        sending.set()
+        release.wait(5)
+        return [(f"PO-{p['rec_id']}", None) for p in batch]
+
+    job = _run(post, db)
+    sending.wait(5)
+    job.cancel()
+
+    # Rows that never left go back to Pending; the one on the wire stays claimed
+    _wait_until(lambda: _statuses(db)["R-3"] == "Pending")
+    assert _statuses(db) == {"R-1": "Submitting", "R-2": "Pending", "R-3": "Pending"}
+
+    release.set()
+    _wait_until(job.future.done)
+    # The ERP made that PO after the cancel, and it is still recorded
+    assert _statuses(db) == {"R-1": "Created: PO-R-1", "R-2": "Pending", "R-3": "Pending"}
+    assert job.meta["results"]["R-1"]["internal_id"] == "PO-R-1"
+
+
+def test_unexpected_error_marks_unfinished_rows_failed(db, monkeypatch):
+    def post(batch, job):
+        return [(f"PO-{p['rec_id']}", None) for p in batch]
+
+    def broken(changes, current, actor="", allowed=None):
+        if allowed is None:
+            raise RuntimeError("state backend unavailable")
+        return POStatusDB.transition(db, changes, current, actor, allowed)
+
+    monkeypatch.setattr(db, "transition", broken)
+    job = _run(post, db)
+
+    with pytest.raises(RuntimeError):
+        job.result()
+    assert set(_statuses(db).values()) == {"Failed"}
+
+
+def test_jobs_share_one_bounded_pool(db, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(po_submit, "get_po_pool", lambda: pool)
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def post(batch, job):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return [(f"PO-{p['rec_id']}", None) for p in batch]
+
+    executor = ThreadPoolExecutor(max_workers=4)
+    jobs = [_run(post, db, executor) for _ in range(4)]
+    for job in jobs:
+        job.result()
+
+    assert peak[0] == 2
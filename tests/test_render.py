@@ -0,0 +1,44 @@
+from sl_common.render import IncrementalRenderer
+
+
+class _Container:
+    def __init__(self):
+        self.sent = []
+
+    def markdown(self, text: str):
+        self.sent.append(text)
+
+
+def test_flushes_batch_so_bytes_sent_stay_linear():
+    container = _Container()
+    renderer = IncrementalRenderer(container, max_interval=3600)
+    words = [f"word{i} " for i in range(2000)]
+    for word in words:
+        renderer.append(word)
+    renderer.flush()
+
+    text = "".join(words)
+    assert container.sent[-1] == renderer.text == text
+    # Each flush waits for a quarter of what is shown, so the total is a small multiple of the text
+    assert renderer.bytes_sent < 6 * len(text)
+    assert renderer.flushes < 40
+
+
+def test_time_budget_forces_a_flush():
+    container = _Container()
+    renderer = IncrementalRenderer(container, min_bytes=10_000, max_interval=0)
+    renderer.append("a")
+    renderer.append("b")
+
+    assert container.sent == ["a", "ab"]
+
+
+def test_flush_without_new_text_sends_nothing():
+    container = _Container()
+    renderer = IncrementalRenderer(container, min_bytes=0)
+    renderer.append("hello")
+    renderer.flush()
+    renderer.append("")
+    renderer.flush()
+
+    assert container.sent == ["hello"]
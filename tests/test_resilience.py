@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+import requests
+
+from sl_common.background import Job, JobCancelled
+from sl_common.resilience import CallPolicy, CircuitOpen, Resilience
+
+
+class _Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+def _fail(timeout):
+    raise requests.ConnectionError("refused")
+
+
+def test_breaker_opens_after_repeated_failures():
+    resilience = Resilience()
+    policy = CallPolicy(retries=0, breaker_failures=2, breaker_reset=60)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            resilience.call("crm", policy, _fail, 1, 5, idempotent=True)
+
+    with pytest.raises(CircuitOpen):
+        resilience.call("crm", policy, lambda timeout: _Response(200), 1, 5, idempotent=True)
+
+
+def test_interrupted_trial_call_frees_the_next_trial():
+    resilience = Resilience()
+    policy = CallPolicy(retries=0, breaker_failures=1, breaker_reset=0)
+    with pytest.raises(requests.ConnectionError):
+        resilience.call("po", policy, _fail, 1, 5, idempotent=True)
+
+    def stopped(timeout):
+        raise KeyboardInterrupt
+
+    # The trial ends without an outcome (a script stop), so it says nothing about the endpoint
+    with pytest.raises(KeyboardInterrupt):
+        resilience.call("po", policy, stopped, 1, 5, idempotent=True)
+
+    assert resilience.call("po", policy, lambda timeout: _Response(200), 1, 5, idempotent=True).status_code == 200
+    assert resilience.guard_for("po", policy).state == "closed"
+
+
+def test_non_idempotent_calls_are_not_retried():
+    resilience = Resilience()
+    policy = CallPolicy(retries=2, backoff=0)
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        raise requests.ReadTimeout("slow")
+
+    with pytest.raises(requests.ReadTimeout):
+        resilience.call("rays", policy, send, 1, 5, idempotent=False)
+
+    assert len(calls) == 1
+
+
+def test_a_call_that_opens_the_circuit_reports_its_own_failure():
+    resilience = Resilience()
+    policy = CallPolicy(retries=2, backoff=0, breaker_failures=1, breaker_reset=60)
+
+    # The first failure opens the circuit and the retry is refused, but the caller sees the failure itself
+    with pytest.raises(requests.ConnectionError):
+        resilience.call("crm", policy, _fail, 1, 5, idempotent=True)
+    with pytest.raises(CircuitOpen):
+        resilience.call("crm", policy, _fail, 1, 5, idempotent=True)
+
+
+def test_cancelled_job_stops_waiting_between_retries(monkeypatch):
+    monkeypatch.setattr("sl_common.resilience._backoff", lambda policy, attempt: 10)
+    resilience = Resilience()
+    job = Job("test")
+    job.future = Future()
+    threading.Timer(0.1, job.cancel).start()
+    start = time.monotonic()
+
+    with pytest.raises(JobCancelled):
+        resilience.call("po", CallPolicy(retries=5), _fail, 1, 60, idempotent=True, job=job)
+    assert time.monotonic() - start < 5
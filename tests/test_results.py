@@ -0,0 +1,60 @@
+import pytest
+
+from sl_common.results import ResultStore, build_reply, find_records, json_to_markdown, records_to_table
+
+ROWS = [{"id": i, "name": f"Row {i:03d}", "amount": (i * 37) % 100, "meta": {"k": i}} for i in range(120)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path))
+
+
+def test_rows_are_found_under_one_or_two_wrappers():
+    assert find_records(ROWS) is ROWS
+    assert find_records({"data": ROWS}) is ROWS
+    assert find_records([{"rows": ROWS}]) is ROWS
+    assert find_records({"a": ROWS, "b": ROWS}) is None
+    assert find_records([{"only": "one row"}]) is None
+
+
+def test_nested_and_mixed_values_become_text():
+    table = records_to_table([{"a": 1, "b": {"x": 1}}, {"a": "two", "c": True}])
+
+    assert table.column_names == ["a", "b", "c"]
+    assert table.column("a").to_pylist() == ["1", "two"]
+    assert table.column("b").to_pylist() == ['{"x": 1}', None]
+
+
+def test_pages_slice_in_original_or_sorted_order(store):
+    result_id = build_reply(ROWS, store)["result_id"]
+
+    assert store.page(result_id, 50, 50).column("id").to_pylist() == list(range(50, 100))
+    assert store.page(result_id, 100, 50).num_rows == 20
+    top = store.page(result_id, 0, 3, sort_by="amount", descending=True).column("amount").to_pylist()
+    assert top == sorted((row["amount"] for row in ROWS), reverse=True)[:3]
+
+
+def test_downloads_hold_the_full_result(store):
+    result_id = build_reply(ROWS, store)["result_id"]
+
+    assert store.csv_bytes(result_id).decode().count("\n") == len(ROWS) + 1
+    assert store.parquet_bytes(result_id).startswith(b"PAR1")
+
+
+def test_oldest_results_are_evicted_past_the_budget(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=1)
+    first = build_reply(ROWS, store)["result_id"]
+    second = build_reply(ROWS, store)["result_id"]
+
+    assert not store.exists(first) and not store.exists(second)
+    assert store.load(first) is None
+
+
+def test_reply_without_rows_is_capped_markdown(store):
+    reply = build_reply({"answer": "yes", "details": {"n": 1}}, store)
+
+    assert "result_id" not in reply
+    assert reply["content"] == "- **answer:** yes\n- **details:**\n    - **n:** 1\n"
+    assert json_to_markdown(list(range(1000)), max_items=5).endswith("- _… 995 more items_\n")
+    assert json_to_markdown(["x" * 100] * 10, max_chars=150).endswith("_… output truncated_\n")
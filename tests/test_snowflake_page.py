@@ -0,0 +1,26 @@
+PAGE = "app_pages/Intuit Snowflake Agent.py"
+
+
+def _ask(at, wait_for_jobs, question: str):
+    at.chat_input[0].set_value(question).run()
+    return wait_for_jobs(at, "SF_jobs")
+
+
+def test_rows_are_shown_as_a_paged_table(app, wait_for_jobs):
+    at = _ask(app(PAGE), wait_for_jobs, "opportunities over 500000")
+
+    assert any(m.value == "**120 rows × 5 columns**" for m in at.markdown)
+    assert at.number_input[0].label == "Page (of 3)"
+    assert len(at.dataframe) == 1
+
+
+def test_same_question_twice_in_one_session(app, wait_for_jobs, stub_stats):
+    at = _ask(app(PAGE), wait_for_jobs, "completed campaigns")
+    before = stub_stats["slsched"]
+    _ask(at, wait_for_jobs, "completed campaigns")
+    at.run()
+
+    # The second answer comes from the cache and shares the saved table, but each message has its own widgets
+    assert stub_stats["slsched"] == before
+    assert len(at.dataframe) == 2
+    assert len({s.key for s in at.selectbox}) == 2
@@ -0,0 +1,36 @@
+from streamlit.testing.v1 import AppTest
+
+
+def _page():
+    import streamlit as st
+
+    from sl_common.state import session_id
+
+    st.text(session_id())
+
+
+def _open(tab: str = None):
+    at = AppTest.from_function(_page)
+    if tab is not None:
+        at.query_params["tab"] = tab
+    return at.run()
+
+
+def test_session_id_is_stable_across_reruns_and_gets_a_tab_token():
+    at = _open()
+    first = at.text[0].value
+    at.run()
+
+    assert at.text[0].value == first
+    assert len(at.query_params["tab"]) == 16
+
+
+def test_a_tab_token_alone_does_not_resume_someone_elses_session():
+    # Without a signed-in user or the browser's cookie, a leaked ?tab= leads to a fresh session
+    assert _open("0123456789abcdef").text[0].value != _open("0123456789abcdef").text[0].value
+
+
+def test_malformed_tab_tokens_are_replaced():
+    at = _open("../../etc")
+
+    assert at.query_params["tab"] != "../../etc"
@@ -0,0 +1,82 @@
+import pytest
+
+from sl_common.state import SQLiteState
+from sl_common.transcript import Transcript, TranscriptStore, message_size
+
+MESSAGE = {"role": "user", "content": "x" * 800}
+# Room for three messages
+BUDGET = 3 * message_size(MESSAGE)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TranscriptStore(SQLiteState(str(tmp_path / "transcripts.sqlite3")))
+
+
+def _messages(count: int) -> list:
+    return [dict(MESSAGE, content=f"{i:03d}" + MESSAGE["content"][3:]) for i in range(count)]
+
+
+def _filled(store, count: int, budget: int = BUDGET, transcript_id: str = "s:chat") -> Transcript:
+    transcript = Transcript(transcript_id, store, budget_bytes=budget)
+    for message in _messages(count):
+        transcript.append(message)
+    return transcript
+
+
+def test_memory_stays_within_budget_and_nothing_is_lost(store):
+    transcript = _filled(store, 10)
+
+    stats = transcript.stats()
+    assert stats["messages"] == 10
+    assert stats["in_memory"] == 3
+    assert stats["not_in_memory"] == 7
+    # Spilled messages are read back from the backend, in order
+    assert list(transcript) == _messages(10)
+    assert transcript[2] == _messages(10)[2]
+    assert transcript[-1] == _messages(10)[-1]
+
+
+def test_newest_exchange_stays_in_memory_whatever_its_size(store):
+    transcript = _filled(store, 5, budget=0)
+
+    assert transcript.stats()["in_memory"] == 2
+
+
+def test_load_earlier_pages_back_through_spilled_messages(store):
+    transcript = _filled(store, 10)
+    transcript.visible_limit = 4
+
+    assert transcript.visible() == _messages(10)[6:]
+    assert transcript.hidden == 6
+
+    transcript.load_earlier(3)
+    assert transcript.visible() == _messages(10)[3:]
+    assert transcript.hidden == 3
+
+    # A new message ends the page-back
+    transcript.append(_messages(11)[10])
+    assert transcript.visible() == _messages(11)[7:]
+
+
+def test_another_replica_sees_the_same_transcript(store):
+    _filled(store, 6)
+    elsewhere = Transcript("s:chat", store, budget_bytes=BUDGET)
+
+    assert elsewhere.stats()["in_memory"] == 0
+    assert elsewhere.visible()[-2:] == _messages(6)[-2:]
+    assert list(elsewhere) == _messages(6)
+
+
+def test_maintain_evicts_idle_transcripts(store, monkeypatch):
+    transcript = _filled(store, 5)
+    idle = _filled(store, 5, transcript_id="s:other")
+    monkeypatch.setattr("sl_common.transcript.SESSION_IDLE_MINUTES", 1)
+    idle.last_active -= 120
+
+    store.maintain(force=True)
+
+    assert idle.stats()["in_memory"] == 0
+    assert transcript.stats()["in_memory"] == 3
+    # Evicted messages come back when the transcript is shown again
+    assert idle.visible()[-1] == _messages(5)[-1]
@@ -0,0 +1,262 @@
+"""Local stand-in for SnapLogic agent and PO task endpoints.
+
+Run it and point a page at it, e.g.::
+
+    python tools/stub_server.py --port 8765 --mode sse
+    SL_CRM_SQL_TASK_URL="http://localhost:8765/crm" streamlit run GenAI_Demo.py
+
+The request body decides the contract being served:
+
+* feed-master queue (Ultra tasks): JSON ``{"messages": [...], "session_id": ...}``;
+  the stub counts turns per ``session_id`` so history modes can be checked.
+* slsched triggered tasks: ``prompt`` as a form field or JSON key.
+* PO creation: a JSON document with ``rec_id`` (or an array of them), answered
+  with one ``{"rec_id", "internal_id", "url"}`` document per recommendation.
+* Anthropic Messages API: ``POST /v1/messages``, answered with slide JSON for
+  the Deck Builder (``ANTHROPIC_BASE_URL=http://localhost:8765``).
+
+``--mode`` selects the agent response shape: ``choices`` / ``response`` (one
+JSON document, the non-streaming contract), ``rows`` (a JSON array of
+``--rows`` records, like a Snowflake result) or ``sse`` / ``ndjson`` / ``text``
+(chunked streaming). ``--latency`` delays the first byte, e.g. ``fixed:0.2``,
+``uniform:0.1,0.5``, ``lognormal:0.3,0.5`` (median, sigma) or ``exp:0.2``
+(mean). ``--error-rate`` answers that share of requests with ``--error-status``
+and ``--hang-rate`` stalls them for ``--hang-seconds`` to provoke client
+timeouts. Every option can be overridden per request with a query parameter of
+the same name (``?mode=sse&latency=fixed:1&error_rate=0.1``). ``GET /stats``
+returns request counters.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MODES = ("choices", "response", "rows", "sse", "ndjson", "text")
+
+
+def parse_latency(spec: str):
+    """Return a sampler for ``fixed:s``, ``uniform:lo,hi``, ``lognormal:median,sigma`` or ``exp:mean``."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def _parse_body(body: bytes, content_type: str):
+    if "json" in content_type:
+        return json.loads(body or b"{}")
+    return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+
+def _prompt_from(payload) -> str:
+    if payload.get("messages"):
+        return payload["messages"][-1].get("content", "")
+    return payload.get("prompt", "")
+
+
+def _answer_for(prompt: str, words: int, turn: int = None) -> str:
+    filler = " ".join(f"word{i}" for i in range(words))
+    context = f" (turn {turn})" if turn else ""
+    return f"You asked: {prompt}{context}. {filler}".strip()
+
+
+def _rows_for(prompt: str, rows: int) -> list:
+    return [
+        {"id": i, "name": f"Row {i}", "region": ("NA", "EMEA", "APAC")[i % 3], "amount": round(i * 1.5, 2), "prompt": prompt}
+        for i in range(rows)
+    ]
+
+
+def _slide_message(payload: dict) -> dict:
+    prompt = _prompt_from(payload)
+    match = re.search(r"^Slide type: (.+)$", prompt, re.MULTILINE)
+    slide_type = match.group(1) if match else "Slide"
+    content = {
+        "title": f"{slide_type} for the customer",
+        "subtitle": f"Stub {slide_type.lower()} content.",
+        "bullets": [f"{slide_type} point {i}" for i in range(1, 5)],
+    }
+    if slide_type == "Business Value":
+        content["stats"] = [{"value": "80%", "label": "faster integrations"}, {"value": "3x", "label": "more projects"},
+                            {"value": "40h", "label": "saved per week"}]
+    text = json.dumps(content)
+    return {
+        "id": f"msg_stub_{random.getrandbits(32):08x}",
+        "type": "message",
+        "role": "assistant",
+        "model": payload.get("model", "stub"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(prompt.split()), "output_tokens": len(text.split())},
+    }
+
+
+def _po_document(payload: dict) -> dict:
+    internal_id = f"PO-{abs(hash(payload.get('rec_id'))) % 100000:05d}"
+    return {"rec_id": payload.get("rec_id"), "internal_id": internal_id, "url": f"https://erp.example.com/po/{internal_id}"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mode = "choices"
+    words = 50
+    rows = 100
+    token_delay = 0.02
+    latency = "fixed:0"
+    error_rate = 0.0
+    error_status = 500
+    hang_rate = 0.0
+    hang_seconds = 30.0
+
+    stats = Counter()
+    turns = Counter()
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _option(self, query: dict, name: str, cast=str):
+        return cast(query.get(name, [getattr(self, name)])[0])
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/stats":
+            with self.lock:
+                self._send_json({"requests": dict(self.stats), "sessions": len(self.turns)})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        query = parse_qs(urlsplit(self.path).query)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = _parse_body(body, self.headers.get("Content-Type", ""))
+
+        time.sleep(max(parse_latency(self._option(query, "latency"))(), 0))
+        roll = random.random()
+        if roll < self._option(query, "hang_rate", float):
+            self._count("hung")
+            time.sleep(self._option(query, "hang_seconds", float))
+        elif roll < self._option(query, "hang_rate", float) + self._option(query, "error_rate", float):
+            self._count("errors")
+            self._send_json({"reason": "injected failure"}, self._option(query, "error_status", int))
+            return
+
+        if urlsplit(self.path).path.endswith("/v1/messages"):
+            self._count("model")
+            self._send_json(_slide_message(payload))
+            return
+
+        if isinstance(payload, list) or "rec_id" in payload:
+            self._count("po")
+            docs = [_po_document(p) for p in payload] if isinstance(payload, list) else _po_document(payload)
+            self._send_json(docs)
+            return
+
+        turn = None
+        if "session_id" in payload:
+            self._count("feed_master")
+            with self.lock:
+                self.turns[payload["session_id"]] += 1
+                turn = self.turns[payload["session_id"]]
+        else:
+            self._count("slsched")
+        prompt = _prompt_from(payload)
+        mode = self._option(query, "mode")
+        answer = _answer_for(prompt, self._option(query, "words", int), turn)
+        delay = self._option(query, "token_delay", float)
+
+        if mode == "choices":
+            self._send_json({"choices": [{"message": {"content": answer}}]})
+        elif mode == "response":
+            self._send_json({"response": answer})
+        elif mode == "rows":
+            self._send_json(_rows_for(prompt, self._option(query, "rows", int)))
+        elif mode == "sse":
+            self._send_chunked("text/event-stream", (
+                *(f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n" for token in _tokens(answer)),
+                "data: [DONE]\n\n",
+            ), delay)
+        elif mode == "ndjson":
+            self._send_chunked("application/x-ndjson", (json.dumps({"response": token}) + "\n" for token in _tokens(answer)), delay)
+        else:
+            self._send_chunked("text/plain; charset=utf-8", _tokens(answer), delay)
+
+    def _send_json(self, payload, status: int = 200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunked(self, content_type, chunks, delay: float):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            data = chunk.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            time.sleep(delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _tokens(text: str):
+    words = text.split(" ")
+    return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, **options) -> ThreadingHTTPServer:
+    """Build a stub server; ``options`` override the ``StubHandler`` defaults."""
+    if "latency" in options:
+        parse_latency(options["latency"])
+    handler = type("ConfiguredStubHandler", (StubHandler,), {**options, "stats": Counter(), "turns": Counter()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=MODES, default="choices")
+    parser.add_argument("--words", type=int, default=50, help="filler words appended to each answer")
+    parser.add_argument("--rows", type=int, default=100, help="records returned in rows mode")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed chunks")
+    parser.add_argument("--latency", default="fixed:0", help="time to first byte distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port, mode=args.mode, words=args.words, rows=args.rows, token_delay=args.token_delay,
+        latency=args.latency, error_rate=args.error_rate, error_status=args.error_status,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds,
+    )
+    print(f"SnapLogic stub listening on http://{args.host}:{server.server_port} (mode={args.mode})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()